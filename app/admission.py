@@ -0,0 +1,146 @@
+"""
+Admission control for the parse endpoints
+
+Each server process runs at most ``limit`` parse requests at a time. Further
+requests wait in a bounded FIFO queue; a request that finds the queue full,
+or that has waited ``max_wait`` seconds without a slot, is shed with ``429``
+and a ``Retry-After`` estimated from recent service times. Requests wait
+before their body is read, so a queued upload holds no memory here, and
+admitted requests keep a predictable latency during bursts.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional
+
+from fastapi.responses import JSONResponse
+
+from . import metrics
+
+ADMITTED = "admitted"
+QUEUE_FULL = "queue_full"
+QUEUE_TIMEOUT = "queue_timeout"
+
+_DETAILS = {
+    QUEUE_FULL: "Server is busy: too many parse requests are waiting",
+    QUEUE_TIMEOUT: "Server is busy: the request waited too long for a parse slot",
+}
+
+
+class Shed(Exception):
+    """Raised when a request is refused instead of admitted"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(_DETAILS[reason])
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded, time-limited FIFO wait queue (one event loop)"""
+
+    def __init__(self, limit: int, queue_size: int = 32, max_wait: float = 10.0):
+        self.limit = max(limit, 1)
+        self.queue_size = max(queue_size, 0)
+        self.max_wait = max(max_wait, 0.0)
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._service_time = 1.0  # moving average of admitted request durations, seconds
+        self.counters = {ADMITTED: 0, "queued": 0, QUEUE_FULL: 0, QUEUE_TIMEOUT: 0}
+
+    def retry_after(self) -> int:
+        """Seconds until a request joining the back of the queue would likely get a slot"""
+        return max(1, math.ceil(self._service_time * (len(self._waiters) + 1) / self.limit))
+
+    def _shed(self, reason: str) -> None:
+        self.counters[reason] += 1
+        raise Shed(reason, self.retry_after())
+
+    async def acquire(self) -> float:
+        """Wait for a slot and return the seconds spent queued; raises ``Shed``"""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.counters[ADMITTED] += 1
+            return 0.0
+        if len(self._waiters) >= self.queue_size:
+            self._shed(QUEUE_FULL)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.counters["queued"] += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just as the wait ended: pass it on
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self._shed(QUEUE_TIMEOUT)
+            raise
+        self.counters[ADMITTED] += 1
+        return time.monotonic() - started
+
+    def release(self, seconds: Optional[float] = None) -> None:
+        """Free a slot, handing it to the longest waiting request; ``seconds`` is how long it was held"""
+        if seconds is not None:
+            self._service_time += (seconds - self._service_time) * 0.2
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "max_wait": self.max_wait,
+            "active": self.active,
+            "waiting": len(self._waiters),
+            "service_time_s": round(self._service_time, 3),
+            **self.counters,
+        }
+
+
+class AdmissionMiddleware:
+    """
+    Gate requests to ``paths`` through an ``AdmissionController``.
+
+    Other paths (``/health``, ``/``, ``/jobs``, ...) and CORS preflights
+    pass straight through.
+    """
+
+    def __init__(self, app, controller: AdmissionController, paths: Iterable[str]):
+        self.app = app
+        self.controller = controller
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        try:
+            waited = await self.controller.acquire()
+        except Shed as e:
+            metrics.ADMISSIONS.labels(e.reason).inc()
+            if e.reason == QUEUE_TIMEOUT:
+                metrics.QUEUE_SECONDS.observe(time.monotonic() - started)
+            response = JSONResponse({"detail": str(e)}, status_code=429,
+                                    headers={"Retry-After": str(e.retry_after)})
+            await response(scope, receive, send)
+            return
+
+        metrics.ADMISSIONS.labels(ADMITTED).inc()
+        metrics.QUEUE_SECONDS.observe(waited)
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(time.monotonic() - started)
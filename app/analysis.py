@@ -0,0 +1,114 @@
+"""
+Per-document analysis context shared by the resume extractors
+"""
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import contacts as contact_scanner
+from . import nlp_models
+from . import sections as segmentation
+
+
+class ResumeDocument:
+    """
+    A single resume's text together with its NLP analysis.
+
+    Built once per request and handed to every extractor in ``app.utils``,
+    so the spaCy pipeline runs at most once per document. Derived views
+    are computed on first access and then reused.
+
+    ``region()`` narrows the document to one section of the resume; a region
+    is itself a ``ResumeDocument`` over that slice of the text.
+    """
+
+    def __init__(self, text: str, doc: Optional[Any] = None, view: str = "full",
+                 parent: Optional["ResumeDocument"] = None, span: Optional[Tuple[int, int]] = None):
+        self.text = text
+        self._docs: Dict[str, Any] = {}
+        # a region slices a Doc its parent already has instead of running the model again
+        self._parent = parent
+        self._span = span
+        self._regions: Dict[str, "ResumeDocument"] = {}
+        if doc is not None:
+            # e.g. a doc produced by nlp.pipe() for a whole batch
+            self._docs[view] = doc
+
+    def get_doc(self, view: str = "full"):
+        """
+        spaCy ``Doc`` carrying at least the annotations of ``view``.
+
+        A doc that was already computed for a richer view is reused, so the
+        cheapest way to satisfy every extractor is a single pass.
+        """
+        if view in self._docs:
+            return self._docs[view]
+        wanted = nlp_models.get_view(view)
+        for name, doc in self._docs.items():
+            if nlp_models.get_view(name).covers(wanted):
+                return doc
+        if self._parent is not None:
+            for name, doc in self._parent._docs.items():
+                if nlp_models.get_view(name).covers(wanted):
+                    span = doc.char_span(*self._span, alignment_mode="expand")
+                    if span is not None:
+                        doc = self._docs[view] = span.as_doc()
+                        return doc
+        doc = self._docs[view] = wanted(self.text)
+        return doc
+
+    @property
+    def doc(self):
+        """spaCy ``Doc`` for the full text with the complete pipeline"""
+        return self.get_doc("full")
+
+    @cached_property
+    def lower(self) -> str:
+        """Lowercased text"""
+        return self.text.lower()
+
+    @cached_property
+    def sents(self) -> List[str]:
+        """Sentence texts, stripped"""
+        return [sent.text.strip() for sent in self.get_doc("sentences").sents]
+
+    @cached_property
+    def lines(self) -> List[str]:
+        """Raw line split of the text"""
+        return self.text.split('\n')
+
+    @cached_property
+    def contacts(self) -> List[contact_scanner.ContactMatch]:
+        """Emails, phones, links and zip codes from one scan of the text"""
+        return contact_scanner.scan(self.text)
+
+    def contact_matches(self, kind: str) -> List[contact_scanner.ContactMatch]:
+        """Contact matches of one kind, in text order"""
+        return [match for match in self.contacts if match.kind == kind]
+
+    @cached_property
+    def sections(self) -> List[segmentation.Section]:
+        """Header, education, experience, ... sections, in text order"""
+        return segmentation.segment(self.text)
+
+    def region(self, name: str) -> "ResumeDocument":
+        """
+        The part of the resume an extractor should read: the header window
+        for ``sections.HEADER``, otherwise every section called ``name``.
+
+        Falls back to the whole document when the resume has no such
+        section, so an unrecognized layout costs speed, not results.
+        """
+        if name in self._regions:
+            return self._regions[name]
+        if name == segmentation.HEADER:
+            spans = [(0, segmentation.header_window(self.text, self.sections))]
+        else:
+            spans = [(section.start, section.end) for section in self.sections if section.name == name]
+        if not spans or not any(self.text[start:end].strip() for start, end in spans):
+            region = self
+        elif len(spans) == 1:
+            region = ResumeDocument(self.text[spans[0][0]:spans[0][1]], parent=self, span=spans[0])
+        else:
+            region = ResumeDocument("\n".join(self.text[start:end] for start, end in spans))
+        self._regions[name] = region
+        return region
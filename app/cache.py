@@ -0,0 +1,180 @@
+"""
+Content-addressed cache of parse results
+
+Results are keyed by a hash of the uploaded bytes plus the pipeline and
+dictionary versions and the settings that shape the output, so a new
+release, an edited asset file or a configuration change never serves
+stale output. A size-bounded in-memory LRU sits in front of an optional
+on-disk tier with a TTL.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .config import get_settings
+from .uploads import UploadBuffer, as_buffer
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever extractor output changes for the same input
+PIPELINE_VERSION = "9"
+
+ASSETS_DIR = Path(__file__).parent / "assets"
+
+# Settings that change the result for the same upload
+OUTPUT_SETTINGS = (
+    "pdf_engine", "pdf_max_pages", "nlp_chunk_chars", "nlp_max_chars", "gazetteer_path", "geocoder_remote_url",
+)
+
+
+def dictionary_version() -> str:
+    """Fingerprint of the asset dictionaries and a configured gazetteer (cheap: stats, not contents)"""
+    digest = hashlib.sha256()
+    paths = sorted(ASSETS_DIR.glob("*"))
+    gazetteer = get_settings().gazetteer_path
+    if gazetteer:
+        paths.append(Path(gazetteer))
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            digest.update(f"{path}:missing;".encode())
+            continue
+        digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
+
+def settings_version() -> str:
+    """Fingerprint of ``OUTPUT_SETTINGS``"""
+    settings = get_settings()
+    values = ";".join(f"{name}={getattr(settings, name)!r}" for name in OUTPUT_SETTINGS)
+    return hashlib.sha256(values.encode()).hexdigest()[:16]
+
+
+def cache_key(contents: Union[bytes, UploadBuffer], *variant: Any) -> str:
+    """Key for a parse of ``contents``; ``variant`` covers request options"""
+    digest = hashlib.sha256(as_buffer(contents).view())
+    digest.update(f"|{PIPELINE_VERSION}|{dictionary_version()}|{settings_version()}|{variant!r}".encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Two-tier (memory LRU, disk TTL) cache of JSON-serialisable results"""
+
+    def __init__(self, memory_bytes: int, directory: Optional[str] = None, ttl: float = 604800):
+        self.memory_bytes = memory_bytes
+        self.directory = Path(directory) if directory else None
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Return ``(result, tier)`` or None on a miss"""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return json.loads(payload), "memory"
+
+        payload = self._read_disk(key)
+        if payload is not None:
+            self._remember(key, payload)
+            with self._lock:
+                self.counters["disk_hits"] += 1
+            return json.loads(payload), "disk"
+
+        with self._lock:
+            self.counters["misses"] += 1
+        return None
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        payload = json.dumps(result, separators=(",", ":")).encode()
+        self._remember(key, payload)
+        self._write_disk(key, payload)
+
+    def _remember(self, key: str, payload: bytes) -> None:
+        if len(payload) > self.memory_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = payload
+            self._size += len(payload)
+            while self._size > self.memory_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.counters["evictions"] += 1
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                with self._lock:
+                    self.counters["expired"] += 1
+                return None
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Reading cached result {key} failed: {e}")
+            return None
+
+    def _write_disk(self, key: str, payload: bytes) -> None:
+        if self.directory is None:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(payload)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Writing cached result {key} failed: {e}")
+
+    def purge_expired(self) -> int:
+        """Delete disk entries older than the TTL"""
+        if self.directory is None or not self.directory.exists():
+            return 0
+        removed = 0
+        cutoff = time.time() - self.ttl
+        for path in self.directory.glob("*/*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        with self._lock:
+            self.counters["expired"] += removed
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            lookups = hits + self.counters["misses"]
+            return {
+                **self.counters,
+                "hits": hits,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._entries),
+                "memory_bytes": self._size,
+                "memory_limit_bytes": self.memory_bytes,
+                "disk_enabled": self.directory is not None,
+                "ttl": self.ttl,
+            }
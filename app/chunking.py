@@ -0,0 +1,108 @@
+"""
+Bounded-memory analysis of long texts
+
+spaCy's memory grows with the text it is handed: a single ``nlp(text)``
+call allocates its intermediate arrays for the whole document, and the
+resulting Doc keeps a tok2vec row per token. ``nlp_models.ModelView``
+therefore cuts texts longer than ``Settings.nlp_chunk_chars`` at section,
+paragraph, line or word boundaries, runs the chunks through ``nlp.pipe``
+one at a time and joins their Docs into one Doc over the original text, so
+extractors see the same tokens, entities and offsets. Text past
+``Settings.nlp_max_chars`` is not run through the model at all, which caps
+the NLP cost of a document whatever its size.
+
+The budget is in characters, and chunking bounds the model pass, not the
+Doc: the joined Doc grows with the text, and joining holds the token
+attributes of every chunk next to it (see ``join``). At the default budget
+that stays below the peak of the model pass over a single chunk; raise the
+budget with that in mind.
+"""
+from typing import Iterable, List, Sequence
+
+from . import sections
+
+# Boundaries to cut at, most preferred first; each group's separators stay with the earlier chunk
+_SEPARATORS = (("\n\n",), ("\n",), (" ", "\t"))
+
+
+def cut(text: str, start: int, limit: int, starts: Sequence[int] = ()) -> int:
+    """
+    End of the chunk of ``text`` that begins at ``start`` and holds at most
+    ``limit`` characters: the last section start (``starts``), blank line,
+    line break or space in the second half of that window, or a hard cut
+    when there is none.
+    """
+    end = start + limit
+    if end >= len(text):
+        return len(text)
+    floor = start + max(limit // 2, 1)
+    candidates = [position for position in starts if floor < position <= end]
+    if candidates:
+        return max(candidates)
+    for separators in _SEPARATORS:
+        position, length = max((text.rfind(separator, floor, end), len(separator)) for separator in separators)
+        if position != -1:
+            return position + length
+    return end
+
+
+def split(text: str, limit: int) -> List[str]:
+    """``text`` cut into consecutive chunks of at most ``limit`` characters that join back into it"""
+    if limit <= 0 or len(text) <= limit:
+        return [text]
+    starts = [section.start for section in sections.segment(text)]
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = cut(text, start, limit, starts)
+        chunks.append(text[start:end])
+        start = end
+    return chunks
+
+
+def budget(text: str, limit: int) -> str:
+    """The part of ``text`` the model reads under a budget of ``limit`` characters (0: all of it)"""
+    if limit <= 0 or len(text) <= limit:
+        return text
+    return text[:cut(text, 0, limit)]
+
+
+def join(docs: Iterable):
+    """
+    One Doc from the Docs of consecutive chunks, in order.
+
+    ``docs`` is consumed one chunk at a time (pass a generator such as
+    ``nlp.pipe``): only each chunk's token attributes are kept, as one
+    ``to_array`` row per token, and the chunk's Doc, tensor included, can
+    be freed before the next chunk is parsed. The joined Doc is built from
+    those rows once the last chunk is in; it has the tokens, annotations
+    and sentence boundaries ``Doc.from_docs`` would give it, but no tensor,
+    span groups or user data (no extractor reads them).
+
+    Joining then peaks at about 0.25KB per token (about 50MB per million
+    characters of resume text, measured with ``en_core_web_sm``), against
+    0.4KB per token when every chunk's Doc is held for ``Doc.from_docs``.
+    Within the default ``nlp_max_chars`` of 500000 characters this fits in
+    the memory freed by the model pass over a 50000-character chunk, which
+    sets the peak (about 210MB); at 3 million characters the join adds
+    about 145MB to it.
+    """
+    import numpy
+    from spacy.attrs import ORTH, SPACY
+    from spacy.tokens import Doc
+
+    attrs = list(Doc._get_array_attrs())
+    arrays = []
+    vocab = None
+    for doc in docs:
+        vocab = doc.vocab
+        arrays.append(doc.to_array(attrs))
+        del doc  # or the loop variable keeps it alive while the next chunk is parsed
+    if vocab is None:
+        return None
+    rows = numpy.concatenate(arrays)
+    del arrays
+    words = [vocab.strings[orth] for orth in rows[:, attrs.index(ORTH)].tolist()]
+    spaces = rows[:, attrs.index(SPACY)].astype(bool).tolist()
+    joined = Doc(vocab, words=words, spaces=spaces)
+    return joined.from_array(attrs, rows)
@@ -0,0 +1,103 @@
+"""
+Application settings
+"""
+from functools import lru_cache
+from typing import Optional
+
+from pydantic import BaseSettings
+
+
+class Settings(BaseSettings):
+    """Application settings"""
+    app_name: str = "FastAPI Resume Parser"
+    app_version: str = "2.0.0"
+    debug: bool = False
+    host: str = "0.0.0.0"
+    port: int = 8000
+    max_file_size: int = 10485760  # 10MB
+    cors_origins: str = "*"
+    log_level: str = "info"
+
+    # Uploads larger than this are spooled to disk and memory-mapped
+    upload_spool_threshold: int = 1048576  # 1MB
+    upload_spool_dir: Optional[str] = None  # system temp dir
+
+    # Parse worker pool; None uses every core, 0 runs parses in a thread
+    worker_processes: Optional[int] = None
+    worker_start_method: str = "spawn"
+    task_timeout: float = 60.0  # seconds; stops the worker process (a thread runs on)
+    max_tasks_per_child: int = 500  # 0 never recycles workers
+
+    # Memory limits per process (parse worker, or server worker under gunicorn); 0 disables
+    memory_max_rss: int = 1610612736  # 1.5GB; the process is replaced once it is over
+    memory_max_strings: int = 0  # spaCy StringStore entries
+    memory_tracemalloc_frames: int = 0  # > 0 traces allocations for GET /memory?top=
+
+    # gunicorn.conf.py (preload-and-fork server); None uses every core
+    server_workers: Optional[int] = None
+    server_max_requests: int = 1000  # 0 never recycles workers
+    server_max_requests_jitter: int = 100
+    server_graceful_timeout: float = 30.0  # seconds to finish in-flight requests
+
+    # Admission control for the parse endpoints, per server process
+    admission_concurrency: Optional[int] = None  # None: two per parse worker (or core); 0 disables it
+    admission_queue_size: int = 32  # requests waiting for a slot before new ones are shed
+    admission_max_wait: float = 10.0  # seconds a request may wait before it is shed
+
+    # spaCy input per document: longer texts are analysed in chunks cut at
+    # section/paragraph/line boundaries; text past the budget skips the model
+    nlp_chunk_chars: int = 50000  # 0 analyses every text in one call
+    nlp_max_chars: int = 500000  # 0 is unlimited (spaCy's max_length still applies)
+
+    # PDF text extraction
+    pdf_engine: str = "auto"  # auto, pypdf or pdfminer
+    pdf_max_pages: int = 20  # 0 reads every page
+    pdf_page_workers: int = 2  # processes per long document, < 2 disables
+    pdf_parallel_min_pages: int = 8
+
+    # Offline geocoding; None uses the bundled app/assets/cities.csv
+    gazetteer_path: Optional[str] = None
+    geocoder_remote_url: Optional[str] = None  # Nominatim-compatible fallback, off by default
+    geocoder_deadline: float = 0.5  # seconds per get_location call
+    geocoder_cache_size: int = 4096  # memoized place names per process
+    geocoder_breaker_failures: int = 5  # consecutive remote errors before skipping it
+    geocoder_breaker_reset: float = 60.0  # seconds before the remote is retried
+
+    # /parse/batch
+    batch_max_files: int = 100
+    batch_size: int = 16  # documents per nlp.pipe batch and per worker task
+    batch_n_process: int = 1  # nlp.pipe processes inside each worker task
+    batch_concurrency: Optional[int] = None  # chunks of one batch parsed at a time; None: half the parse workers
+
+    # Parse result cache
+    cache_enabled: bool = True
+    cache_memory_bytes: int = 67108864  # 64MB
+    cache_dir: Optional[str] = ".cache/parse"  # empty disables the disk tier
+    cache_ttl: float = 604800  # 7 days
+
+    # /jobs
+    jobs_db_path: str = "jobs.db"
+    jobs_queue_size: int = 100
+    jobs_concurrency: int = 2
+    jobs_retention: float = 86400  # seconds finished jobs are kept
+    jobs_lease: float = 60.0  # seconds a running job stays claimed without a heartbeat from its worker
+    webhook_timeout: float = 10.0
+    webhook_allowed_hosts: str = ""  # comma-separated; empty allows any host with public addresses
+    webhook_allow_private: bool = False  # allow loopback, private and link-local webhook addresses
+
+    # GET /metrics (Prometheus) and per-request latency tracking
+    metrics_enabled: bool = True
+
+    # Request profiling; ?profile=true needs DEBUG and this token in X-Profile-Token
+    profile_token: Optional[str] = None  # unset disables ?profile=true
+    profile_dir: Optional[str] = ".cache/profiles"  # empty: profiles are only returned
+    profile_sample_rate: float = 0.0  # share of parses run under the stack sampler
+    profile_slow_threshold: float = 5.0  # seconds; sampled parses slower than this are stored
+    profile_interval: float = 0.005  # seconds between stack samples
+    
+    class Config:
+        env_file = ".env"
+
+@lru_cache()
+def get_settings():
+    return Settings()
@@ -0,0 +1,112 @@
+"""
+Single-pass contact and link scanner
+
+One precompiled regular expression walks the resume text once and yields
+every email, URL (with LinkedIn and GitHub profiles picked out of them),
+phone number and zip code, with character offsets and a normalized value.
+Bare domains are only accepted when their TLD is in the IANA list bundled
+as app/assets/tlds.txt, loaded once per process.
+"""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import FrozenSet, List, Optional
+
+TLDS_PATH = Path(__file__).parent / "assets" / "tlds.txt"
+
+EMAIL = "email"
+PHONE = "phone"
+URL = "url"
+LINKEDIN = "linkedin"
+GITHUB = "github"
+ZIP = "zip"
+
+ZIP_PATTERN = re.compile(r"\b(?:\d{5}(?:-\d{4})?|\d{6})\b")
+
+_URL_CHARS = r"[^\s<>\"'\[\]{}|\\^`]"
+_SCANNER = re.compile(
+    rf"""
+      (?P<email>(?<![a-z0-9_.+\-])[a-z0-9_.+\-]+@[a-z0-9.\-+]+\.[a-z]+)
+    | (?P<url>(?:https?://|www\.){_URL_CHARS}+)
+    | (?P<domain>(?<![\w@.\-])(?:[a-z0-9](?:[a-z0-9\-]*[a-z0-9])?\.)+(?P<tld>[a-z]{{2,63}}|xn--[a-z0-9\-]+)(?![\w\-])
+        (?::\d{{1,5}})?(?:/{_URL_CHARS}*)?)
+    | (?P<phone>[+(]?[1-9][0-9.\-()]{{8,}}[0-9])
+    | (?P<zip>{ZIP_PATTERN.pattern})
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+_LINKEDIN = re.compile(r"(?:[\w]+\.)?linkedin\.com/(?:pub|in|profile)/([-a-zA-Z0-9]+)/*", re.IGNORECASE)
+_GITHUB = re.compile(r"(?:https?://)?(?:www\.)?github\.com/([^\s^/]+)", re.IGNORECASE)
+_TRAILING = ".,;:!?)'\""
+_NON_DIGITS = re.compile(r"\D")
+
+
+@dataclass(frozen=True)
+class ContactMatch:
+    """One contact detail found in the text"""
+    kind: str  # EMAIL, PHONE, URL, LINKEDIN, GITHUB or ZIP
+    text: str  # as written
+    value: str  # normalized
+    start: int  # character offsets into the text
+    end: int
+
+
+@lru_cache(maxsize=None)
+def load_tlds(path: Path = TLDS_PATH) -> FrozenSet[str]:
+    """Lowercase top-level domains from an IANA ``tlds-alpha-by-domain.txt`` file"""
+    with open(path, encoding="utf-8") as handle:
+        return frozenset(line.strip().lower() for line in handle if line.strip() and not line.startswith("#"))
+
+
+def _normalize_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        scheme, rest = "https", url
+    host, slash, path = rest.partition("/")
+    return f"{scheme.lower()}://{host.lower()}{slash}{path}"
+
+
+def _links(text: str, start: int) -> List[ContactMatch]:
+    """The URL match plus the LinkedIn/GitHub profile it points to, if any"""
+    stripped = text.rstrip(_TRAILING)
+    end = start + len(stripped)
+    matches = [ContactMatch(URL, stripped, _normalize_url(stripped), start, end)]
+    profile = _LINKEDIN.search(stripped)
+    if profile:
+        matches.append(ContactMatch(
+            LINKEDIN, profile.group(0), f"https://www.linkedin.com/in/{profile.group(1)}",
+            start + profile.start(), start + profile.end(),
+        ))
+    profile = _GITHUB.search(stripped)
+    if profile:
+        matches.append(ContactMatch(
+            GITHUB, profile.group(0), profile.group(1), start + profile.start(), start + profile.end(),
+        ))
+    return matches
+
+
+def scan(text: str, tlds: Optional[FrozenSet[str]] = None) -> List[ContactMatch]:
+    """Every contact detail in ``text``, in text order"""
+    tlds = tlds if tlds is not None else load_tlds()
+    matches: List[ContactMatch] = []
+    for match in _SCANNER.finditer(text):
+        kind = match.lastgroup
+        found, start = match.group(0), match.start()
+        if kind == "email":
+            matches.append(ContactMatch(EMAIL, found, found.lower(), start, match.end()))
+        elif kind == "url":
+            matches.extend(_links(found, start))
+        elif kind == "domain":
+            if match.group("tld").lower() in tlds:
+                matches.extend(_links(found, start))
+        elif kind == "phone":
+            digits = _NON_DIGITS.sub("", found)
+            matches.append(ContactMatch(PHONE, found, f"+{digits}" if found.startswith("+") else digits,
+                                        start, match.end()))
+            # a ZIP+4 code also has the shape of a phone number
+            if ZIP_PATTERN.fullmatch(found):
+                matches.append(ContactMatch(ZIP, found, found, start, match.end()))
+        else:
+            matches.append(ContactMatch(ZIP, found, found, start, match.end()))
+    return matches
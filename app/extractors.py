@@ -0,0 +1,182 @@
+"""
+Extractor registry and field selection for /parse
+
+Every output field of the parse response is produced by one extractor that
+declares which parts of the ``ResumeDocument`` it reads and, optionally, the
+resume section (``app.sections``) it reads them from. A request names the
+fields (or sections, or profiles such as ``contact``) it wants; only their
+extractors run, and the spaCy model is only touched when one of them needs
+a ``Doc``.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from . import nlp_models
+from . import sections
+from . import timing
+from . import utils as utl
+from .analysis import ResumeDocument
+
+# Inputs an extractor can depend on
+TEXT = "text"
+LINES = "lines"
+TOKENS = "tokens"  # tokenizer-only Doc
+TAGGER = "tagger"  # Doc with POS tags
+NER = "ner"  # Doc with entities
+SENTENCES = "sentences"  # Doc with sentence boundaries
+
+# Pipeline components each Doc input needs; TEXT and LINES need none
+_COMPONENTS: Dict[str, Tuple[str, ...]] = {
+    TOKENS: (),
+    TAGGER: nlp_models.VIEWS["tagger"],
+    NER: nlp_models.VIEWS["ner"],
+    SENTENCES: nlp_models.VIEWS["sentences"],
+}
+
+
+@dataclass(frozen=True)
+class Extractor:
+    """Produces one response field from a document"""
+    field: str  # dotted path in the response, e.g. "personal_info.email"
+    func: Callable[[ResumeDocument], Any]
+    needs: FrozenSet[str]
+    region: Optional[str] = None  # section of the resume it reads; None for the whole text
+
+
+EXTRACTORS: Tuple[Extractor, ...] = (
+    Extractor("personal_info.name", utl.extract_name, frozenset({TAGGER, NER}), sections.HEADER),
+    Extractor("personal_info.email", utl.get_email, frozenset({TEXT})),
+    Extractor("personal_info.phone_number", utl.get_phone, frozenset({TEXT})),
+    Extractor("social_links.linkedin", utl.linkedin, frozenset({TEXT})),
+    Extractor("social_links.github", utl.extract_github, frozenset({TEXT})),
+    Extractor("social_links.others", utl.extract_urls, frozenset({TEXT})),
+    Extractor("skills", utl.extract_skills_new, frozenset({TOKENS})),
+    Extractor("education_details.courses", utl.extract_course_name, frozenset({TEXT}), sections.EDUCATION),
+    Extractor("education_details.specializations", utl.extract_specializations, frozenset({TOKENS})),
+    Extractor("education_details.college", utl.get_college, frozenset({LINES}), sections.EDUCATION),
+    Extractor("address.location", utl.get_location, frozenset({NER, LINES})),
+    Extractor("address.zip_code", utl.extract_zip_code, frozenset({TEXT})),
+    Extractor("languages", utl.get_language, frozenset({LINES}), sections.LANGUAGES),
+)
+
+FIELDS: Tuple[str, ...] = tuple(extractor.field for extractor in EXTRACTORS)
+
+# Inputs that never need the NLP model
+NO_MODEL: FrozenSet[str] = frozenset({TEXT, LINES})
+
+# Named field sets; "contact" never needs the NLP model
+PROFILES: Dict[str, Tuple[str, ...]] = {
+    "contact": ("personal_info.email", "personal_info.phone_number", "social_links"),
+    "skills": ("skills",),
+    "education": ("education_details",),
+    "full": FIELDS,
+}
+
+
+def resolve_fields(spec: Optional[str]) -> Tuple[str, ...]:
+    """
+    Field paths selected by a ``fields=`` value, in response order.
+
+    ``spec`` is a comma-separated list of profiles, sections (``address``)
+    or fields (``personal_info.email``); empty selects every field. Raises
+    ``ValueError`` for unknown names.
+    """
+    names = [part.strip() for part in (spec or "").split(",") if part.strip()]
+    if not names:
+        return FIELDS
+    wanted = set()
+    for name in names:
+        for entry in PROFILES.get(name, (name,)):
+            matched = [field for field in FIELDS if field == entry or field.startswith(f"{entry}.")]
+            if not matched:
+                raise ValueError(
+                    f"Unknown field '{name}'. Use a profile ({', '.join(PROFILES)}), a section or a field"
+                )
+            wanted.update(matched)
+    return tuple(field for field in FIELDS if field in wanted)
+
+
+@dataclass(frozen=True)
+class Plan:
+    """Extractors to run and the single model view that serves the whole-text ones"""
+    extractors: Tuple[Extractor, ...]
+    view: Optional[str]  # None when no whole-text extractor needs a Doc
+
+
+def view_for(needs: Iterable[str]) -> Optional[str]:
+    """Cheapest model view whose components cover the Doc inputs in ``needs``"""
+    doc_needs = [need for need in needs if need in _COMPONENTS]
+    if not doc_needs:
+        return None
+    components = set().union(*(_COMPONENTS[need] for need in doc_needs))
+    for name, view_components in nlp_models.VIEWS.items():
+        if components <= set(view_components):
+            return name
+    return "full"
+
+
+def plan(fields: Iterable[str]) -> Plan:
+    """
+    Extractors for ``fields`` and the model view the whole-text ones need.
+
+    Region extractors are left out of the view: they slice that Doc when
+    it covers them, and otherwise run the model over their region only.
+    """
+    selected = set(fields)
+    extractors = tuple(extractor for extractor in EXTRACTORS if extractor.field in selected)
+    whole_text = [extractor.needs for extractor in extractors if extractor.region is None]
+    return Plan(extractors, view_for(frozenset().union(*whole_text)))
+
+
+def stages(fields: Iterable[str]) -> Tuple[Plan, Plan, Plan]:
+    """
+    ``plan(fields)`` split into the stages of a streamed parse, cheapest first.
+
+    The stages hold the extractors that need no model, those that run it
+    over their own region only (the name, over the header), and those that
+    need the whole-text Doc. Any of them may be empty.
+    """
+    selected = plan(fields).extractors
+    no_model = [extractor for extractor in selected if extractor.needs <= NO_MODEL]
+    region = [extractor for extractor in selected if extractor not in no_model and extractor.region is not None]
+    whole_text = [extractor for extractor in selected if extractor not in no_model and extractor.region is None]
+    return tuple(plan(extractor.field for extractor in group) for group in (no_model, region, whole_text))
+
+
+def section_of(field: str) -> str:
+    """Top-level response key of a field path"""
+    return field.split(".", 1)[0]
+
+
+def nest(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Nest ``{"address.zip_code": ...}`` into ``{"address": {"zip_code": ...}}``, keeping the key order"""
+    result: Dict[str, Any] = {}
+    for field, value in values.items():
+        *sections, key = field.split(".")
+        target = result
+        for section in sections:
+            target = target.setdefault(section, {})
+        target[key] = value
+    return result
+
+
+def extract(document: ResumeDocument, execution: Plan,
+            timer: Optional[timing.StageTimer] = None) -> Dict[str, Any]:
+    """Run the planned extractors, timing each stage; returns their values by field path"""
+    timer = timer or timing.StageTimer()
+    if execution.view is not None:
+        # One pass of the covering view; narrower views reuse this Doc
+        with timer.stage(timing.NLP):
+            document.get_doc(execution.view)
+    values: Dict[str, Any] = {}
+    for extractor in execution.extractors:
+        # a region extractor's own model pass is part of its stage
+        with timer.stage(f"{timing.EXTRACT}.{extractor.field}"):
+            source = document if extractor.region is None else document.region(extractor.region)
+            values[extractor.field] = extractor.func(source)
+    return values
+
+
+def run(document: ResumeDocument, execution: Plan, timer: Optional[timing.StageTimer] = None) -> Dict[str, Any]:
+    """Run the planned extractors and nest their results by field path, timing each stage"""
+    return nest(extract(document, execution, timer))
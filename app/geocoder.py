@@ -0,0 +1,111 @@
+"""
+Offline geocoder over a bundled city gazetteer
+
+Cities and their aliases from app/assets/cities.csv (or ``GAZETTEER_PATH``)
+are loaded once per process into a sorted array of names and resolved with
+a binary search, so ``get_location`` never touches the network.
+"""
+import bisect
+import csv
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+GAZETTEER_PATH = Path(__file__).parent / "assets" / "cities.csv"
+
+_SPACES = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class Place:
+    """One gazetteer entry"""
+    city: str
+    state: Optional[str]
+    country: Optional[str]
+    postal_code: Optional[str]
+    population: int = 0
+
+
+def normalize(name: str) -> str:
+    """Lookup key for a place name: casefolded, single-spaced, no edge punctuation"""
+    return _SPACES.sub(" ", name).strip(" \t.,;:()").casefold()
+
+
+class Gazetteer:
+    """
+    Sorted-array index from place names to ``Place`` records.
+
+    Every name and alias is one key; when two places share a name the more
+    populous one wins. Lookups are a ``bisect`` over the key array.
+    """
+
+    def __init__(self, places: List[Place], aliases: Optional[Dict[int, List[str]]] = None):
+        aliases = aliases or {}
+        best: Dict[str, int] = {}
+        for index, place in enumerate(places):
+            for name in [place.city, *aliases.get(index, [])]:
+                key = normalize(name)
+                if not key:
+                    continue
+                current = best.get(key)
+                if current is None or place.population > places[current].population:
+                    best[key] = index
+        self.places: Tuple[Place, ...] = tuple(places)
+        self._keys: List[str] = sorted(best)
+        self._slots: List[int] = [best[key] for key in self._keys]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def lookup(self, name: str) -> Optional[Place]:
+        """The place called ``name`` (or one of its aliases), if known"""
+        key = normalize(name)
+        position = bisect.bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            return self.places[self._slots[position]]
+        return None
+
+
+def load_gazetteer(path: Union[str, Path] = GAZETTEER_PATH) -> Gazetteer:
+    """Read a gazetteer CSV (city, aliases, state, country, postal_code, population)"""
+    places: List[Place] = []
+    aliases: Dict[int, List[str]] = {}
+    with open(path, newline="", encoding="utf-8") as csvfile:
+        for row in csv.DictReader(csvfile):
+            city = (row.get("city") or "").strip()
+            if not city:
+                continue
+            try:
+                population = int(row.get("population") or 0)
+            except ValueError:
+                population = 0
+            aliases[len(places)] = [alias for alias in (row.get("aliases") or "").split("|") if alias.strip()]
+            places.append(Place(
+                city=city,
+                state=(row.get("state") or "").strip() or None,
+                country=(row.get("country") or "").strip() or None,
+                postal_code=(row.get("postal_code") or "").strip() or None,
+                population=population,
+            ))
+    return Gazetteer(places, aliases)
+
+
+@lru_cache(maxsize=None)
+def get_gazetteer() -> Gazetteer:
+    """The process-wide gazetteer, from ``Settings.gazetteer_path`` or the bundled file"""
+    path = get_settings().gazetteer_path or GAZETTEER_PATH
+    gazetteer = load_gazetteer(path)
+    logger.info(f"Loaded gazetteer with {len(gazetteer)} place names from {Path(path).name}")
+    return gazetteer
+
+
+def geocode(city: str) -> Optional[Place]:
+    """Resolve a city name against the gazetteer without any network I/O"""
+    return get_gazetteer().lookup(city)
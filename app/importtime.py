@@ -0,0 +1,72 @@
+"""
+Import-time profile of the application
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter and
+reports the cost per top-level package, so a dependency that creeps back
+into the import path of the Lambda handler shows up at once::
+
+    python -m app.importtime                # profile app.main
+    python -m app.importtime app.pipeline --top 15 --modules
+"""
+import argparse
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile(module: str = "app.main") -> List[Tuple[str, int, int]]:
+    """``(module, self_us, cumulative_us)`` for every module imported by ``module``"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        errors = completed.stderr.strip().splitlines()
+        raise RuntimeError(errors[-1] if errors else f"importing {module} failed")
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return rows
+
+
+def by_package(rows: List[Tuple[str, int, int]]) -> Dict[str, int]:
+    """Self time in microseconds summed per top-level package"""
+    totals: Dict[str, int] = defaultdict(int)
+    for module, self_us, _ in rows:
+        totals[module.split(".")[0]] += self_us
+    return dict(totals)
+
+
+def report(module: str = "app.main", top: int = 20, modules: bool = False) -> str:
+    """Human-readable import cost table"""
+    rows = profile(module)
+    total = sum(self_us for _, self_us, _ in rows)
+    lines = [f"Importing {module}: {total / 1000:.1f} ms over {len(rows)} modules", ""]
+    lines.append(f"{'package':<32}{'ms':>10}{'share':>8}")
+    for package, self_us in sorted(by_package(rows).items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"{package:<32}{self_us / 1000:>10.1f}{self_us / max(total, 1):>8.1%}")
+    if modules:
+        lines += ["", f"{'module (cumulative)':<48}{'ms':>10}"]
+        for name, _, cumulative in sorted(rows, key=lambda row: -row[2])[:top]:
+            lines.append(f"{name:<48}{cumulative / 1000:>10.1f}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-package import cost of the app")
+    parser.add_argument("module", nargs="?", default="app.main")
+    parser.add_argument("--top", type=int, default=20, help="rows to show")
+    parser.add_argument("--modules", action="store_true", help="also list the slowest modules")
+    args = parser.parse_args()
+    print(report(args.module, args.top, args.modules))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+Asynchronous parse jobs backed by a local SQLite store
+
+Uploads are persisted before they are queued, so work accepted by
+``POST /jobs`` survives a restart: queued and interrupted jobs are put
+back on the queue when the app starts. Several server workers may share
+one store; a job is claimed atomically before it runs, under a lease its
+worker renews while parsing, so it is parsed once. A running job whose
+lease has run out (its process died) is queued again.
+"""
+import asyncio
+import ipaddress
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+from urllib.parse import urlsplit
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class QueueFull(Exception):
+    """Raised when the job queue has reached its configured depth"""
+
+
+def check_webhook_url(url: str, allowed_hosts: Iterable[str] = (), allow_private: bool = False) -> None:
+    """
+    Refuse webhook URLs the server should not call on a client's behalf.
+
+    The URL must be http(s). With ``allowed_hosts`` its host must be one of
+    them; otherwise every address the host resolves to must be public, so
+    loopback, private, link-local (cloud metadata) and reserved addresses
+    are refused unless ``allow_private``. Raises ``ValueError``.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("webhook_url must be an http(s) URL")
+    host = parts.hostname.lower()
+    allowed = {name.strip().lower() for name in allowed_hosts if name.strip()}
+    if allowed and host not in allowed:
+        raise ValueError(f"webhook_url host {host} is not allowed")
+    if allow_private:
+        return
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)}
+    except (OSError, ValueError) as e:
+        raise ValueError(f"webhook_url host {host} cannot be resolved") from e
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%", 1)[0])
+        if getattr(ip, "ipv4_mapped", None):
+            ip = ip.ipv4_mapped
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError(f"webhook_url host {host} resolves to a non-public address")
+
+
+class JobStore:
+    """SQLite persistence for jobs, their uploads and their results"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def open(self) -> None:
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    filename TEXT,
+                    payload BLOB,
+                    result TEXT,
+                    error TEXT,
+                    webhook_url TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    owner TEXT,
+                    lease_until REAL
+                )
+                """
+            )
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "owner" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            if "lease_until" not in columns:
+                # running jobs of an older release have no lease: they are reclaimed
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN lease_until REAL")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).fetchall()
+
+    def add(self, job_id: str, filename: str, payload: bytes, webhook_url: Optional[str]) -> None:
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, status, filename, payload, webhook_url, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, QUEUED, filename, payload, webhook_url, now, now),
+        )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._execute(
+            "SELECT id, status, filename, result, error, webhook_url, created_at, updated_at "
+            "FROM jobs WHERE id = ?",
+            (job_id,),
+        )
+        return dict(rows[0]) if rows else None
+
+    def payload(self, job_id: str) -> Optional[bytes]:
+        rows = self._execute("SELECT payload FROM jobs WHERE id = ?", (job_id,))
+        return rows[0]["payload"] if rows else None
+
+    def claim(self, job_id: str, owner: str, lease: float) -> bool:
+        """
+        Mark a job running for ``owner`` for ``lease`` seconds.
+
+        Queued jobs and running jobs whose lease has run out can be
+        claimed. Process ids are reused after a restart, so ownership is a
+        lease that ``renew`` extends, not a check on the owner's pid. The
+        check and the update are one statement, so two workers never both
+        win.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, lease_until = ?, updated_at = ? "
+                "WHERE id = ? AND (status = ? OR (status = ? AND (lease_until IS NULL OR lease_until < ?)))",
+                (RUNNING, owner, now + lease, now, job_id, QUEUED, RUNNING, now),
+            )
+            return cursor.rowcount == 1
+
+    def renew(self, job_id: str, owner: str, lease: float) -> bool:
+        """Extend ``owner``'s lease on a running job; False if it has lost the job"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = ? AND owner = ?",
+                (time.time() + lease, job_id, RUNNING, owner),
+            )
+            return cursor.rowcount == 1
+
+    def finish(self, job_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None) -> None:
+        # The upload is no longer needed once the job has an outcome
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, payload = NULL, lease_until = NULL, updated_at = ? "
+            "WHERE id = ?",
+            (status, result, error, time.time(), job_id),
+        )
+
+    def expired(self) -> List[str]:
+        """Running jobs whose lease has run out (their worker process died)"""
+        rows = self._execute(
+            "SELECT id FROM jobs WHERE status = ? AND (lease_until IS NULL OR lease_until < ?) ORDER BY created_at",
+            (RUNNING, time.time()),
+        )
+        return [row["id"] for row in rows]
+
+    def unfinished(self) -> List[str]:
+        """Queued jobs and running jobs whose lease has run out"""
+        rows = self._execute(
+            "SELECT id FROM jobs WHERE status = ? OR (status = ? AND (lease_until IS NULL OR lease_until < ?)) "
+            "ORDER BY created_at",
+            (QUEUED, RUNNING, time.time()),
+        )
+        return [row["id"] for row in rows]
+
+    def purge(self, older_than: float) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (SUCCEEDED, FAILED, older_than),
+            )
+            return cursor.rowcount
+
+
+class JobQueue:
+    """
+    Bounded in-process queue of parse jobs.
+
+    ``runner(contents, filename)`` does the actual parsing (normally through
+    the worker pool); ``concurrency`` consumers pull jobs from the queue. A
+    running job is held under a ``lease`` renewed every third of it; jobs
+    whose lease runs out are picked up again.
+    """
+
+    def __init__(self, store: JobStore, runner: Callable[[bytes, str], Awaitable[Dict[str, Any]]],
+                 max_depth: int = 100, concurrency: int = 2, retention: float = 86400,
+                 webhook_timeout: float = 10.0, webhook_allowed_hosts: Iterable[str] = (),
+                 webhook_allow_private: bool = False, lease: float = 60.0):
+        self.store = store
+        self.runner = runner
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.retention = retention
+        self.lease = lease
+        self.webhook_timeout = webhook_timeout
+        self.webhook_allowed_hosts = tuple(webhook_allowed_hosts)
+        self.webhook_allow_private = webhook_allow_private
+        self.owner = ""  # set per process by start(): forked server workers share this object
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued: Set[str] = set()
+        self._consumers: List[asyncio.Task] = []
+        self._outstanding = 0
+
+    @property
+    def depth(self) -> int:
+        """Jobs accepted but not finished yet"""
+        return self._outstanding
+
+    async def start(self) -> None:
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:12]}"
+        await run_in_threadpool(self.store.open)
+        purged = await run_in_threadpool(self.store.purge, time.time() - self.retention)
+        self._queue = asyncio.Queue()
+        recovered = await run_in_threadpool(self.store.unfinished)
+        for job_id in recovered:
+            self._enqueue(job_id)
+        if recovered or purged:
+            logger.info(f"Job queue recovered {len(recovered)} unfinished jobs, purged {purged} old jobs")
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(max(self.concurrency, 1))]
+        self._consumers.append(asyncio.create_task(self._reclaim()))
+
+    async def stop(self) -> None:
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        # Jobs still queued or running stay in the store and resume on restart
+        await run_in_threadpool(self.store.close)
+
+    def _enqueue(self, job_id: str) -> None:
+        self._outstanding += 1
+        self._queued.add(job_id)
+        self._queue.put_nowait(job_id)
+
+    async def submit(self, filename: str, contents: bytes, webhook_url: Optional[str] = None) -> str:
+        """Persist and queue a job, returning its id"""
+        if self._outstanding >= self.max_depth:
+            raise QueueFull(f"Job queue is full ({self.max_depth} jobs)")
+        # Reserve the slot before awaiting the insert so bursts cannot overshoot
+        self._outstanding += 1
+        job_id = uuid.uuid4().hex
+        try:
+            await run_in_threadpool(self.store.add, job_id, filename, contents, webhook_url)
+        except Exception:
+            self._outstanding -= 1
+            raise
+        self._queued.add(job_id)
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status, with the parsed result or error once finished"""
+        job = await run_in_threadpool(self.store.get, job_id)
+        if job is None:
+            return None
+        response = {
+            "job_id": job["id"],
+            "status": job["status"],
+            "filename": job["filename"],
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+        }
+        if job["result"] is not None:
+            response["result"] = json.loads(job["result"])
+        if job["error"] is not None:
+            response["error"] = job["error"]
+        return response
+
+    async def _consume(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._queued.discard(job_id)
+            try:
+                await self._process(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job {job_id} could not be processed: {e}")
+            finally:
+                self._outstanding -= 1
+                self._queue.task_done()
+
+    async def _reclaim(self) -> None:
+        """Queue jobs again whose worker stopped renewing their lease (e.g. a server worker that died)"""
+        while True:
+            await asyncio.sleep(self.lease)
+            try:
+                expired = await run_in_threadpool(self.store.expired)
+            except Exception as e:
+                logger.warning(f"Looking for expired jobs failed: {e}")
+                continue
+            expired = [job_id for job_id in expired if job_id not in self._queued]
+            for job_id in expired:
+                self._enqueue(job_id)
+            if expired:
+                logger.warning(f"Job queue reclaimed {len(expired)} jobs whose lease expired")
+
+    async def _renew(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            if not await run_in_threadpool(self.store.renew, job_id, self.owner, self.lease):
+                logger.warning(f"Job {job_id} lease was lost")
+                return
+
+    async def _process(self, job_id: str) -> None:
+        if not await run_in_threadpool(self.store.claim, job_id, self.owner, self.lease):
+            # finished already, or being parsed by another server worker
+            return
+        job = await run_in_threadpool(self.store.get, job_id)
+        contents = await run_in_threadpool(self.store.payload, job_id)
+        if job is None or contents is None:
+            return
+
+        result = error = None
+        heartbeat = asyncio.create_task(self._renew(job_id))
+        try:
+            result = jsonable_encoder(await self.runner(contents, job["filename"]))
+            status = SUCCEEDED
+        except asyncio.TimeoutError:
+            status, error = FAILED, "Resume parsing timed out"
+        except ValueError as e:
+            status, error = FAILED, str(e)
+        except Exception as e:
+            logger.error(f"Error processing job {job_id}: {e}")
+            status, error = FAILED, f"Error processing resume: {str(e)}"
+        finally:
+            heartbeat.cancel()
+
+        await run_in_threadpool(
+            self.store.finish, job_id, status, json.dumps(result) if result is not None else None, error
+        )
+        logger.info(f"Job {job_id} {status}")
+
+        if job["webhook_url"]:
+            payload = {"job_id": job_id, "status": status, "result": result, "error": error}
+            await run_in_threadpool(self._notify, job["webhook_url"], payload)
+
+    def check_webhook(self, url: str) -> None:
+        """``check_webhook_url`` with this queue's settings (resolves the host: run it in a thread)"""
+        check_webhook_url(url, self.webhook_allowed_hosts, self.webhook_allow_private)
+
+    def _notify(self, url: str, payload: Dict[str, Any]) -> None:
+        """POST the job outcome to its completion webhook"""
+        import requests
+
+        try:
+            # Checked again: the host may resolve elsewhere by now, and redirects are not followed
+            self.check_webhook(url)
+            requests.post(url, json=payload, timeout=self.webhook_timeout, allow_redirects=False).raise_for_status()
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"Webhook for job {payload['job_id']} failed: {e}")
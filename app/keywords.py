@@ -0,0 +1,88 @@
+"""
+Compiled keyword gazetteer
+
+A ``KeywordIndex`` folds a vocabulary (college keywords, languages, degree
+names) into a character trie and compiles that trie into one regular
+expression, e.g. ``b\\.(?:a\\.|sc?\\.)`` for "b.a.", "b.s." and "b.sc.". The
+text is then searched in a single case-insensitive pass with word
+boundaries; at every position the engine follows one branch per character,
+so the cost of a search depends on the text and the length of the
+keywords, not on how many keywords there are.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Union
+
+_END = ""
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    """One keyword occurrence"""
+    label: str  # the canonical name the matched variant belongs to
+    text: str  # as written, including any prefix continuation or tail
+    start: int
+    end: int
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """Regular expression for the keywords stored below ``node``"""
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char != _END]
+    if not branches:
+        return ""
+    optional = _END in node
+    if len(branches) == 1 and not optional:
+        return branches[0]
+    group = f"(?:{'|'.join(branches)})"
+    # Greedy: the longest keyword wins, shorter ones are tried on backtracking
+    return f"{group}?" if optional else group
+
+
+class KeywordIndex:
+    """
+    Single-pass, case-insensitive search for many keywords at once.
+
+    ``keywords`` is an iterable of keywords or a mapping of variant to
+    label. Matches start at a word boundary; with ``prefix`` a keyword may
+    continue into the rest of its word ("univers" finds "University"),
+    otherwise it must end at a word boundary too. ``tail`` is an optional
+    pattern that extends a match, such as ``(?: in [\\w ]+)?``.
+    """
+
+    def __init__(self, keywords: Union[Iterable[str], Mapping[str, str]], prefix: bool = False, tail: str = ""):
+        if not isinstance(keywords, Mapping):
+            keywords = {keyword: keyword for keyword in keywords}
+        self.labels: Dict[str, str] = {}
+        trie: Dict[str, dict] = {}
+        for variant, label in keywords.items():
+            key = variant.strip().lower()
+            if not key:
+                continue
+            self.labels.setdefault(key, label)
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[_END] = {}
+        if not trie:
+            raise ValueError("A keyword index needs at least one keyword")
+        ending = r"\w*" if prefix else r"(?!\w)"
+        self.pattern = re.compile(rf"(?<!\w)(?P<key>{_trie_pattern(trie)}){ending}{tail}", re.IGNORECASE)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def find(self, text: str) -> List[KeywordMatch]:
+        """Non-overlapping keyword matches in text order"""
+        matches = []
+        for match in self.pattern.finditer(text):
+            key = match.group("key")
+            matches.append(KeywordMatch(self.labels.get(key.lower(), key), match.group(0), match.start(), match.end()))
+        return matches
+
+    def search(self, text: str) -> bool:
+        """True when ``text`` contains any keyword"""
+        return self.pattern.search(text) is not None
+
+    def found_labels(self, text: str) -> List[str]:
+        """Labels of the keywords in ``text``, each once, in order of first occurrence"""
+        return list(dict.fromkeys(match.label for match in self.find(text)))
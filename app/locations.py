@@ -0,0 +1,204 @@
+"""
+Memoized location resolver
+
+Place names are resolved against the offline gazetteer first. An optional
+Nominatim-compatible service (``GEOCODER_REMOTE_URL``) is only asked about
+names the gazetteer does not know, within a per-call deadline and behind a
+circuit breaker, and every answer is kept in a bounded LRU.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from . import geocoder
+from .config import get_settings
+from .geocoder import Place
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing dependency for ``reset_timeout`` seconds after
+    ``failure_threshold`` consecutive failures, then lets one call through.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        """True when a call may be attempted"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                # half-open: admit this trial call, hold the rest back
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"Circuit opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+
+
+class NominatimClient:
+    """Minimal client for a Nominatim-compatible ``/search`` endpoint"""
+
+    def __init__(self, url: str, user_agent: str = "resume-parser-api"):
+        self.url = url.rstrip("/")
+        self.headers = {"User-Agent": user_agent}
+
+    def __call__(self, name: str, timeout: float) -> Optional[Place]:
+        import requests
+
+        response = requests.get(
+            f"{self.url}/search",
+            params={"q": name, "format": "jsonv2", "addressdetails": 1, "limit": 1, "accept-language": "en"},
+            headers=self.headers,
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        results = response.json()
+        if not results:
+            return None
+        address = results[0].get("address") or {}
+        return Place(
+            city=address.get("city") or address.get("town") or address.get("village") or name,
+            state=address.get("state"),
+            country=address.get("country"),
+            postal_code=address.get("postcode"),
+        )
+
+
+class LocationResolver:
+    """Gazetteer-first, remote-second place resolution with a bounded LRU"""
+
+    def __init__(self, local: Callable[[str], Optional[Place]],
+                 remote: Optional[Callable[[str, float], Optional[Place]]] = None,
+                 max_entries: int = 4096, deadline: float = 0.5,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.local = local
+        self.remote = remote
+        self.max_entries = max_entries
+        self.deadline = deadline
+        self.breaker = breaker or CircuitBreaker()
+        self._entries: "OrderedDict[str, Optional[Place]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "remote_calls": 0,
+                         "remote_errors": 0, "remote_skipped": 0}
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self.counters[counter] += 1
+
+    def _remember(self, key: str, place: Optional[Place]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = place
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def resolve(self, name: str, deadline: Optional[float] = None) -> Optional[Place]:
+        """
+        The place called ``name``, or None.
+
+        ``deadline`` is an absolute ``time.monotonic()`` value; the remote
+        geocoder is skipped once it has passed. Remote failures are not
+        memoized, so the name is retried when the service recovers.
+        """
+        key = geocoder.normalize(name)
+        if not key:
+            return None
+        with self._lock:
+            place = self._entries.get(key, _MISSING)
+            if place is not _MISSING:
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+                return place
+            self.counters["misses"] += 1
+
+        place = self.local(name)
+        if place is not None or self.remote is None:
+            self._remember(key, place)
+            return place
+
+        remaining = (deadline if deadline is not None else time.monotonic() + self.deadline) - time.monotonic()
+        if remaining <= 0 or not self.breaker.allow():
+            self._count("remote_skipped")
+            return None
+        self._count("remote_calls")
+        try:
+            place = self.remote(name, remaining)
+        except Exception as e:
+            self.breaker.record_failure()
+            self._count("remote_errors")
+            logger.warning(f"Remote geocoding of {name!r} failed: {e}")
+            return None
+        self.breaker.record_success()
+        self._remember(key, place)
+        return place
+
+    def first(self, names: Iterable[str]) -> Optional[Tuple[str, Place]]:
+        """The first of ``names`` that resolves, sharing one deadline across all of them"""
+        deadline = time.monotonic() + self.deadline
+        for name in names:
+            place = self.resolve(name, deadline)
+            if place is not None:
+                return name, place
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.counters,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "remote_enabled": self.remote is not None,
+                "breaker": self.breaker.state,
+            }
+
+
+@lru_cache(maxsize=None)
+def get_resolver() -> LocationResolver:
+    """The process-wide resolver configured from ``Settings``"""
+    settings = get_settings()
+    remote = NominatimClient(settings.geocoder_remote_url) if settings.geocoder_remote_url else None
+    geocoder.get_gazetteer()
+    return LocationResolver(
+        geocoder.geocode,
+        remote,
+        max_entries=settings.geocoder_cache_size,
+        deadline=settings.geocoder_deadline,
+        breaker=CircuitBreaker(settings.geocoder_breaker_failures, settings.geocoder_breaker_reset),
+    )
@@ -1,33 +1,232 @@
-import spacy
-from io import BytesIO
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, File, Form, Header, Query, UploadFile, HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pdfminer.high_level import extract_text
-from pypdf import PdfReader
-from spacy.matcher import Matcher
+from starlette.concurrency import run_in_threadpool
 from mangum import Mangum
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple, Union
+import hmac
 import logging
 import os
-from functools import lru_cache
-from pydantic import BaseSettings
-
-from . import utils as utl
+import random
+import time
+
+from . import admission
+from . import cache
+from . import extractors
+from . import jobs
+from . import memory
+from . import metrics
+from . import nlp_models
+from . import pipeline
+from . import profiling
+from . import streaming
+from . import uploads
+from . import workers
+from .config import get_settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+settings = get_settings()
+
+
+result_cache = cache.ResultCache(settings.cache_memory_bytes, settings.cache_dir, settings.cache_ttl)
+
+
+async def read_upload(file: UploadFile, max_size: Optional[int] = None) -> uploads.UploadBuffer:
+    """Stream an upload into a shared buffer, enforcing ``Settings.max_file_size``"""
+    return await uploads.read_upload(
+        file,
+        max_size or settings.max_file_size,
+        settings.upload_spool_threshold,
+        settings.upload_spool_dir or None,
+    )
+
+
+async def parse_in_worker(contents: Union[bytes, uploads.UploadBuffer], filename: str,
+                          fields: Tuple[str, ...], profile: bool = False) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Run the /parse pipeline in the worker pool; returns the result and its stage timings.
+
+    ``profile`` runs it under the deterministic profiler and adds the report
+    as ``result["profile"]``. Otherwise ``Settings.profile_sample_rate`` of
+    parses run under the stack sampler, and those slower than
+    ``Settings.profile_slow_threshold`` are stored in ``Settings.profile_dir``.
+    """
+    report = None
+    with metrics.track_errors():
+        if profile or random.random() < settings.profile_sample_rate:
+            result, report = await workers.run(
+                profiling.run, pipeline.parse_resume, (contents, filename, app.debug, fields), profile,
+                settings.profile_interval,
+            )
+        else:
+            result = await workers.run(pipeline.parse_resume, contents, filename, app.debug, fields)
+    metrics.observe_parse(result, uploads.as_buffer(contents).size)
+    if report is not None and (profile or report["duration_s"] >= settings.profile_slow_threshold):
+        stored = None
+        if settings.profile_dir:
+            stored = await run_in_threadpool(profiling.save, report, settings.profile_dir, filename)
+        if profile:
+            result["profile"] = {**report, "stored": stored}
+        else:
+            logger.warning(f"Slow parse of {filename} ({report['duration_s']:.1f}s), profile stored in {stored}")
+    return result, result["processing_info"].pop("timings_ms", {})
+
+
+def check_profile_access(token: Optional[str], feature: str = "Profiling") -> None:
+    """Allow ?profile=true (and other diagnostics) only in debug mode and with the configured token"""
+    if not settings.debug or not settings.profile_token:
+        raise HTTPException(status_code=403, detail=f"{feature} is disabled")
+    if not token or not hmac.compare_digest(token.encode(), settings.profile_token.encode()):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+
+
+async def lookup_cache(contents: Union[bytes, uploads.UploadBuffer], filename: str,
+                       fields: Tuple[str, ...]) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Cache key of an upload and its cached result, if any, marked as cached"""
+    key = await run_in_threadpool(cache.cache_key, contents, app.debug, fields)
+    hit = await run_in_threadpool(result_cache.get, key)
+    if hit is None:
+        metrics.CACHE_LOOKUPS.labels("miss").inc()
+        return key, None
+    result, tier = hit
+    metrics.CACHE_LOOKUPS.labels(f"hit_{tier}").inc()
+    result["filename"] = filename
+    result["processing_info"].update(cached=True, cache_tier=tier)
+    return key, result
+
+
+async def run_parse(contents: Union[bytes, uploads.UploadBuffer], filename: str,
+                    fields: Tuple[str, ...] = extractors.FIELDS, timings: bool = False,
+                    profile: bool = False) -> Dict[str, Any]:
+    """
+    Parse one PDF in the worker pool, answering repeat uploads from the cache.
+
+    ``timings`` adds the per-stage milliseconds to ``processing_info``;
+    ``profile`` bypasses the cache and adds a profile report.
+    """
+    if not settings.cache_enabled or profile:
+        result, stage_timings = await parse_in_worker(contents, filename, fields, profile)
+        result["processing_info"]["cached"] = False
+        if timings:
+            result["processing_info"]["timings_ms"] = stage_timings
+        return result
+
+    started = time.perf_counter()
+    key, result = await lookup_cache(contents, filename, fields)
+    if result is not None:
+        if timings:
+            result["processing_info"]["timings_ms"] = {"cache": round((time.perf_counter() - started) * 1000, 3)}
+        return result
+
+    result, stage_timings = await parse_in_worker(contents, filename, fields)
+    result = jsonable_encoder(result)
+    await run_in_threadpool(result_cache.set, key, result)
+    result["processing_info"]["cached"] = False
+    if timings:
+        result["processing_info"]["timings_ms"] = stage_timings
+    return result
+
+
+job_queue = jobs.JobQueue(
+    jobs.JobStore(settings.jobs_db_path),
+    run_parse,
+    max_depth=settings.jobs_queue_size,
+    concurrency=settings.jobs_concurrency,
+    retention=settings.jobs_retention,
+    lease=settings.jobs_lease,
+    webhook_timeout=settings.webhook_timeout,
+    webhook_allowed_hosts=settings.webhook_allowed_hosts.split(","),
+    webhook_allow_private=settings.webhook_allow_private,
+)
+
+
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated profiles (contact, skills, education, full), sections (e.g. address) "
+                "or fields (e.g. personal_info.email) to extract; default is everything",
+)
+TIMINGS_QUERY = Query(False, description="Include per-stage timings in milliseconds in processing_info")
+PROFILE_QUERY = Query(False, description="Debug only: profile the parse (needs the X-Profile-Token header)")
+
+
+# Models load after startup so /health answers at once; /ready reports when they are in
+warmup_state: Dict[str, Any] = {"ready": False, "seconds": None, "error": None}
+
+
+async def warm_up() -> None:
+    """Load the spaCy model and dictionaries where parses run (a worker, or this process), retrying on failure"""
+    started = time.perf_counter()
+    delay = 1.0
+    while True:
+        try:
+            await workers.run(pipeline.warmup)
+            break
+        except Exception as e:
+            logger.error(f"Warmup failed, retrying in {delay:.0f}s: {e}")
+            warmup_state["error"] = str(e)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 60.0)
+    warmup_state.update(ready=True, seconds=round(time.perf_counter() - started, 3), error=None)
+    logger.info(f"Ready after {warmup_state['seconds']}s warmup")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the parse worker pool, model warmup and job queue with the app, stop them on shutdown"""
+    memory.start_tracing(settings.memory_tracemalloc_frames)
+    workers.start()
+    warmup_task = asyncio.create_task(warm_up())
+    await run_in_threadpool(result_cache.purge_expired)
+    await job_queue.start()
+    yield
+    warmup_task.cancel()
+    await job_queue.stop()
+    workers.shutdown()
+
+
 # Initialize FastAPI app with modern configuration
 app = FastAPI(
     title="Resume Parser API",
     description="A FastAPI application for parsing resumes and extracting structured information",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
+)
+
+# Refuse oversized request bodies while they stream in, before multipart parsing
+app.add_middleware(
+    uploads.UploadLimitMiddleware,
+    limits={
+        "/parse": settings.max_file_size + uploads.MULTIPART_OVERHEAD,
+        "/parse/stream": settings.max_file_size + uploads.MULTIPART_OVERHEAD,
+        "/parse_resume": settings.max_file_size + uploads.MULTIPART_OVERHEAD,
+        "/jobs": settings.max_file_size + uploads.MULTIPART_OVERHEAD,
+        "/parse/batch": settings.max_file_size * settings.batch_max_files + uploads.MULTIPART_OVERHEAD,
+    },
 )
 
+# Bound concurrent parses and their wait queue before any upload is read;
+# inside CORS so shed responses still carry its headers
+admission_controller: Optional[admission.AdmissionController] = None
+if settings.admission_concurrency != 0:
+    admission_controller = admission.AdmissionController(
+        settings.admission_concurrency or 2 * (workers.pool_size() or os.cpu_count() or 1),
+        settings.admission_queue_size,
+        settings.admission_max_wait,
+    )
+    app.add_middleware(
+        admission.AdmissionMiddleware,
+        controller=admission_controller,
+        paths=("/parse", "/parse/stream", "/parse/batch", "/parse_resume"),
+    )
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -37,14 +236,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-    matcher = Matcher(nlp.vocab)
-    logger.info("spaCy model loaded successfully")
-except Exception as e:
-    logger.error(f"Failed to load spaCy model: {e}")
-    raise HTTPException(status_code=500, detail="Failed to initialize NLP model")
+# Outermost, so rejected uploads and CORS preflights are measured too
+if settings.metrics_enabled:
+    app.add_middleware(metrics.MetricsMiddleware, routes=app.router.routes)
 
 
 @app.get("/", response_model=Dict[str, Any])
@@ -59,6 +253,68 @@ async def health_check():
     return {"status": "healthy", "service": "resume-parser"}
 
 
+@app.get("/ready", response_model=Dict[str, Any])
+async def readiness_check():
+    """Readiness probe: 503 until the models and dictionaries are loaded"""
+    if not warmup_state["ready"]:
+        return JSONResponse(status_code=503, content={"status": "starting", "error": warmup_state["error"]})
+    return {"status": "ready", "warmup_seconds": warmup_state["seconds"]}
+
+
+@app.get("/models", response_model=Dict[str, Any])
+async def models():
+    """Loaded spaCy model, its component views and shared memory"""
+    return nlp_models.stats()
+
+
+@app.get("/cache", response_model=Dict[str, Any])
+async def cache_stats():
+    """Parse result cache hit/miss counters and memory usage"""
+    return {"enabled": settings.cache_enabled, **result_cache.stats()}
+
+
+@app.get("/admission", response_model=Dict[str, Any])
+async def admission_stats():
+    """Parse slots in use, queued requests and admitted/queued/shed counters of this server process"""
+    if admission_controller is None:
+        return {"enabled": False}
+    return {"enabled": True, **admission_controller.stats()}
+
+
+@app.get("/memory", response_model=Dict[str, Any])
+async def memory_stats(top: int = Query(0, ge=0, le=100, description="Debug only: largest allocation sites to "
+                                                                     "list (needs MEMORY_TRACEMALLOC_FRAMES and "
+                                                                     "the X-Profile-Token header)"),
+                       x_profile_token: Optional[str] = Header(None)):
+    """
+    RSS and spaCy vocabulary size of this server process and of its parse
+    workers (as of their last task), with the recycling limits. ``top``
+    (debug mode with ``X-Profile-Token``) adds the largest tracemalloc
+    allocation sites of this process and of one parse worker.
+    """
+    if top:
+        check_profile_access(x_profile_token, "Allocation tracing")
+    report: Dict[str, Any] = {
+        "limits": {"max_rss_bytes": settings.memory_max_rss, "max_vocab_strings": settings.memory_max_strings,
+                   "max_tasks_per_child": settings.max_tasks_per_child,
+                   "server_max_requests": settings.server_max_requests},
+        "server": await run_in_threadpool(memory.snapshot, top),
+        "parse_workers": list(memory.parse_workers().values()),
+    }
+    if top and workers.pool_size() > 0:
+        report["parse_worker_sample"] = await workers.run(memory.snapshot, top)
+    return report
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus metrics: request latency, in-flight requests, stage timings, bytes, pages, cache and errors"""
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    payload, content_type = metrics.render()
+    return Response(payload, media_type=content_type)
+
+
 @app.post("/parse_resume", response_model=Dict[str, Any])
 async def parse_resume(file: UploadFile = File(...)):
     """
@@ -71,176 +327,307 @@ async def parse_resume(file: UploadFile = File(...)):
         if not file.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are supported")
         
-        # Download and read the PDF file
-        contents = await file.read()
-        pdf_reader = PdfReader(BytesIO(contents))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-
-        if not text.strip():
-            raise HTTPException(status_code=400, detail="No text could be extracted from the PDF")
-
-        # Process the plain text using spaCy
-        doc = nlp(text)
-        logger.info(f"Processing document with {len(doc)} tokens")
-
-        # Extract information using utility functions
-        email = utl.get_email(text)
-        phone_number = utl.get_phone(text)
-        name_ext = utl.extract_name(text)
-        skills = utl.extract_skills_new(text)
-        edu = utl.extract_education(text)
-
-        # Extract entities using spaCy
-        name = None
-        experience = None
-        for ent in doc.ents:
-            if ent.label_ == "PERSON":
-                name = ent.text
-            elif ent.label_ == "EXPERIENCE":
-                experience = ent.text
-
-        # Return the extracted information
-        return {
-            "name": name_ext,
-            "email": email,
-            "phone": phone_number,
-            "skills": skills,
-            "education": edu,
-            "experience": experience,
-            "status": "success"
-        }
+        # Stream the PDF into a shared buffer and parse it in the worker pool
+        with await read_upload(file) as buffer:
+            return await workers.run(pipeline.parse_resume_legacy, buffer)
     
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except asyncio.TimeoutError:
+        logger.error(f"Parsing {file.filename} timed out")
+        raise HTTPException(status_code=504, detail="Resume parsing timed out")
     except Exception as e:
         logger.error(f"Error processing resume: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
 
 
 @app.post("/parse", response_model=Dict[str, Any])
-async def parse(file: UploadFile = File(...)):
+async def parse(file: UploadFile = File(...), fields: Optional[str] = FIELDS_QUERY,
+                timings: bool = TIMINGS_QUERY, profile: bool = PROFILE_QUERY,
+                x_profile_token: Optional[str] = Header(None)):
     """
     Advanced resume parsing endpoint with comprehensive data extraction
+
+    ``fields`` limits the work to the extractors behind the requested
+    output; ``fields=contact`` never runs the NLP model. ``timings=true``
+    reports how long each stage took. ``profile=true`` (debug mode with
+    ``X-Profile-Token``) returns the top functions and collapsed stacks.
     """
     try:
+        if profile:
+            check_profile_access(x_profile_token)
         # Validate file type
         if not file.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are supported")
+        selected = extractors.resolve_fields(fields)
         
-        # Check file size (limit to 10MB)
-        file_size = len(await file.read())
-        if file_size > 10 * 1024 * 1024:  # 10MB limit
-            raise HTTPException(status_code=400, detail="File size too large. Maximum 10MB allowed.")
-        
-        # Reset file pointer
-        await file.seek(0)
-        
-        # Download and read the PDF file
-        contents = await file.read()
-        pdf_reader = PdfReader(BytesIO(contents))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-
-        if not text.strip():
-            raise HTTPException(status_code=400, detail="No text could be extracted from the PDF")
-
-        # Also try pdfminer for better text extraction
-        await file.seek(0)
-        try:
-            data = extract_text(file.file)
-            if len(data) > len(text):  # Use the better extraction
-                text = data
-        except Exception as e:
-            logger.warning(f"pdfminer extraction failed: {e}, using pypdf")
-            data = text
-
-        logger.info(f"Extracted text length: {len(text)} characters")
-
-        # Process the plain text using spaCy
-        doc = nlp(text)
-
-        # Extract all information using utility functions
-        name = utl.extract_name(data)
-        email = utl.get_email(data)
-        phone = utl.get_phone(data)
-        linkedIn = utl.linkedin(data)
-        github = utl.extract_github(data)
-        others_urls = utl.extract_urls(data)
-        skills = utl.extract_skills_new(data)
-        course_name = utl.extract_course_name(data)
-        specializations = utl.extract_specializations(data)
-        college = utl.get_college(data)
-        languages = utl.get_language(data)
-        location = utl.get_location(data)
-        extracted_zip = utl.extract_zip_code(data)
-
-        # Prepare response
-        response_data = {
-            "status": "success",
-            "filename": file.filename,
-            "personal_info": {
-                "name": name,
-                "email": email,
-                "phone_number": phone,
-            },
-            "social_links": {
-                "linkedin": linkedIn,
-                "github": github,
-                "others": others_urls,
-            },
-            "skills": skills,
-            "education_details": {
-                "courses": course_name,
-                "specializations": specializations,
-                "college": college,
-            },
-            "address": {
-                "location": location,
-                "zip_code": extracted_zip
-            },
-            "languages": languages,
-            "processing_info": {
-                "text_length": len(text),
-                "tokens_processed": len(doc),
-                "entities_found": len(doc.ents)
-            }
-        }
+        # Stream the PDF in once, rejecting it as soon as it exceeds
+        # Settings.max_file_size, and parse it in the worker pool
+        with await read_upload(file) as buffer:
+            return await run_parse(buffer, file.filename, selected, timings, profile)
+    
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except asyncio.TimeoutError:
+        logger.error(f"Parsing {file.filename} timed out")
+        raise HTTPException(status_code=504, detail="Resume parsing timed out")
+    except Exception as e:
+        logger.error(f"Error processing resume: {e}")
+        raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
 
-        # Only include raw_data in development mode
-        if app.debug:
-            response_data["raw_data"] = data
 
-        return response_data
-    
+async def replay_cached(result: Dict[str, Any], fields: Tuple[str, ...], media: str,
+                        timings_ms: Optional[Dict[str, float]]) -> AsyncIterator[bytes]:
+    """Stream a cached /parse result: every section at once, then the summary"""
+    for section in streaming.response_sections(fields):
+        yield streaming.section_event(section, result.pop(section), media)
+    if timings_ms is not None:
+        result["processing_info"]["timings_ms"] = timings_ms
+    yield streaming.encode(streaming.SUMMARY, result, media)
+
+
+async def stream_stages(first: Tuple[Any, Dict[str, Any], Dict[str, float]], later: List[extractors.Plan],
+                        filename: str, fields: Tuple[str, ...], key: Optional[str], size: int, media: str,
+                        timings: bool) -> AsyncIterator[bytes]:
+    """
+    Send the sections completed by the first stage, run the later stages in
+    the worker pool sending each section as it completes, then the summary.
+
+    A failure after the response has started is reported as an ``error``
+    event; the completed parse is cached like a /parse result.
+    """
+    extraction, values, stage_timings = first
+    tracker = streaming.SectionTracker(fields)
+    document_info: Dict[str, Any] = {}
+    for section, data, complete in tracker.add(values):
+        yield streaming.section_event(section, data, media, partial=not complete)
+    try:
+        for execution in later:
+            with metrics.track_errors():
+                values, info, ms = await workers.run(pipeline.stream_stage, extraction.text, execution)
+            document_info.update(info)
+            for stage, milliseconds in ms.items():
+                stage_timings[stage] = round(stage_timings.get(stage, 0.0) + milliseconds, 3)
+            for section, data, complete in tracker.add(values):
+                yield streaming.section_event(section, data, media, partial=not complete)
+    except asyncio.TimeoutError:
+        logger.error(f"Parsing {filename} timed out")
+        yield streaming.encode(streaming.ERROR, {"status": "error", "detail": "Resume parsing timed out"}, media)
+        return
+    except Exception as e:
+        logger.error(f"Error processing resume: {e}")
+        yield streaming.encode(streaming.ERROR, {"status": "error", "detail": f"Error processing resume: {str(e)}"},
+                               media)
+        return
+
+    result = pipeline.assemble_response(extraction, filename, tracker.result(), fields, document_info,
+                                        stage_timings, app.debug)
+    metrics.observe_parse(result, size)
+    result["processing_info"].pop("timings_ms")
+    if key is not None:
+        result = jsonable_encoder(result)
+        await run_in_threadpool(result_cache.set, key, result)
+    sections = set(streaming.response_sections(fields))
+    summary = {name: value for name, value in result.items() if name not in sections}
+    summary["processing_info"] = {**summary["processing_info"], "cached": False}
+    if timings:
+        summary["processing_info"]["timings_ms"] = stage_timings
+    yield streaming.encode(streaming.SUMMARY, summary, media)
+
+
+@app.post("/parse/stream")
+async def parse_stream(file: UploadFile = File(...), fields: Optional[str] = FIELDS_QUERY,
+                       timings: bool = TIMINGS_QUERY, accept: Optional[str] = Header(None)):
+    """
+    Progressive variant of /parse.
+
+    Sends each response section as soon as it is computed, then a
+    ``summary`` event with ``processing_info``: sections that need no model
+    (contact details, links, languages) come first, then the name, then the
+    sections that wait on the whole-text NLP pass. NDJSON by default,
+    server-sent events for ``Accept: text/event-stream``. Upload and PDF
+    errors are answered with an HTTP error as for /parse; later failures end
+    the stream with an ``error`` event.
+    """
+    media = streaming.media_type(accept)
+    try:
+        # Validate file type
+        if not file.filename.lower().endswith('.pdf'):
+            raise HTTPException(status_code=400, detail="Only PDF files are supported")
+        selected = extractors.resolve_fields(fields)
+
+        with await read_upload(file) as buffer:
+            key = None
+            if settings.cache_enabled:
+                started = time.perf_counter()
+                key, result = await lookup_cache(buffer, file.filename, selected)
+                if result is not None:
+                    cache_ms = {"cache": round((time.perf_counter() - started) * 1000, 3)} if timings else None
+                    return StreamingResponse(replay_cached(result, selected, media, cache_ms), media_type=media)
+            # Text extraction runs before the response starts, so unreadable PDFs still get a 400
+            first, *later = extractors.stages(selected)
+            with metrics.track_errors():
+                first_stage = await workers.run(pipeline.start_stream, buffer, first)
+            size = buffer.size
+
+        later = [execution for execution in later if execution.extractors]
+        return StreamingResponse(
+            stream_stages(first_stage, later, file.filename, selected, key, size, media, timings),
+            media_type=media,
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except asyncio.TimeoutError:
+        logger.error(f"Parsing {file.filename} timed out")
+        raise HTTPException(status_code=504, detail="Resume parsing timed out")
     except Exception as e:
         logger.error(f"Error processing resume: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
 
 
-class Settings(BaseSettings):
-    """Application settings"""
-    app_name: str = "FastAPI Resume Parser"
-    app_version: str = "2.0.0"
-    debug: bool = False
-    host: str = "0.0.0.0"
-    port: int = 8000
-    max_file_size: int = 10485760  # 10MB
-    cors_origins: str = "*"
-    log_level: str = "info"
-    
-    class Config:
-        env_file = ".env"
+@app.post("/parse/batch", response_model=Dict[str, Any])
+async def parse_batch(files: List[UploadFile] = File(...), fields: Optional[str] = FIELDS_QUERY,
+                      timings: bool = TIMINGS_QUERY):
+    """
+    Parse many resumes in one request.
+
+    Accepts PDFs and zip archives of PDFs. The NLP stage runs with
+    ``nlp.pipe`` over chunks of ``Settings.batch_size`` documents, up to
+    ``Settings.batch_concurrency`` chunks are spread over the worker pool at
+    a time and every file gets its own result or error. A chunk may run for
+    ``Settings.task_timeout`` per document once a worker has taken it.
+    ``fields`` and ``timings`` work as for ``/parse``.
+    """
+    buffers: List[Optional[uploads.UploadBuffer]] = []
+    try:
+        selected = extractors.resolve_fields(fields)
+        # PDFs are held to the per-file limit; archives only to the batch limit
+        archive_limit = settings.max_file_size * settings.batch_max_files
+        for file in files:
+            limit = archive_limit if file.filename.lower().endswith('.zip') else settings.max_file_size
+            try:
+                buffers.append(await read_upload(file, limit))
+            except HTTPException as e:
+                if e.status_code != 413:
+                    raise
+                buffers.append(None)
+        items = await run_in_threadpool(
+            pipeline.expand_batch,
+            [(file.filename, buffer) for file, buffer in zip(files, buffers)],
+            settings.batch_max_files,
+            settings.max_file_size,
+        )
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        pending = []
+        for index, (filename, contents, error) in enumerate(items):
+            if error:
+                results[index] = {"status": "error", "filename": filename, "detail": error}
+            else:
+                pending.append((index, filename, contents))
+
+        chunk_size = max(settings.batch_size, 1)
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        # Leave workers to other requests however large the batch
+        in_flight = asyncio.Semaphore(
+            settings.batch_concurrency or max((workers.pool_size() or os.cpu_count() or 1) // 2, 1)
+        )
+
+        async def parse_chunk(chunk):
+            async with in_flight:
+                return await workers.run(
+                    pipeline.parse_batch,
+                    [(filename, contents) for _, filename, contents in chunk],
+                    settings.batch_size,
+                    settings.batch_n_process,
+                    app.debug,
+                    selected,
+                    timeout=settings.task_timeout * len(chunk),
+                    count_wait=False,
+                )
+
+        outcomes = await asyncio.gather(*[parse_chunk(chunk) for chunk in chunks], return_exceptions=True)
+
+        for chunk, outcome in zip(chunks, outcomes):
+            for position, (index, filename, contents) in enumerate(chunk):
+                if isinstance(outcome, asyncio.TimeoutError):
+                    metrics.ERRORS.labels("timeout").inc()
+                    results[index] = {"status": "error", "filename": filename, "detail": "Resume parsing timed out"}
+                elif isinstance(outcome, Exception):
+                    logger.error(f"Error processing batch chunk: {outcome}")
+                    metrics.ERRORS.labels("parse").inc()
+                    results[index] = {"status": "error", "filename": filename,
+                                      "detail": f"Error processing resume: {str(outcome)}"}
+                else:
+                    result = results[index] = outcome[position]
+                    if result["status"] != "success":
+                        metrics.ERRORS.labels("parse").inc()
+                        continue
+                    metrics.observe_parse(result, uploads.as_buffer(contents).size)
+                    if not timings:
+                        result["processing_info"].pop("timings_ms", None)
+
+        succeeded = sum(1 for result in results if result["status"] == "success")
+        return {
+            "status": "success",
+            "count": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "results": results,
+        }
 
-@lru_cache()
-def get_settings():
-    return Settings()
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error processing batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Error processing batch: {str(e)}")
+    finally:
+        uploads.close_all(buffers)
 
-settings = get_settings()
+
+@app.post("/jobs", response_model=Dict[str, Any], status_code=202)
+async def create_job(file: UploadFile = File(...), webhook_url: Optional[str] = Form(None)):
+    """
+    Queue a resume for parsing and return its job id immediately.
+
+    Poll ``GET /jobs/{job_id}`` for the result, or pass ``webhook_url`` to
+    have the outcome POSTed there when the job finishes. Webhooks to
+    internal addresses, or to hosts outside ``WEBHOOK_ALLOWED_HOSTS`` when
+    it is set, are refused.
+    """
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+    if webhook_url:
+        try:
+            await run_in_threadpool(job_queue.check_webhook, webhook_url)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    with await read_upload(file) as buffer:
+        try:
+            job_id = await job_queue.submit(file.filename, buffer.view(), webhook_url)
+        except jobs.QueueFull as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    return {"job_id": job_id, "status": jobs.QUEUED}
+
+
+@app.get("/jobs/{job_id}", response_model=Dict[str, Any])
+async def get_job(job_id: str):
+    """Status of a parse job, with its result or error once finished"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 
 handler = Mangum(app)
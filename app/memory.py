@@ -0,0 +1,174 @@
+"""
+Per-process memory accounting and recycling
+
+Every task run through ``app.workers`` reports the RSS and spaCy
+vocabulary size of the process that ran it. ``GET /memory`` shows the
+latest figures of the server process and of each parse worker and, when
+``Settings.memory_tracemalloc_frames`` is set, the largest allocation
+sites. A process over ``Settings.memory_max_rss`` or
+``Settings.memory_max_strings`` is replaced without dropping requests: a
+parse worker's process exits after the task that reported it and the next
+task starts a fresh one, and a gunicorn worker asks to be stopped
+gracefully so the master forks a fresh one.
+"""
+import logging
+import os
+import signal
+import threading
+import tracemalloc
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import nlp_models
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+RSS = "rss"
+VOCAB = "vocab"
+_MAX_WORKERS = 64  # parse worker pids remembered for /memory
+
+_lock = threading.Lock()
+_tasks = 0
+_workers: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+_baseline_rss: Optional[int] = None
+_misconfigured = False
+_server_recycling = False
+_server_recycle_requested = False
+
+
+def start_tracing(frames: int) -> None:
+    """Trace allocations with ``frames`` frames per traceback (0 leaves tracemalloc off)"""
+    if frames > 0 and not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def mark_baseline() -> None:
+    """Remember the RSS of this process once it is warmed up (else after its first task)"""
+    global _baseline_rss
+    _baseline_rss = nlp_models.rss_bytes()
+
+
+def _figures() -> Dict[str, Any]:
+    rss = nlp_models.rss_bytes()
+    return {"pid": os.getpid(), "rss_bytes": rss, "baseline_rss_bytes": _baseline_rss or rss,
+            **nlp_models.vocab_size(), "tasks": _tasks}
+
+
+def usage() -> Dict[str, Any]:
+    """RSS, spaCy vocabulary size and tasks run of this process, counting one more task"""
+    global _tasks
+    with _lock:
+        _tasks += 1
+    if _baseline_rss is None:
+        mark_baseline()
+    return _figures()
+
+
+def top_allocations(limit: int = 20) -> List[Dict[str, Any]]:
+    """The ``limit`` source lines holding the most traced memory (empty unless tracing)"""
+    if limit <= 0 or not tracemalloc.is_tracing():
+        return []
+    snapshot = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+    return [
+        {
+            "location": f"{'/'.join(Path(stat.traceback[0].filename).parts[-2:])}:{stat.traceback[0].lineno}",
+            "size_bytes": stat.size,
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+def snapshot(top: int = 0) -> Dict[str, Any]:
+    """``usage()`` of this process plus its ``top`` allocation sites"""
+    report = {**_figures(), "tracing": tracemalloc.is_tracing()}
+    if top:
+        report["top_allocations"] = top_allocations(top)
+    return report
+
+
+def over_limit(figures: Dict[str, Any]) -> Optional[str]:
+    """
+    The limit (``rss`` or ``vocab``) a process has crossed, if any.
+
+    A process that started out over the RSS limit is never recycled for
+    it: its replacement would be over the limit too.
+    """
+    global _misconfigured
+    settings = get_settings()
+    if settings.memory_max_rss and figures["rss_bytes"] > settings.memory_max_rss:
+        if figures["baseline_rss_bytes"] < settings.memory_max_rss:
+            return RSS
+        if not _misconfigured:
+            _misconfigured = True
+            logger.error(
+                f"MEMORY_MAX_RSS ({settings.memory_max_rss} bytes) is below the RSS of a freshly started "
+                f"worker ({figures['baseline_rss_bytes']} bytes); not recycling for RSS"
+            )
+    if settings.memory_max_strings and figures.get("vocab_strings", 0) > settings.memory_max_strings:
+        return VOCAB
+    return None
+
+
+def record(figures: Dict[str, Any]) -> None:
+    """Keep the figures a task reported and publish them as gauges"""
+    # imported here so parse workers, which only report, never create metrics
+    from . import metrics
+
+    server = figures if figures["pid"] == os.getpid() else _figures()
+    metrics.RSS_BYTES.labels("server").set(server["rss_bytes"])
+    metrics.VOCAB_STRINGS.labels("server").set(server.get("vocab_strings", 0))
+    if server is figures:
+        return
+    with _lock:
+        _workers[figures["pid"]] = figures
+        _workers.move_to_end(figures["pid"])
+        while len(_workers) > _MAX_WORKERS:
+            _workers.popitem(last=False)
+        latest = list(_workers.values())
+    metrics.RSS_BYTES.labels("parse_worker").set(max(worker["rss_bytes"] for worker in latest))
+    metrics.VOCAB_STRINGS.labels("parse_worker").set(max(worker.get("vocab_strings", 0) for worker in latest))
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def parse_workers() -> Dict[int, Dict[str, Any]]:
+    """Latest figures of the parse workers that are still running"""
+    with _lock:
+        for pid in [pid for pid in _workers if not _alive(pid)]:
+            del _workers[pid]
+        return dict(_workers)
+
+
+def enable_server_recycling() -> None:
+    """Called in a gunicorn worker after fork: its master replaces it when it stops"""
+    global _server_recycling
+    _server_recycling = True
+
+
+def recycle_server(reason: str) -> bool:
+    """
+    Stop this server process gracefully (in-flight requests finish) so
+    gunicorn forks a fresh one; a no-op outside gunicorn.
+    """
+    global _server_recycle_requested
+    from . import metrics
+
+    with _lock:
+        if not _server_recycling or _server_recycle_requested:
+            return False
+        _server_recycle_requested = True
+    logger.warning(f"Server worker {os.getpid()} is over its {reason} limit, recycling it")
+    metrics.RECYCLES.labels("server", reason).inc()
+    os.kill(os.getpid(), signal.SIGTERM)
+    return True
@@ -0,0 +1,142 @@
+"""
+Prometheus metrics for GET /metrics
+
+Stage timings are measured where a parse runs (a worker process or thread,
+see ``app.timing``) and come back with its result; they are recorded here,
+in the process that serves the request. Under gunicorn, point
+``PROMETHEUS_MULTIPROC_DIR`` at an empty directory so the samples of every
+server worker are aggregated (``gunicorn.conf.py`` cleans up after
+exited workers).
+"""
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+_STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_SECONDS = Histogram(
+    "resume_parser_request_seconds", "HTTP request latency", ["endpoint", "method", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+IN_FLIGHT = Gauge(
+    "resume_parser_requests_in_flight", "HTTP requests being served", ["endpoint"], multiprocess_mode="livesum",
+)
+STAGE_SECONDS = Histogram(
+    "resume_parser_stage_seconds", "Wall time per parsing stage (pdf, nlp, extract.<field>)", ["stage"],
+    buckets=_STAGE_BUCKETS,
+)
+BYTES_PROCESSED = Counter("resume_parser_bytes_processed", "PDF bytes parsed")
+PDF_PAGES = Histogram(
+    "resume_parser_pdf_pages", "Pages read per parsed PDF", ["engine"], buckets=(1, 2, 3, 5, 10, 20, 50, 100),
+)
+CACHE_LOOKUPS = Counter("resume_parser_cache_lookups", "Parse result cache lookups", ["result"])
+ERRORS = Counter("resume_parser_errors", "Failed parses by stage", ["stage"])
+RSS_BYTES = Gauge(
+    "resume_parser_rss_bytes", "Resident memory of a server process, or the largest of its parse workers", ["process"],
+    multiprocess_mode="liveall",
+)
+VOCAB_STRINGS = Gauge(
+    "resume_parser_vocab_strings", "Strings in the spaCy vocabulary of a server process or parse worker", ["process"],
+    multiprocess_mode="liveall",
+)
+RECYCLES = Counter(
+    "resume_parser_recycles", "Processes replaced for going over a memory limit", ["process", "reason"],
+)
+ADMISSIONS = Counter(
+    "resume_parser_admissions", "Parse requests by admission outcome (admitted, queue_full, queue_timeout)", ["result"],
+)
+QUEUE_SECONDS = Histogram(
+    "resume_parser_admission_wait_seconds", "Time parse requests waited for a slot", buckets=_LATENCY_BUCKETS,
+)
+
+
+def observe_parse(result: Dict[str, Any], size: int) -> None:
+    """Record the stage timings, pages and bytes of one successful parse"""
+    info = result.get("processing_info", {})
+    for stage, milliseconds in info.get("timings_ms", {}).items():
+        STAGE_SECONDS.labels(stage).observe(milliseconds / 1000)
+    if "pages_extracted" in info:
+        PDF_PAGES.labels(info.get("extraction_engine") or "unknown").observe(info["pages_extracted"])
+    BYTES_PROCESSED.inc(size)
+
+
+@contextmanager
+def track_errors() -> Iterator[None]:
+    """Count a failing parse by stage: ``pdf`` (unreadable upload), ``timeout`` or ``parse``"""
+    try:
+        yield
+    except ValueError:
+        ERRORS.labels("pdf").inc()
+        raise
+    except asyncio.TimeoutError:
+        ERRORS.labels("timeout").inc()
+        raise
+    except Exception:
+        ERRORS.labels("parse").inc()
+        raise
+
+
+def render() -> Tuple[bytes, str]:
+    """Exposition-format payload and its content type"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    Latency and in-flight gauges per route.
+
+    Requests are labelled with their route template (``/jobs/{job_id}``)
+    so ids do not blow up the label set; unknown paths share ``other``.
+    """
+
+    def __init__(self, app, routes: Iterable[Any], skip: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.routes = routes  # the router's live list; it fills up as endpoints are declared
+        self.skip = skip
+
+    def endpoint(self, path: str) -> str:
+        for route in self.routes:
+            regex = getattr(route, "path_regex", None)
+            if regex is not None and regex.match(path):
+                return route.path
+        return "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip:
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = self.endpoint(scope["path"])
+        status = 500
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        IN_FLIGHT.labels(endpoint).inc()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            IN_FLIGHT.labels(endpoint).dec()
+            REQUEST_SECONDS.labels(endpoint, scope["method"], str(status)).observe(time.perf_counter() - started)
@@ -0,0 +1,173 @@
+"""
+Process-wide spaCy model registry
+
+The model is loaded once per process and shared by every module. Extractors
+ask for a *view*: a callable over the shared pipeline that only runs the
+components they need, so e.g. stop-word filtering does not pay for NER.
+Long texts are analysed in chunks under a per-document budget (see
+``app.chunking``).
+"""
+import logging
+import os
+import resource
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from . import chunking
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "en_core_web_sm"
+
+# Components each view needs. Shared ``tok2vec`` layers are added
+# automatically for components that listen to them.
+VIEWS: Dict[str, Tuple[str, ...]] = {
+    "tokenizer": (),
+    "tagger": ("tagger", "attribute_ruler"),
+    "sentences": ("parser",),
+    "ner": ("ner",),
+    # everything /parse reads in a single pass: POS for names, entities for stats
+    "tagger_ner": ("tagger", "attribute_ruler", "ner"),
+}
+
+_lock = threading.Lock()
+_nlp = None
+_views: Dict[str, "ModelView"] = {}
+_consumers: Set[str] = set()
+_model_rss = 0
+
+
+def rss_bytes() -> int:
+    """Resident set size of the current process in bytes"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Peak RSS is the best we get without procfs (KiB on Linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ModelView:
+    """
+    Callable over the shared pipeline with unneeded components disabled.
+
+    Only the first ``max_chars`` of a text are analysed, and texts longer
+    than ``chunk_chars`` are analysed chunk by chunk (0 disables either).
+    """
+
+    def __init__(self, name: str, nlp: Any, components: Tuple[str, ...], chunk_chars: int = 0,
+                 max_chars: int = 0):
+        self.name = name
+        self.nlp = nlp
+        self.components = components
+        self.disable = [pipe for pipe in nlp.pipe_names if pipe not in components]
+        self.chunk_chars = chunk_chars
+        self.max_chars = max_chars
+
+    def _chunked(self, text: str) -> bool:
+        return 0 < self.chunk_chars < len(text)
+
+    def __call__(self, text: str):
+        text = chunking.budget(text, self.max_chars)
+        if self._chunked(text):
+            chunks = chunking.split(text, self.chunk_chars)
+            return chunking.join(self.nlp.pipe(chunks, disable=self.disable, batch_size=1))
+        if not self.components:
+            return self.nlp.make_doc(text)
+        return self.nlp(text, disable=self.disable)
+
+    def pipe(self, texts: Iterable[str], **kwargs):
+        """``nlp.pipe`` over ``texts``; a text over the chunk size is analysed on its own, in chunks"""
+        long_texts: Dict[int, str] = {}
+
+        def batched() -> Iterable[str]:
+            for index, text in enumerate(texts):
+                text = chunking.budget(text, self.max_chars)
+                if self._chunked(text):
+                    long_texts[index] = text
+                    text = ""  # keeps its place in the batch
+                yield text
+
+        for index, doc in enumerate(self.nlp.pipe(batched(), disable=self.disable, **kwargs)):
+            yield self(long_texts.pop(index)) if index in long_texts else doc
+
+    def covers(self, other: "ModelView") -> bool:
+        """True when docs from this view carry every annotation of ``other``"""
+        return set(other.components) <= set(self.components)
+
+
+def get_nlp(consumer: Optional[str] = None):
+    """Return the shared pipeline, loading it on first use"""
+    global _nlp, _model_rss
+    if _nlp is None:
+        with _lock:
+            if _nlp is None:
+                # spaCy itself is imported on first use to keep cold starts short
+                import spacy
+
+                before = rss_bytes()
+                _nlp = spacy.load(MODEL_NAME)
+                _model_rss = max(rss_bytes() - before, 0)
+                logger.info(
+                    f"spaCy model {MODEL_NAME} loaded once for this process "
+                    f"({_model_rss / 2**20:.1f} MB RSS, pipes: {', '.join(_nlp.pipe_names)})"
+                )
+    if consumer:
+        _consumers.add(consumer)
+    return _nlp
+
+
+def _components(nlp: Any, wanted: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Resolve a view's components against the loaded pipeline"""
+    selected: List[str] = []
+    for name in nlp.pipe_names:
+        if name in wanted:
+            selected.append(name)
+            continue
+        listeners = getattr(nlp.get_pipe(name), "listening_components", None) or []
+        if any(component in wanted for component in listeners):
+            selected.append(name)
+    return tuple(selected)
+
+
+def get_view(name: str) -> ModelView:
+    """Return the named view over the shared pipeline ("full" runs everything)"""
+    view = _views.get(name)
+    if view is None:
+        nlp = get_nlp()
+        if name == "full":
+            components = tuple(nlp.pipe_names)
+        elif name in VIEWS:
+            components = _components(nlp, VIEWS[name])
+        else:
+            raise KeyError(f"Unknown model view: {name}")
+        settings = get_settings()
+        view = _views.setdefault(
+            name, ModelView(name, nlp, components, settings.nlp_chunk_chars, settings.nlp_max_chars)
+        )
+    return view
+
+
+def vocab_size() -> Dict[str, int]:
+    """Strings and lexemes the shared vocabulary has accumulated (empty before the model loads)"""
+    if _nlp is None:
+        return {}
+    return {"vocab_strings": len(_nlp.vocab.strings), "vocab_lexemes": len(_nlp.vocab)}
+
+
+def stats() -> Dict[str, Any]:
+    """Report the loaded model, its views and the memory saved by sharing it"""
+    loaded = _nlp is not None
+    return {
+        "model": MODEL_NAME,
+        "loaded": loaded,
+        "pipes": list(_nlp.pipe_names) if loaded else [],
+        "views": {name: list(get_view(name).components) for name in ["full", *VIEWS]} if loaded else {},
+        "consumers": sorted(_consumers),
+        "model_rss_bytes": _model_rss,
+        # app.main and app.utils each used to call spacy.load(): one copy more than now
+        "rss_saved_bytes": _model_rss,
+        "process_rss_bytes": rss_bytes(),
+        **vocab_size(),
+    }
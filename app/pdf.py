@@ -0,0 +1,206 @@
+"""
+Adaptive PDF text extraction
+
+One engine is picked per document from cheap signals (font encodings on
+the first page and a pypdf sample of it); the other engine only runs when
+the first result looks poor. Long documents are split into page ranges
+that are extracted in parallel processes, and ``max_pages`` caps the work
+done for multi-page portfolios. Every engine reads the same ``UploadBuffer``.
+"""
+import logging
+import multiprocessing
+import string
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Sequence, Union
+
+from .uploads import UploadBuffer, as_buffer
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("pypdf", "pdfminer")
+
+# Quality score at or above which an extraction is accepted as is
+GOOD_QUALITY = 0.85
+
+_TEXT_CHARS = set(string.ascii_letters + string.digits + string.punctuation + string.whitespace + "•–—’‘“”")
+
+_page_pool = None
+_page_pool_lock = threading.Lock()
+
+
+@dataclass
+class Extraction:
+    """Text extracted from a PDF and how it was obtained"""
+    text: str
+    engine: str
+    pages: int
+    pages_extracted: int
+    quality: float
+
+    @property
+    def truncated(self) -> bool:
+        return self.pages_extracted < self.pages
+
+
+def text_quality(text: str) -> float:
+    """
+    Score in [0, 1] of how much an extraction looks like readable text.
+
+    Penalises unmapped glyphs (``(cid:NN)``, U+FFFD), non-text characters
+    and runs of words glued together by a missing space heuristic.
+    """
+    sample = text[:20000]
+    if not sample.strip():
+        return 0.0
+    textual = sum(1 for ch in sample if ch in _TEXT_CHARS or ch.isalpha())
+    score = textual / len(sample)
+    if "(cid:" in sample or "\ufffd" in sample:
+        score *= 0.5
+    words = sample.split()
+    if words and sum(len(word) for word in words) / len(words) > 15:
+        score *= 0.6
+    return score
+
+
+def _risky_fonts(reader: "PdfReader") -> bool:
+    """True when the first page uses fonts pypdf commonly decodes badly"""
+    from pypdf.generic import DictionaryObject
+
+    try:
+        fonts = reader.pages[0].get("/Resources", {}).get_object().get("/Font", {}).get_object()
+        for ref in fonts.values():
+            font = ref.get_object()
+            if font.get("/Subtype") == "/Type3":
+                return True
+            if "/ToUnicode" not in font and isinstance(font.get("/Encoding"), DictionaryObject):
+                return True
+    except Exception as e:
+        logger.debug(f"Could not inspect PDF fonts: {e}")
+    return False
+
+
+def _pypdf_pages(buffer: UploadBuffer, pages: Sequence[int]) -> str:
+    from pypdf import PdfReader
+
+    reader = PdfReader(buffer.open())
+    return "\n".join(reader.pages[index].extract_text() or "" for index in pages)
+
+
+def _pdfminer_pages(buffer: UploadBuffer, pages: Sequence[int]) -> str:
+    from pdfminer.high_level import extract_text as pdfminer_extract_text
+
+    return pdfminer_extract_text(buffer.open(), page_numbers=set(pages))
+
+
+_EXTRACTORS = {"pypdf": _pypdf_pages, "pdfminer": _pdfminer_pages}
+
+
+def extract_pages(engine: str, buffer: UploadBuffer, pages: Sequence[int]) -> str:
+    """Extract the given 0-based pages with one engine"""
+    return _EXTRACTORS[engine](buffer, pages)
+
+
+def _get_page_pool(workers: int, start_method: str):
+    # multiprocessing.Pool rather than ProcessPoolExecutor: its daemonic
+    # workers are terminated when a recycled parse worker exits instead of
+    # deadlocking the exit handler that joins non-daemonic children
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = multiprocessing.get_context(start_method).Pool(processes=workers)
+        return _page_pool
+
+
+def _run_engine(engine: str, buffer: UploadBuffer, page_count: int, page_workers: int,
+                start_method: str) -> str:
+    """Extract the first ``page_count`` pages, split over ``page_workers`` processes"""
+    pages = list(range(page_count))
+    if page_workers < 2:
+        return extract_pages(engine, buffer, pages)
+
+    chunk = -(-page_count // page_workers)
+    ranges = [pages[i:i + chunk] for i in range(0, page_count, chunk)]
+    pool = _get_page_pool(page_workers, start_method)
+    # A spooled buffer pickles as its path, so page workers map the same file
+    return "\n".join(pool.starmap(extract_pages, [(engine, buffer, page_range) for page_range in ranges]))
+
+
+def load_engines() -> None:
+    """Import both extraction engines ahead of the first request"""
+    import pdfminer.high_level  # noqa: F401
+    import pypdf  # noqa: F401
+
+
+def extract(contents: Union[bytes, UploadBuffer], engine: str = "auto", max_pages: int = 0,
+            parallel_min_pages: int = 8, page_workers: int = 0, start_method: str = "spawn") -> Extraction:
+    """
+    Extract text from a PDF with a single engine where possible.
+
+    ``engine`` forces ``"pypdf"`` or ``"pdfminer"``; ``"auto"`` chooses
+    from the font hints and a pypdf sample of the first page and falls back
+    to the other engine only when the result scores below ``GOOD_QUALITY``.
+    ``max_pages`` (0 = unlimited) caps the pages read.
+    """
+    # Imported here so importing the app (e.g. a Lambda cold start) stays cheap
+    from pdfminer.high_level import extract_text as pdfminer_extract_text
+    from pypdf import PdfReader
+
+    buffer = as_buffer(contents)
+    try:
+        reader = PdfReader(buffer.open())
+        total_pages = len(reader.pages)
+    except Exception as e:
+        if engine == "pypdf":
+            raise
+        logger.warning(f"pypdf could not open the PDF: {e}, using pdfminer")
+        text = pdfminer_extract_text(buffer.open(), maxpages=max_pages)
+        if not text.strip():
+            raise ValueError("No text could be extracted from the PDF")
+        pages = max(text.count("\f"), 1)
+        return Extraction(text, "pdfminer", pages, pages, text_quality(text))
+    page_count = min(total_pages, max_pages) if max_pages > 0 else total_pages
+    if page_count < max(parallel_min_pages, 2):
+        page_workers = 0
+
+    sample = None
+    if engine == "auto":
+        sample = (reader.pages[0].extract_text() or "") if total_pages else ""
+        if _risky_fonts(reader) or text_quality(sample) < GOOD_QUALITY:
+            candidates: List[str] = ["pdfminer", "pypdf"]
+        else:
+            candidates = ["pypdf", "pdfminer"]
+    elif engine in ENGINES:
+        candidates = [engine]
+    else:
+        raise ValueError(f"Unknown PDF engine: {engine}")
+
+    best: Optional[Extraction] = None
+    for candidate in candidates:
+        try:
+            if candidate == "pypdf" and sample is not None and page_workers < 2:
+                # Reuse the open reader and the first page already sampled
+                rest = (reader.pages[index].extract_text() or "" for index in range(1, page_count))
+                text = "\n".join([sample, *rest]) if page_count else ""
+            else:
+                text = _run_engine(candidate, buffer, page_count, page_workers, start_method)
+        except Exception as e:
+            logger.warning(f"{candidate} extraction failed: {e}")
+            continue
+        result = Extraction(text, candidate, total_pages, page_count, text_quality(text))
+        if best is None or result.quality > best.quality:
+            best = result
+        if result.quality >= GOOD_QUALITY:
+            break
+        logger.info(f"{candidate} extraction looks poor (quality {result.quality:.2f}), trying fallback")
+
+    if best is None or not best.text.strip():
+        raise ValueError("No text could be extracted from the PDF")
+
+    logger.info(
+        f"Extracted {len(best.text)} characters from {best.pages_extracted}/{best.pages} pages with {best.engine}"
+    )
+    return best
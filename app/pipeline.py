@@ -0,0 +1,259 @@
+"""
+CPU-bound resume parsing pipeline
+
+Everything here is synchronous and picklable so it can run inside the
+worker pool (see ``app.workers``); the endpoints only await the results.
+"""
+import logging
+import zipfile
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from . import extractors
+from . import nlp_models
+from . import pdf
+from . import sections
+from . import timing
+from . import utils as utl
+from .analysis import ResumeDocument
+from .config import get_settings
+from .uploads import UploadBuffer
+
+logger = logging.getLogger(__name__)
+
+
+def warmup() -> None:
+    """Load the spaCy model, its views, the PDF engines and the extractor dictionaries"""
+    pdf.load_engines()
+    nlp_models.get_nlp("pipeline")
+    for view in ["full", *nlp_models.VIEWS]:
+        nlp_models.get_view(view)
+    utl.load_dictionaries()
+    logger.info("Parsing pipeline warmed up")
+
+
+def _extract_text(contents: Union[bytes, UploadBuffer], engine: Optional[str] = None) -> pdf.Extraction:
+    """Extract text with the configured engine selection and page limits"""
+    settings = get_settings()
+    return pdf.extract(
+        contents,
+        engine=engine or settings.pdf_engine,
+        max_pages=settings.pdf_max_pages,
+        parallel_min_pages=settings.pdf_parallel_min_pages,
+        page_workers=settings.pdf_page_workers,
+        start_method=settings.worker_start_method,
+    )
+
+
+def parse_resume_legacy(contents: Union[bytes, UploadBuffer]) -> Dict[str, Any]:
+    """Pipeline behind the legacy /parse_resume endpoint"""
+    text = _extract_text(contents, engine="pypdf").text
+
+    # Process the plain text using spaCy once, shared by every extractor
+    document = ResumeDocument(text)
+    doc = document.get_doc("tagger_ner")
+    logger.info(f"Processing document with {len(doc)} tokens")
+
+    # Extract information using utility functions
+    email = utl.get_email(document)
+    phone_number = utl.get_phone(document)
+    name_ext = utl.extract_name(document.region(sections.HEADER))
+    skills = utl.extract_skills_new(document)
+    edu = utl.extract_education(document.region(sections.EDUCATION))
+
+    # Extract entities using spaCy
+    name = None
+    experience = None
+    for ent in doc.ents:
+        if ent.label_ == "PERSON":
+            name = ent.text
+        elif ent.label_ == "EXPERIENCE":
+            experience = ent.text
+
+    # Return the extracted information
+    return {
+        "name": name_ext,
+        "email": email,
+        "phone": phone_number,
+        "skills": skills,
+        "education": edu,
+        "experience": experience,
+        "status": "success"
+    }
+
+
+def _document_info(document: ResumeDocument, view: Optional[str]) -> Dict[str, Any]:
+    """Token and entity counts of the Doc computed for ``view``"""
+    info: Dict[str, Any] = {}
+    if view is not None:
+        doc = document.get_doc(view)
+        info["tokens_processed"] = len(doc)
+        if doc.has_annotation("ENT_IOB"):
+            info["entities_found"] = len(doc.ents)
+        if len(doc.text) < len(document.text):
+            # the rest of the text was over Settings.nlp_max_chars
+            info["nlp_chars"] = len(doc.text)
+    return info
+
+
+def assemble_response(extraction: pdf.Extraction, filename: str, result: Dict[str, Any],
+                      fields: Tuple[str, ...], document_info: Dict[str, Any], timings_ms: Dict[str, float],
+                      include_raw: bool = False) -> Dict[str, Any]:
+    """The /parse response for the nested extractor ``result`` of one document"""
+    # Prepare response
+    response_data = {
+        "status": "success",
+        "filename": filename,
+        **result,
+    }
+
+    processing_info: Dict[str, Any] = {"text_length": len(extraction.text), **document_info}
+    processing_info.update(
+        extraction_engine=extraction.engine,
+        pages=extraction.pages,
+        pages_extracted=extraction.pages_extracted,
+    )
+    if fields != extractors.FIELDS:
+        processing_info["fields"] = list(fields)
+    processing_info["timings_ms"] = timings_ms
+    response_data["processing_info"] = processing_info
+
+    # Only include raw_data in development mode
+    if include_raw:
+        response_data["raw_data"] = extraction.text
+
+    return response_data
+
+
+def _build_response(document: ResumeDocument, extraction: pdf.Extraction, filename: str,
+                    include_raw: bool = False, fields: Tuple[str, ...] = extractors.FIELDS,
+                    timer: Optional[timing.StageTimer] = None) -> Dict[str, Any]:
+    """Run the extractors for ``fields`` over an analysed document"""
+    execution = extractors.plan(fields)
+    timer = timer or timing.StageTimer()
+    result = extractors.run(document, execution, timer)
+    return assemble_response(extraction, filename, result, fields, _document_info(document, execution.view),
+                             timer.as_ms(), include_raw)
+
+
+def parse_resume(contents: Union[bytes, UploadBuffer], filename: str, include_raw: bool = False,
+                 fields: Tuple[str, ...] = extractors.FIELDS) -> Dict[str, Any]:
+    """Pipeline behind the /parse endpoint"""
+    timer = timing.StageTimer()
+    with timer.stage(timing.PDF):
+        extraction = _extract_text(contents)
+
+    # Analyse the text at most once; every extractor shares the same spaCy Doc
+    document = ResumeDocument(extraction.text)
+    return _build_response(document, extraction, filename, include_raw, fields, timer)
+
+
+def start_stream(contents: Union[bytes, UploadBuffer],
+                 execution: extractors.Plan) -> Tuple[pdf.Extraction, Dict[str, Any], Dict[str, float]]:
+    """
+    First stage of /parse/stream: extract the text and run the extractors
+    of ``execution`` (those that need no model) over it. Returns the
+    extraction, their values by field and the stage timings.
+    """
+    timer = timing.StageTimer()
+    with timer.stage(timing.PDF):
+        extraction = _extract_text(contents)
+    values = extractors.extract(ResumeDocument(extraction.text), execution, timer)
+    return extraction, values, timer.as_ms()
+
+
+def stream_stage(text: str, execution: extractors.Plan) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, float]]:
+    """A later stage of /parse/stream over the extracted text; also returns its Doc statistics"""
+    timer = timing.StageTimer()
+    document = ResumeDocument(text)
+    values = extractors.extract(document, execution, timer)
+    return values, _document_info(document, execution.view), timer.as_ms()
+
+
+def _batch_error(filename: str, detail: str) -> Dict[str, Any]:
+    return {"status": "error", "filename": filename, "detail": detail}
+
+
+def expand_batch(uploads: List[Tuple[str, Optional[UploadBuffer]]], max_files: int,
+                 max_file_size: int) -> List[Tuple[str, Optional[UploadBuffer], Optional[str]]]:
+    """
+    Flatten uploaded PDFs and zip archives into ``(filename, contents, error)``.
+
+    Non-PDF members of an archive (folders, ``__MACOSX`` metadata, ...) are
+    skipped; oversized members are reported without being decompressed. An
+    upload passed as None was refused for its size while streaming in.
+    """
+    items: List[Tuple[str, Optional[UploadBuffer], Optional[str]]] = []
+    for filename, contents in uploads:
+        lowered = filename.lower()
+        if contents is None:
+            items.append((filename, None, "File size too large"))
+        elif lowered.endswith('.pdf'):
+            items.append((filename, contents, None))
+        elif lowered.endswith('.zip'):
+            try:
+                with zipfile.ZipFile(contents.open()) as archive:
+                    for info in archive.infolist():
+                        name = info.filename
+                        if info.is_dir() or not name.lower().endswith('.pdf') or name.startswith('__MACOSX/'):
+                            continue
+                        member = f"{filename}/{name}"
+                        if info.file_size > max_file_size:
+                            items.append((member, None, "File size too large"))
+                            continue
+                        with archive.open(info) as handle:
+                            data = handle.read(max_file_size + 1)
+                        if len(data) > max_file_size:
+                            items.append((member, None, "File size too large"))
+                        else:
+                            items.append((member, UploadBuffer(data), None))
+            except zipfile.BadZipFile:
+                items.append((filename, None, "Invalid zip archive"))
+        else:
+            items.append((filename, None, "Only PDF and zip files are supported"))
+
+    if len(items) > max_files:
+        raise ValueError(f"Too many files in batch. Maximum {max_files} allowed.")
+    return items
+
+
+def parse_batch(items: List[Tuple[str, UploadBuffer]], batch_size: int = 16, n_process: int = 1,
+                include_raw: bool = False, fields: Tuple[str, ...] = extractors.FIELDS) -> List[Dict[str, Any]]:
+    """
+    Parse several resumes, running the NLP stage (if ``fields`` need it) with ``nlp.pipe``.
+
+    Failures are reported per file so one bad PDF does not fail the batch.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    timers = [timing.StageTimer() for _ in items]
+    extracted: List[Tuple[int, pdf.Extraction]] = []
+    for index, (filename, contents) in enumerate(items):
+        try:
+            with timers[index].stage(timing.PDF):
+                extracted.append((index, _extract_text(contents)))
+        except ValueError as e:
+            results[index] = _batch_error(filename, str(e))
+        except Exception as e:
+            logger.error(f"Error extracting text from {filename}: {e}")
+            results[index] = _batch_error(filename, f"Error processing resume: {str(e)}")
+
+    view_name = extractors.plan(fields).view
+    docs = None
+    if view_name is not None:
+        view = nlp_models.get_view(view_name)
+        docs = iter(view.pipe((extraction.text for _, extraction in extracted), batch_size=batch_size,
+                              n_process=n_process))
+    for index, extraction in extracted:
+        filename = items[index][0]
+        doc = None
+        if docs is not None:
+            # nlp.pipe works a batch at a time: the first document of each batch carries its cost
+            with timers[index].stage(timing.NLP):
+                doc = next(docs)
+        try:
+            document = ResumeDocument(extraction.text, doc=doc, view=view_name)
+            results[index] = _build_response(document, extraction, filename, include_raw, fields, timers[index])
+        except Exception as e:
+            logger.error(f"Error processing resume {filename}: {e}")
+            results[index] = _batch_error(filename, f"Error processing resume: {str(e)}")
+
+    return results
@@ -0,0 +1,131 @@
+"""
+On-demand and sampled request profiling
+
+``run()`` executes a pipeline function where it normally runs (a parse
+worker process or thread) under a stack sampler and, for an explicit
+``?profile=true`` request, also under ``cProfile``. The report carries the
+top functions by cumulative time and collapsed stacks
+(``frame;frame;frame count`` lines, the input of flamegraph.pl and
+speedscope), so a pathological resume can be diagnosed without copying it
+off the server. Pages extracted in the PDF page pool run in other
+processes and only show up as the time spent waiting for them.
+"""
+import cProfile
+import json
+import logging
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+TOP_FUNCTIONS = 40
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+@lru_cache(maxsize=8192)
+def _frame_label(code) -> str:
+    return f"{'/'.join(Path(code.co_filename).parts[-2:])}:{code.co_name}"
+
+
+class StackSampler:
+    """Counts one thread's Python stacks, sampled from a background thread"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="stack-sampler", daemon=True)
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def __enter__(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, most frequent first"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+def top_functions(profiler: cProfile.Profile, limit: int = TOP_FUNCTIONS) -> List[Dict[str, Any]]:
+    """The ``limit`` functions with the most cumulative time"""
+    rows = []
+    for (filename, line, name), (_, calls, own, cumulative, _) in pstats.Stats(profiler).stats.items():
+        rows.append({
+            "function": f"{'/'.join(Path(filename).parts[-2:])}:{line}({name})",
+            "calls": calls,
+            "own_s": round(own, 6),
+            "cumulative_s": round(cumulative, 6),
+        })
+    rows.sort(key=lambda row: -row["cumulative_s"])
+    return rows[:limit]
+
+
+def run(func: Callable[..., Any], args: Sequence[Any], deterministic: bool = False,
+        interval: float = 0.005) -> Tuple[Any, Dict[str, Any]]:
+    """
+    ``func(*args)`` under the stack sampler, plus ``cProfile`` when
+    ``deterministic``; returns the result and the profile report.
+    """
+    profiler = cProfile.Profile() if deterministic else None
+    started = time.perf_counter()
+    with StackSampler(threading.get_ident(), interval) as sampler:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            result = func(*args)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+    report: Dict[str, Any] = {
+        "mode": "deterministic" if deterministic else "sampling",
+        "duration_s": round(time.perf_counter() - started, 6),
+        "interval_s": interval,
+        "samples": sampler.samples,
+        "collapsed": sampler.collapsed(),
+    }
+    if profiler is not None:
+        report["top"] = top_functions(profiler)
+    return result, report
+
+
+def save(report: Dict[str, Any], directory: str, filename: str) -> Optional[str]:
+    """
+    Store ``report`` as ``<stamp>-<filename>.json`` plus a ``.collapsed``
+    stack file next to it; returns the JSON path, or None on failure.
+    """
+    now = time.time()
+    stamp = f"{time.strftime('%Y%m%dT%H%M%S', time.localtime(now))}.{int(now % 1 * 1000):03d}"
+    stem = f"{stamp}-{_UNSAFE.sub('_', Path(filename).stem)[:60] or 'upload'}"
+    try:
+        target = Path(directory)
+        target.mkdir(parents=True, exist_ok=True)
+        (target / f"{stem}.collapsed").write_text(report.get("collapsed", "") + "\n")
+        path = target / f"{stem}.json"
+        path.write_text(json.dumps({**report, "filename": filename}, indent=2))
+    except OSError as e:
+        logger.warning(f"Could not store the profile of {filename}: {e}")
+        return None
+    return str(path)
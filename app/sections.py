@@ -0,0 +1,117 @@
+"""
+Resume section segmentation
+
+The text is split once into header, education, experience, skills,
+languages and other sections by spotting heading lines ("EDUCATION",
+"Work Experience:", "Languages: English, Hindi"). Extractors then scan only
+the region their field lives in, which keeps false positives from the rest
+of the resume out and shrinks the text each of them reads.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+HEADER = "header"
+EDUCATION = "education"
+EXPERIENCE = "experience"
+SKILLS = "skills"
+LANGUAGES = "languages"
+OTHER = "other"
+
+# Non-blank lines at the top of the resume searched for the name
+HEADER_LINES = 8
+# Longer lines are content, not headings
+MAX_HEADING_WORDS = 5
+
+HEADINGS: Dict[str, tuple] = {
+    EDUCATION: (
+        "education", "educational background", "educational qualification", "educational qualifications",
+        "academic background", "academic qualification", "academic qualifications", "academic details",
+        "academics", "academic profile", "education and training", "qualifications", "scholastic profile",
+    ),
+    EXPERIENCE: (
+        "experience", "work experience", "professional experience", "employment", "employment history",
+        "work history", "career history", "internship", "internships", "internship experience",
+        "relevant experience",
+    ),
+    SKILLS: (
+        "skills", "technical skills", "key skills", "core skills", "skill set", "skillset", "it skills",
+        "core competencies", "competencies", "areas of expertise", "expertise", "technologies",
+        "tech stack", "tools and technologies", "programming languages", "soft skills",
+    ),
+    LANGUAGES: (
+        "languages", "languages known", "language known", "language proficiency", "language skills",
+        "linguistic proficiency",
+    ),
+    # Recognized only so that they end the section before them
+    OTHER: (
+        "summary", "professional summary", "career objective", "objective", "profile", "about me",
+        "projects", "academic projects", "personal projects", "certifications", "certificates",
+        "courses", "achievements", "awards", "honors", "honours", "publications", "activities",
+        "extracurricular activities", "hobbies", "interests", "personal details", "personal information",
+        "declaration", "references", "volunteering", "volunteer experience", "strengths",
+    ),
+}
+
+_BULLET = re.compile(r"^[\W\d_]+")
+_SEPARATOR = re.compile(r"[\s&/,]+")
+
+
+def _key(title: str) -> str:
+    """Heading text reduced to its words; "Education & Training" and "education and training" are equal"""
+    return " ".join(word for word in _SEPARATOR.split(title.lower()) if word and word != "and")
+
+
+_HEADING_NAMES: Dict[str, str] = {
+    _key(heading): section for section, headings in HEADINGS.items() for heading in headings
+}
+
+
+@dataclass(frozen=True)
+class Section:
+    """A region of the resume text, from its heading line to the next heading"""
+    name: str  # HEADER, EDUCATION, EXPERIENCE, SKILLS, LANGUAGES or OTHER
+    heading: Optional[str]  # the heading as written; None for the header
+    start: int  # character offsets into the text
+    end: int
+
+
+def heading_section(line: str) -> Optional[str]:
+    """Section a line opens, or None when it is not a heading"""
+    # "Languages: English, Hindi" opens a section with its content on the same line
+    title = _BULLET.sub("", line.partition(":")[0]).strip().rstrip(" -.")
+    if not title or len(title.split()) > MAX_HEADING_WORDS:
+        return None
+    return _HEADING_NAMES.get(_key(title))
+
+
+def segment(text: str) -> List[Section]:
+    """Split ``text`` into consecutive sections; the first one is the (possibly empty) header"""
+    sections: List[Section] = []
+    name, heading, start = HEADER, None, 0
+    offset = 0
+    for line in text.split("\n"):
+        found = heading_section(line) if line.strip() else None
+        if found is not None:
+            sections.append(Section(name, heading, start, offset))
+            name, heading, start = found, line.strip(), offset
+        offset += len(line) + 1
+    sections.append(Section(name, heading, start, len(text)))
+    return sections
+
+
+def header_window(text: str, sections: List[Section], lines: int = HEADER_LINES) -> int:
+    """
+    End offset of the header window: the first ``lines`` non-blank lines,
+    stopping early at the first heading when the resume starts with a header.
+    """
+    header = sections[0]
+    limit = header.end if text[:header.end].strip() else len(text)
+    offset = 0
+    for line in text[:limit].split("\n"):
+        offset += len(line) + 1
+        if line.strip():
+            lines -= 1
+            if lines == 0:
+                break
+    return min(offset, limit)
@@ -0,0 +1,146 @@
+"""
+Compiled skill matcher
+
+The built-in skills list and the app/assets/skills.csv taxonomy are
+compiled once per process into a single spaCy ``PhraseMatcher``. Matching a
+resume is one pass over its tokens, so the per-request cost depends on the
+length of the resume, not on the number of skills in the dictionaries.
+"""
+import csv
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from . import nlp_models
+
+logger = logging.getLogger(__name__)
+
+TAXONOMY_PATH = Path(__file__).parent / "assets" / "skills.csv"
+
+BUILTIN = "builtin"
+TAXONOMY = "taxonomy"
+
+BUILTIN_SKILLS = (
+    # Programming Languages
+    "python", "java", "javascript", "typescript", "c++", "c#", "c", "php", "ruby", "go", "rust", "swift", "kotlin",
+    "scala", "r", "matlab", "sql", "html", "css", "xml", "json", "yaml", "shell", "bash", "powershell",
+
+    # Frameworks and Libraries
+    "react", "vue.js", "angular", "node.js", "express", "django", "flask", "spring", "laravel", "rails",
+    "jquery", "bootstrap", "tailwind css", "sass", "less", "webpack", "babel", "electron", "react native",
+    "flutter", "dart", "xamarin", "ionic", "cordova", "phonegap", "unity", "unreal engine",
+
+    # Databases
+    "mysql", "postgresql", "mongodb", "redis", "cassandra", "dynamodb", "oracle", "sql server", "sqlite",
+    "elasticsearch", "neo4j", "couchdb", "firebase", "mariadb", "nosql", "database management",
+
+    # Cloud and DevOps
+    "aws", "azure", "google cloud", "gcp", "docker", "kubernetes", "jenkins", "terraform", "ansible",
+    "puppet", "chef", "vagrant", "git", "github", "gitlab", "bitbucket", "ci/cd", "devops", "linux",
+    "ubuntu", "centos", "redhat", "debian", "nginx", "apache", "tomcat", "microservices", "serverless",
+
+    # Data Science and ML
+    "machine learning", "deep learning", "neural networks", "convolutional neural networks", "cnn",
+    "recurrent neural networks", "rnn", "natural language processing", "nlp", "computer vision",
+    "image processing", "object detection", "object recognition", "tensorflow", "pytorch", "scikit-learn",
+    "pandas", "numpy", "matplotlib", "seaborn", "plotly", "jupyter", "anaconda", "tableau", "power bi",
+    "data analysis", "data visualization", "statistics", "statistical analysis", "regression", "clustering",
+    "classification", "recommendation systems", "time series analysis", "big data", "hadoop", "spark", "kafka",
+
+    # Mobile Development
+    "ios", "android", "mobile development", "app development", "objective-c",
+
+    # Web Development
+    "web development", "frontend", "backend", "full stack", "responsive design", "ui/ux", "figma",
+    "sketch", "adobe xd", "photoshop", "illustrator", "wireframing", "prototyping",
+
+    # Project Management
+    "project management", "agile", "scrum", "kanban", "waterfall", "jira", "trello", "asana",
+    "confluence", "slack", "teams", "zoom", "leadership", "team management", "communication",
+    "problem-solving", "critical thinking", "creativity", "analytical thinking",
+
+    # Security
+    "cybersecurity", "information security", "network security", "encryption", "authentication",
+    "authorization", "penetration testing", "vulnerability assessment", "security auditing",
+
+    # Quality Assurance
+    "testing", "unit testing", "integration testing", "automated testing", "selenium", "cypress",
+    "jest", "mocha", "chai", "junit", "testng", "quality assurance", "qa", "bug tracking",
+
+    # Office Tools
+    "excel", "word", "powerpoint", "outlook", "google docs", "google sheets", "google slides",
+    "office 365", "sharepoint", "onenote", "visio", "project",
+)
+
+
+@dataclass(frozen=True)
+class SkillMatch:
+    """One skill found in a document"""
+    skill: str  # canonical lowercase dictionary entry
+    text: str  # as written in the resume
+    start: int  # character offsets into the text
+    end: int
+    source: str  # BUILTIN or TAXONOMY
+
+
+def load_taxonomy(path: Path = TAXONOMY_PATH) -> List[str]:
+    """Every non-empty cell of the skills taxonomy CSV, lowercased"""
+    with open(path, newline="", encoding="utf-8", errors="replace") as csvfile:
+        return [cell.strip().lower() for row in csv.reader(csvfile) for cell in row if cell.strip()]
+
+
+class SkillMatcher:
+    """
+    Multi-pattern matcher over a ``{skill: source}`` dictionary.
+
+    Patterns are matched on the ``LOWER`` attribute, so only the tokenizer
+    has to run over a resume. Single-token matches on stop words ("less",
+    "go", ...) are dropped, as the old token filter did.
+    """
+
+    def __init__(self, nlp, terms: Dict[str, str]):
+        from spacy.matcher import PhraseMatcher
+
+        self.vocab = nlp.vocab
+        self.sources = dict(terms)
+        self._matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        for skill, pattern in zip(self.sources, nlp.tokenizer.pipe(self.sources)):
+            self._matcher.add(skill, [pattern])
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def find(self, doc, sources: Optional[Iterable[str]] = None) -> List[SkillMatch]:
+        """All (possibly overlapping) skill matches in ``doc``, in text order"""
+        wanted = set(sources) if sources is not None else None
+        matches = []
+        for match_id, start, end in sorted(self._matcher(doc), key=lambda match: (match[1], match[2])):
+            if end - start == 1 and doc[start].is_stop:
+                continue
+            skill = self.vocab.strings[match_id]
+            source = self.sources[skill]
+            if wanted is not None and source not in wanted:
+                continue
+            span = doc[start:end]
+            matches.append(SkillMatch(skill, span.text, span.start_char, span.end_char, source))
+        return matches
+
+
+@lru_cache(maxsize=None)
+def get_matcher() -> SkillMatcher:
+    """The process-wide matcher over the built-in list and the taxonomy"""
+    terms: Dict[str, str] = {}
+    for skill in BUILTIN_SKILLS:
+        terms.setdefault(skill, BUILTIN)
+    for skill in load_taxonomy():
+        terms.setdefault(skill, TAXONOMY)
+    matcher = SkillMatcher(nlp_models.get_nlp("skills"), terms)
+    logger.info(f"Compiled skill matcher with {len(matcher)} skills")
+    return matcher
+
+
+def unique_skills(matches: Iterable[SkillMatch]) -> List[str]:
+    """Canonical skills in order of first appearance"""
+    return list(dict.fromkeys(match.skill for match in matches))
@@ -0,0 +1,102 @@
+"""
+Specialization (major) catalog index
+
+The majors in app/assets/spe.csv are compiled into a single spaCy
+``PhraseMatcher`` so a resume is scanned once, however large the catalog.
+The index is rebuilt when the file changes on disk, so an updated catalog
+is picked up without restarting the service.
+"""
+import csv
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import nlp_models
+
+logger = logging.getLogger(__name__)
+
+CATALOG_PATH = Path(__file__).parent / "assets" / "spe.csv"
+
+
+@dataclass(frozen=True)
+class Major:
+    """One catalog entry"""
+    code: str  # FOD1P
+    name: str
+    category: str
+
+
+class SpecializationIndex:
+    """
+    Multi-pattern matcher over a majors catalog.
+
+    Patterns are matched on the ``LOWER`` attribute, so the tokenizer is
+    the only part of the pipeline a resume needs.
+    """
+
+    def __init__(self, nlp, majors: List[Major]):
+        from spacy.matcher import PhraseMatcher
+
+        self.vocab = nlp.vocab
+        self.majors: Dict[str, Major] = {}
+        for major in majors:
+            self.majors.setdefault(major.name.lower(), major)
+        self._matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        for key, pattern in zip(self.majors, nlp.tokenizer.pipe(self.majors)):
+            self._matcher.add(key, [pattern])
+
+    def __len__(self) -> int:
+        return len(self.majors)
+
+    def find(self, doc) -> List[Dict[str, Any]]:
+        """Majors found in ``doc`` in order of first appearance, with every match position"""
+        found: Dict[str, Dict[str, Any]] = {}
+        for match_id, start, end in sorted(self._matcher(doc), key=lambda match: (match[1], match[2])):
+            major = self.majors[self.vocab.strings[match_id]]
+            span = doc[start:end]
+            entry = found.get(major.name)
+            if entry is None:
+                entry = found[major.name] = {
+                    "major": major.name,
+                    "category": major.category,
+                    "code": major.code,
+                    "positions": [],
+                }
+            entry["positions"].append([span.start_char, span.end_char])
+        return list(found.values())
+
+
+def load_catalog(path: Path = CATALOG_PATH) -> List[Major]:
+    """Rows of the majors catalog CSV (FOD1P, Major, Major_Category)"""
+    with open(path, newline="", encoding="utf-8", errors="replace") as csvfile:
+        return [
+            Major(row["FOD1P"].strip(), row["Major"].strip(), row["Major_Category"].strip())
+            for row in csv.DictReader(csvfile)
+            if row.get("Major") and row["Major"].strip()
+        ]
+
+
+_lock = threading.Lock()
+_index: Optional[SpecializationIndex] = None
+_signature: Optional[Tuple[int, int]] = None
+
+
+def _file_signature(path: Path) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def get_index(path: Path = CATALOG_PATH) -> SpecializationIndex:
+    """The process-wide index, rebuilt when the catalog file has changed"""
+    global _index, _signature
+    signature = _file_signature(path)
+    if _index is None or signature != _signature:
+        with _lock:
+            if _index is None or signature != _signature:
+                _index = SpecializationIndex(nlp_models.get_nlp("specializations"), load_catalog(path))
+                _signature = signature
+                logger.info(f"Compiled specialization index with {len(_index)} majors from {path.name}")
+    return _index
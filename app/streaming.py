@@ -0,0 +1,82 @@
+"""
+Progressive responses for /parse/stream
+
+A streamed parse runs the stages of ``extractors.stages`` one worker call
+at a time and sends each response section (``personal_info``, ``skills``,
+...) as soon as all of its selected fields are in, then a ``summary``
+event with the status, filename and ``processing_info``. A section whose
+fields come from several stages is also sent as it fills in, marked
+``"partial": true``, so e.g. the email and phone number arrive before the
+name is tagged. Events are NDJSON lines,
+``{"event": "section", "section": ..., "data": ...}``, or server-sent
+events when the client accepts ``text/event-stream``.
+"""
+import json
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from . import extractors
+
+NDJSON = "application/x-ndjson"
+SSE = "text/event-stream"
+
+SECTION = "section"
+SUMMARY = "summary"
+ERROR = "error"
+
+
+def media_type(accept: Optional[str]) -> str:
+    """Server-sent events when the ``Accept`` header asks for them, NDJSON otherwise"""
+    return SSE if accept and SSE in accept else NDJSON
+
+
+def encode(event: str, payload: Dict[str, Any], media: str = NDJSON) -> bytes:
+    """One event in the wire format of ``media``"""
+    if media == SSE:
+        return f"event: {event}\ndata: {json.dumps(jsonable_encoder(payload))}\n\n".encode()
+    return (json.dumps(jsonable_encoder({"event": event, **payload})) + "\n").encode()
+
+
+def section_event(section: str, data: Any, media: str = NDJSON, partial: bool = False) -> bytes:
+    payload = {"section": section, "data": data}
+    if partial:
+        payload["partial"] = True
+    return encode(SECTION, payload, media)
+
+
+def response_sections(fields: Iterable[str]) -> List[str]:
+    """Top-level response keys of ``fields``, in response order"""
+    return list(dict.fromkeys(extractors.section_of(field) for field in fields))
+
+
+class SectionTracker:
+    """Collects field values stage by stage and reports the sections they complete"""
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = tuple(fields)
+        self.values: Dict[str, Any] = {}
+        self._pending: Dict[str, Set[str]] = {}
+        for field in self.fields:
+            self._pending.setdefault(extractors.section_of(field), set()).add(field)
+
+    def add(self, values: Dict[str, Any]) -> List[Tuple[str, Any, bool]]:
+        """
+        Record one stage's values by field; returns ``(section, data, complete)``
+        for each section it completed or added fields to
+        """
+        self.values.update(values)
+        changed = []
+        for section, pending in list(self._pending.items()):
+            if pending.isdisjoint(values):
+                continue
+            pending.difference_update(values)
+            if not pending:
+                del self._pending[section]
+            changed.append((section, not pending))
+        result = self.result()
+        return [(section, result[section], complete) for section, complete in changed]
+
+    def result(self) -> Dict[str, Any]:
+        """The values so far, nested and in response order"""
+        return extractors.nest({field: self.values[field] for field in self.fields if field in self.values})
@@ -0,0 +1,35 @@
+"""
+Per-stage wall-clock timing for the parsing pipeline
+
+A ``StageTimer`` travels with one parse inside the worker and records how
+long each stage took ("pdf", "nlp", "extract.address.location", ...). The
+timings come back in ``processing_info["timings_ms"]``, where the serving
+process feeds them to ``app.metrics``. Timing a stage costs two
+``perf_counter()`` calls.
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+PDF = "pdf"
+NLP = "nlp"
+EXTRACT = "extract"  # prefix: "extract.<field>"
+
+
+class StageTimer:
+    """Accumulates wall time per named stage"""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - started
+
+    def as_ms(self) -> Dict[str, float]:
+        """Stage timings in milliseconds, in the order the stages first ran"""
+        return {name: round(seconds * 1000, 3) for name, seconds in self.seconds.items()}
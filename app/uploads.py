@@ -0,0 +1,239 @@
+"""
+Size-enforced uploads held in a single shared buffer
+
+Uploads are read in chunks and refused as soon as they cross
+``Settings.max_file_size``. Small files stay in memory; larger ones are
+spooled to a temporary file and memory-mapped. Hashing, both PDF engines
+and the page workers all read the same ``UploadBuffer`` without copying it.
+"""
+import io
+import logging
+import mmap
+import os
+import tempfile
+from typing import Any, Dict, Iterable, Optional, Union
+
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Allowance for multipart boundaries, part headers and small form fields
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def too_large(max_size: int, what: str = "File size") -> HTTPException:
+    return HTTPException(status_code=413, detail=f"{what} too large. Maximum {max_size} bytes allowed.")
+
+
+class _BufferReader(io.RawIOBase):
+    """Seekable read-only file over a memoryview, with its own position"""
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(offset, 0)
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._pos:self._pos + len(buffer)]
+        size = len(chunk)
+        buffer[:size] = chunk
+        self._pos += size
+        return size
+
+
+class UploadBuffer:
+    """
+    Bytes of one uploaded file, in memory or in an mmap-backed spool file.
+
+    Pickling a spooled buffer only sends its path, so worker processes map
+    the same pages instead of receiving a copy. The buffer that spooled the
+    file deletes it on ``close()``.
+    """
+
+    def __init__(self, data: bytes = b"", path: Optional[str] = None):
+        self._data = data
+        self.path = path
+        self._owner = path is not None
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+
+    @property
+    def spooled(self) -> bool:
+        return self.path is not None
+
+    @property
+    def size(self) -> int:
+        if self.path is None:
+            return len(self._data)
+        return len(self.view())
+
+    def view(self) -> memoryview:
+        """Zero-copy view of the contents"""
+        if self.path is None:
+            return memoryview(self._data)
+        if self._map is None:
+            self._file = open(self.path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._map)
+
+    def open(self) -> io.BufferedReader:
+        """New independent file object over the contents"""
+        return io.BufferedReader(_BufferReader(self.view()))
+
+    def getvalue(self) -> bytes:
+        """Copy of the contents (only for consumers that need ``bytes``)"""
+        if self.path is None:
+            return self._data
+        return self.view().tobytes()
+
+    def close(self) -> None:
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # A reader still holds a view; the map goes when it does
+                pass
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._owner:
+            self._owner = False
+            try:
+                os.unlink(self.path)
+            except OSError as e:
+                logger.warning(f"Could not remove spooled upload {self.path}: {e}")
+
+    def __enter__(self) -> "UploadBuffer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"data": self._data, "path": self.path}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state["data"], state["path"])
+        # Copies sent to other processes never delete the spool file
+        self._owner = False
+
+
+def as_buffer(contents: Union[bytes, UploadBuffer]) -> UploadBuffer:
+    """Wrap raw bytes (job payloads, archive members, scripts) in a buffer"""
+    if isinstance(contents, UploadBuffer):
+        return contents
+    return UploadBuffer(bytes(contents))
+
+
+async def read_upload(file: UploadFile, max_size: int, spool_threshold: int,
+                      spool_dir: Optional[str] = None) -> UploadBuffer:
+    """
+    Stream ``file`` in chunks into an ``UploadBuffer``.
+
+    Raises a 413 ``HTTPException`` as soon as more than ``max_size`` bytes
+    have been read. Uploads larger than ``spool_threshold`` are written to a
+    temporary file in ``spool_dir`` instead of being kept in memory.
+    """
+    if file.size is not None and file.size > max_size:
+        raise too_large(max_size)
+
+    chunks = []
+    spool = None
+    size = 0
+    try:
+        while True:
+            chunk = await file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise too_large(max_size)
+            if spool is None and size > spool_threshold:
+                spool = tempfile.NamedTemporaryFile(prefix="upload-", suffix=".pdf", dir=spool_dir, delete=False)
+                await run_in_threadpool(spool.writelines, chunks)
+                chunks = []
+            if spool is not None:
+                await run_in_threadpool(spool.write, chunk)
+            else:
+                chunks.append(chunk)
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            os.unlink(spool.name)
+        raise
+
+    if spool is not None:
+        spool.close()
+        return UploadBuffer(path=spool.name)
+    return UploadBuffer(b"".join(chunks))
+
+
+def close_all(buffers: Iterable[Optional[UploadBuffer]]) -> None:
+    for buffer in buffers:
+        if buffer is not None:
+            buffer.close()
+
+
+class UploadLimitMiddleware:
+    """
+    Refuse request bodies over a per-path limit before they are parsed.
+
+    A declared ``Content-Length`` over the limit is rejected up front;
+    otherwise the body is counted as it streams in and cut off with a 413
+    the moment it crosses the limit, so an oversized upload is never fully
+    received or spooled by the multipart parser.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit() and int(value) > limit:
+                await self._reject(limit, send)
+                return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise too_large(limit, "Request body")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @staticmethod
+    async def _reject(limit: int, send) -> None:
+        response = JSONResponse({"detail": too_large(limit, "Request body").detail}, status_code=413)
+        await response({"type": "http"}, None, send)
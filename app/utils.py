@@ -1,52 +1,144 @@
-import csv
 import re
-import locationtagger
-import pandas as pd
-import spacy
 import logging
-from typing import List, Dict, Optional, Set, Union
+from functools import lru_cache
+from typing import Any, List, Dict, Optional, Set, Union
 
-from geopy.geocoders import Nominatim
-from nltk.corpus import stopwords
-from spacy.matcher import Matcher
-from urlextract import URLExtract
+from . import contacts
+from . import keywords
+from . import locations
+from . import nlp_models
+from . import skills as skill_matching
+from . import specializations as specialization_index
+from .analysis import ResumeDocument
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load spaCy model with error handling
-try:
-    nlp = spacy.load("en_core_web_sm")
-    matcher = Matcher(nlp.vocab)
-    logger.info("spaCy model loaded successfully in utils")
-except Exception as e:
-    logger.error(f"Failed to load spaCy model in utils: {e}")
-    nlp = None
-    matcher = None
+# spaCy and nltk are imported on first use (or by the
+# pipeline warmup) so that importing the app stays cheap
 
 
-def extract_name(resume_text: str) -> Optional[str]:
+@lru_cache(maxsize=None)
+def name_matcher():
+    """Matcher for two consecutive proper nouns, over the shared model"""
+    from spacy.matcher import Matcher
+
+    matcher = Matcher(nlp_models.get_nlp("utils").vocab)
+    # First name and Last name are always Proper Nouns
+    matcher.add('NAME', [[{'POS': 'PROPN'}, {'POS': 'PROPN'}]])
+    return matcher
+
+
+@lru_cache(maxsize=None)
+def english_stopwords() -> frozenset:
+    """nltk's English stop words"""
+    from nltk.corpus import stopwords
+
+    return frozenset(stopwords.words('english'))
+
+
+# Start of an institution's name; a keyword also matches the rest of its word ("univers" -> "University")
+COLLEGE_KEYWORDS = (
+    'school', 'college', 'univers', 'academy', 'faculty', 'institute', 'faculdades', 'schola', 'schule',
+    'hochschule', 'fachhochschule', 'lise', 'lyceum', 'lycee', 'lycée', 'polytechnic', 'kolej', 'ünivers',
+    'okul',
+)
+
+# Spelling variant -> language name
+LANGUAGES = {
+    **{language.lower(): language for language in (
+        'English', 'Marathi', 'Telugu', 'Hindi', 'Malayalam', 'Kannada', 'Tamil', 'Spanish', 'French',
+        'Urdu', 'Bengali', 'Punjabi', 'Gujarati',
+    )},
+    'bangla': 'Bengali',
+}
+
+# Degree names; an abbreviation also matches with a trailing dot ("B.Tech" and "B.Tech.")
+DEGREES = (
+    'B.A', 'B.S', 'B.Sc', 'M.A', 'M.S', 'M.Sc', 'Ph.D', 'M.B.A', 'B.E', 'M.E', 'B.Tech', 'M.Tech',
+    'B.Com', 'M.Com', 'J.D', 'SSC', 'HSC', 'CBSE', 'ICSE',
+    'Bachelor of Technology', 'Master of Technology', 'Bachelor of Science', 'Master of Science',
+    'Bachelor of Arts', 'Master of Arts', 'Doctor of Philosophy', 'Bachelor of Commerce', 'Master of Commerce',
+    'Bachelor of Engineering', 'Master of Engineering', 'Associate of Arts', 'Associate of Science',
+    'Associate of Applied Science', 'Juris Doctor', 'Diploma', 'Postgraduate Diploma', 'Graduate Diploma',
+    'Advanced Diploma',
+)
+# "Bachelor of Technology in Computer Science", up to the end of the line
+DEGREE_TAIL = r"\.?(?: in [\w \t]+)?"
+
+# Education level tokens looked for by extract_education
+EDUCATION = (
+    'BE', 'B.E.', 'B.E', 'BS', 'B.S',
+    'ME', 'M.E', 'M.E.', 'MS', 'M.S',
+    'BTECH', 'B.TECH', 'Bachelor of Technology', 'M.TECH', 'MTECH',
+    'SSC', 'HSC', 'CBSE', 'ICSE', 'X', 'XII',
+)
+
+
+@lru_cache(maxsize=None)
+def college_keywords() -> keywords.KeywordIndex:
+    """Compiled institution keywords"""
+    return keywords.KeywordIndex(COLLEGE_KEYWORDS, prefix=True)
+
+
+@lru_cache(maxsize=None)
+def language_keywords() -> keywords.KeywordIndex:
+    """Compiled language names"""
+    return keywords.KeywordIndex(LANGUAGES)
+
+
+@lru_cache(maxsize=None)
+def degree_keywords() -> keywords.KeywordIndex:
+    """Compiled degree names, extended by their "in <subject>" tail"""
+    return keywords.KeywordIndex(DEGREES, tail=DEGREE_TAIL)
+
+
+@lru_cache(maxsize=None)
+def education_keywords() -> keywords.KeywordIndex:
+    """Compiled education level tokens"""
+    return keywords.KeywordIndex(EDUCATION, tail=r"\.?")
+
+
+def load_dictionaries() -> None:
+    """Preload the asset dictionaries and helpers used by the extractors"""
+    name_matcher()
+    contacts.load_tlds()
+    try:
+        english_stopwords()
+    except LookupError:
+        # Only the legacy education extractor reads them; it retries on first use
+        logger.warning("nltk stopwords corpus not found (python -m nltk.downloader stopwords); loading it lazily")
+    college_keywords()
+    language_keywords()
+    degree_keywords()
+    education_keywords()
+    skill_matching.get_matcher()
+    specialization_index.get_index()
+    locations.get_resolver()
+
+
+def as_document(resume: Union[str, ResumeDocument]) -> ResumeDocument:
+    """Wrap raw text in a ResumeDocument; documents are passed through"""
+    if isinstance(resume, ResumeDocument):
+        return resume
+    return ResumeDocument(resume)
+
+
+def extract_name(document: ResumeDocument) -> Optional[str]:
     """Extract name from resume text using spaCy NLP"""
-    if not nlp:
-        logger.error("spaCy model not loaded")
-        return None
-    
     try:
-        nlp_text = nlp(resume_text)
+        document = as_document(document)
+        nlp_text = document.get_doc("tagger")
         
-        # First name and Last name are always Proper Nouns
-        pattern = [{'POS': 'PROPN'}, {'POS': 'PROPN'}]
-        
-        matcher.add('NAME', [pattern], on_match=None)
-        matches = matcher(nlp_text)
+        matches = name_matcher()(nlp_text)
         
         for match_id, start, end in matches:
             span = nlp_text[start:end]
             return span.text
         
         # Fallback: look for PERSON entities
-        for ent in nlp_text.ents:
+        for ent in document.get_doc("ner").ents:
             if ent.label_ == "PERSON":
                 return ent.text
         
@@ -56,191 +148,74 @@ def extract_name(resume_text: str) -> Optional[str]:
         return None
 
 
-def get_email(txt: str) -> Set[str]:
+def get_email(document: ResumeDocument) -> Set[str]:
     """Extract email addresses from text"""
     try:
-        EMAIL_REG = re.compile(r'[a-zA-Z_0-9\.\-+]+@[a-z0-9\.\-+]+\.[a-z]+')
-        email = re.findall(EMAIL_REG, txt)
-        return set(email)
+        matches = as_document(document).contact_matches(contacts.EMAIL)
+        return {match.text for match in matches}
     except Exception as e:
         logger.error(f"Error extracting email: {e}")
         return set()
 
 
-def get_phone(txt: str) -> Optional[str]:
+def get_phone(document: ResumeDocument) -> Optional[str]:
     """Extract phone number from text"""
     try:
-        PHONE_REG = re.compile(r'[\+\(]?[1-9][0-9.\-\(\)]{8,}[0-9]')
-        phone = re.findall(PHONE_REG, txt)
-        
-        if phone:
-            number = ''.join(phone[0])
-            if txt.find(number) >= 0 and len(number) <= 16:
-                return number
+        for match in as_document(document).contact_matches(contacts.PHONE):
+            if len(match.text) <= 16:
+                return match.text
         return None
     except Exception as e:
         logger.error(f"Error extracting phone: {e}")
         return None
 
 
-def linkedin(text: str) -> str:
+def linkedin(document: ResumeDocument) -> str:
     """Extract LinkedIn profile URL from text"""
     try:
-        pat = re.compile(
-            r"((?:(?:[\w]+\.)?linkedin\.com\/(?:pub|in|profile)\/(?:[-a-zA-Z0-9]+)\/*))"
-        )
-        matches = pat.findall(text)
-        
-        if len(matches) == 0:
-            return ""
-        return matches[0]  # Return the first occurrence
+        matches = as_document(document).contact_matches(contacts.LINKEDIN)
+        return matches[0].text if matches else ""  # Return the first occurrence
     except Exception as e:
         logger.error(f"Error extracting LinkedIn: {e}")
         return ""
 
 
-def extract_github(text: str) -> str:
+def extract_github(document: ResumeDocument) -> str:
     """Extract GitHub username from text"""
     try:
-        pat = re.compile(r"(?:http[s]?://)?github\.com/([^\s^/]+)")
-        matches = pat.findall(text)
-        
-        if len(matches) == 0:
-            return ""
-        return matches[0]  # Return the first occurrence
+        matches = as_document(document).contact_matches(contacts.GITHUB)
+        return matches[0].value if matches else ""  # Return the first occurrence
     except Exception as e:
         logger.error(f"Error extracting GitHub: {e}")
         return ""
 
 
-def extract_urls(text: str) -> List[str]:
+def extract_urls(document: ResumeDocument) -> List[str]:
     """Extract URLs from text"""
     try:
-        extractor = URLExtract()
-        urls = extractor.find_urls(text)
-        return urls
+        return [match.text for match in as_document(document).contact_matches(contacts.URL)]
     except Exception as e:
         logger.error(f"Error extracting URLs: {e}")
         return []
 
 
-def get_skills(txt: str) -> list[str]:
-    nlp_text = nlp(txt)
-
-    # removing stop words and implementing word tokenization
-    tokens = [token.text for token in nlp_text if not token.is_stop]
-
-    # reading the csv file
-    data = pd.read_csv("./app/assets/skills.csv")
-
-    # extract values
-    skills = list(data.columns.values)
-
-    skillset = []
-
-    # check for one-grams (example: python)
-    for token in tokens:
-        if token.lower() in skills:
-            skillset.append(token)
-
-    # check for bi-grams and tri-grams (example: machine learning)
-    for token in nlp_text.noun_chunks:
-        token = token.text.lower().strip()
-        if token in skills:
-            skillset.append(token)
+def get_skills(document: ResumeDocument) -> list[str]:
+    """Skills from the app/assets/skills.csv taxonomy"""
+    nlp_text = as_document(document).get_doc("tokenizer")
+    matches = skill_matching.get_matcher().find(nlp_text, sources=[skill_matching.TAXONOMY])
+    return [skill.capitalize() for skill in skill_matching.unique_skills(matches)]
 
-    return [i.capitalize() for i in set([i.lower() for i in skillset])]
 
-
-def extract_skills_new(resume_text: str) -> List[str]:
-    """Extract skills from resume text using an improved skill matching algorithm"""
-    if not nlp:
-        logger.error("spaCy model not loaded")
-        return []
-    
+def extract_skills_new(document: ResumeDocument) -> List[str]:
+    """Extract skills from resume text using the compiled skill matcher"""
     try:
-        nlp_text = nlp(resume_text.lower())
-        
-        # removing stop words and implementing word tokenization
-        tokens = [token.text for token in nlp_text if not token.is_stop]
-        
-        # Comprehensive skills list
-        skills = [
-            # Programming Languages
-            "python", "java", "javascript", "typescript", "c++", "c#", "c", "php", "ruby", "go", "rust", "swift", "kotlin",
-            "scala", "r", "matlab", "sql", "html", "css", "xml", "json", "yaml", "shell", "bash", "powershell",
-            
-            # Frameworks and Libraries
-            "react", "vue.js", "angular", "node.js", "express", "django", "flask", "spring", "laravel", "rails",
-            "jquery", "bootstrap", "tailwind css", "sass", "less", "webpack", "babel", "electron", "react native",
-            "flutter", "dart", "xamarin", "ionic", "cordova", "phonegap", "unity", "unreal engine",
-            
-            # Databases
-            "mysql", "postgresql", "mongodb", "redis", "cassandra", "dynamodb", "oracle", "sql server", "sqlite",
-            "elasticsearch", "neo4j", "couchdb", "firebase", "mariadb", "nosql", "database management",
-            
-            # Cloud and DevOps
-            "aws", "azure", "google cloud", "gcp", "docker", "kubernetes", "jenkins", "terraform", "ansible",
-            "puppet", "chef", "vagrant", "git", "github", "gitlab", "bitbucket", "ci/cd", "devops", "linux",
-            "ubuntu", "centos", "redhat", "debian", "nginx", "apache", "tomcat", "microservices", "serverless",
-            
-            # Data Science and ML
-            "machine learning", "deep learning", "neural networks", "convolutional neural networks", "cnn",
-            "recurrent neural networks", "rnn", "natural language processing", "nlp", "computer vision",
-            "image processing", "object detection", "object recognition", "tensorflow", "pytorch", "scikit-learn",
-            "pandas", "numpy", "matplotlib", "seaborn", "plotly", "jupyter", "anaconda", "tableau", "power bi",
-            "data analysis", "data visualization", "statistics", "statistical analysis", "regression", "clustering",
-            "classification", "recommendation systems", "time series analysis", "big data", "hadoop", "spark", "kafka",
-            
-            # Mobile Development
-            "ios", "android", "mobile development", "app development", "swift", "objective-c", "kotlin", "java",
-            "react native", "flutter", "xamarin", "ionic", "cordova", "phonegap",
-            
-            # Web Development
-            "web development", "frontend", "backend", "full stack", "responsive design", "ui/ux", "figma",
-            "sketch", "adobe xd", "photoshop", "illustrator", "wireframing", "prototyping",
-            
-            # Project Management
-            "project management", "agile", "scrum", "kanban", "waterfall", "jira", "trello", "asana",
-            "confluence", "slack", "teams", "zoom", "leadership", "team management", "communication",
-            "problem-solving", "critical thinking", "creativity", "analytical thinking",
-            
-            # Security
-            "cybersecurity", "information security", "network security", "encryption", "authentication",
-            "authorization", "penetration testing", "vulnerability assessment", "security auditing",
-            
-            # Quality Assurance
-            "testing", "unit testing", "integration testing", "automated testing", "selenium", "cypress",
-            "jest", "mocha", "chai", "junit", "testng", "quality assurance", "qa", "bug tracking",
-            
-            # Office Tools
-            "excel", "word", "powerpoint", "outlook", "google docs", "google sheets", "google slides",
-            "office 365", "sharepoint", "onenote", "visio", "project"
-        ]
-        
-        # create a set of lowercase skills for comparison
-        lowercase_skills = set([skill.lower() for skill in skills])
-        
-        skillset = []
-        
-        # check for one-grams (example: python)
-        for token in tokens:
-            if token in lowercase_skills:
-                skillset.append(token)
-        
-        # check for bi-grams and tri-grams (example: machine learning)
-        for i in range(len(tokens) - 1):
-            bigram = f"{tokens[i]} {tokens[i + 1]}"
-            if bigram in lowercase_skills:
-                skillset.append(bigram)
-        
-        for i in range(len(tokens) - 2):
-            trigram = f"{tokens[i]} {tokens[i + 1]} {tokens[i + 2]}"
-            if trigram in lowercase_skills:
-                skillset.append(trigram)
+        # matching runs on lowercase token text, the tokenizer alone is enough
+        nlp_text = as_document(document).get_doc("tokenizer")
+        # the taxonomy holds headings and generic words ("Technical Skills", "Analysis"): get_skills reads it
+        matches = skill_matching.get_matcher().find(nlp_text, sources=[skill_matching.BUILTIN])
         
         # Return capitalized unique skills
-        return [skill.title() for skill in set(skillset)]
+        return [skill.title() for skill in skill_matching.unique_skills(matches)]
     
     except Exception as e:
         logger.error(f"Error extracting skills: {e}")
@@ -263,127 +238,32 @@ def extract_skills_new(resume_text: str) -> List[str]:
 #     # Combine and return the results
 #     return university_matches
 
-def extract_course_name(text: str):
-    # Define a list of degrees and their variations
-    degrees = ["B\.A\.", "B\.S\.", "B\.Sc\.", "M\.A\.", "M\.S\.", "M\.Sc\.", "Ph\.D\.",
-               "M\.B\.A\.", "B\.E\.", "M\.E\.", "B\.Tech\.", "M\.Tech\.",
-               "B\.Com\.", "M\.Com\.",
-               'SSC', 'HSC', 'CBSE', 'ICSE'
-               r"[^a-zA-Z\d] Board",
-               r"Bachelor of Technology(?: in [\w\s]+)?",
-               r"Master of Technology(?: in [\w\s]+)?",
-               r"Bachelor of Science(?: in [\w\s]+)?",
-               r"Master of Science(?: in [\w\s]+)?",
-               r"Bachelor of Arts(?: in [\w\s]+)?",
-               r"Master of Arts(?: in [\w\s]+)?",
-               r"Doctor of Philosophy(?: in [\w\s]+)?",
-               r"Bachelor of Commerce(?: in [\w\s]+)?",
-               r"Master of Commerce(?: in [\w\s]+)?",
-               r"Bachelor of Engineering(?: in [\w\s]+)?",
-               r"Master of Engineering(?: in [\w\s]+)?",
-               r"Associate of Arts(?: in [\w\s]+)?",
-               r"Associate of Science(?: in [\w\s]+)?",
-               r"Associate of Applied Science(?: in [\w\s]+)?",
-               r"Juris Doctor(?: in [\w\s]+)?",
-               "J\.D\."
-               "Diploma",
-               r"Diploma(?: in [\w\s]+)?",
-               r"Postgraduate Diploma(?: in [\w\s]+)?",
-               r"Graduate Diploma(?: in [\w\s]+)?",
-               r"Advanced Diploma(?: in [\w\s]+)?",
-               ]
-
-    degree_pattern = re.compile("|".join(degrees), re.IGNORECASE)
-    matches = degree_pattern.findall(text)
-
-    degree_list = []
-    for match in matches:
-        degree_list.append(match)
-
-    return degree_list
-
-
-def extract_specializations(resume_text):
-
-    # specializations = [
-    #     "Computer Science",
-    #     "Computer Engineering",
-    #     "Civil Engineering",
-    #     "Electrical Engineering",
-    #     "Mechanical Engineering",
-    #     "Chemical Engineering",
-    #     "Aerospace Engineering",
-    #     "Industrial Engineering",
-    #     "Material Engineering",
-    #     "Biomedical Engineering",
-    #     "Environmental Engineering",
-    #     "Software Engineering"
-    # ]
-
-    specializations = []
-
-    with open("app/assets/spe.csv", "r") as csvfile:
-        csvreader = csv.reader(csvfile)
-        header = next(csvreader)
-        for row in csvreader:
-            specializations.append(row[1])
-
-    found_specializations = []
-
-    for specialization in specializations:
-        if re.search(specialization, resume_text, re.IGNORECASE):
-            found_specializations.append(specialization)
-
-    return found_specializations
-
-
-def get_college(txt):
-    RESERVED_WORDS = [
-        'school',
-        'college',
-        'univers',
-        'academy',
-        'faculty',
-        'institute',
-        'faculdades',
-        'Schola',
-        'schule',
-        'lise',
-        'lyceum',
-        'lycee',
-        'polytechnic',
-        'kolej',
-        'ünivers',
-        'okul',
-    ]
-    RESERVED_WORDS = [m.capitalize() for m in RESERVED_WORDS]+[m.upper()
-                                                               for m in RESERVED_WORDS]+RESERVED_WORDS
-    line = txt.split('\n')
-    edu = []
-    for i in line:
-        for j in RESERVED_WORDS:
-            if j in i:
-                edu.append(i)
-
-    return edu
-
-
-def get_language(txt):
-    lang = ['English', 'Marathi', 'Telugu', 'Hindi', 'Malayalam', 'Kannada',
-            'Tamil', 'Spanish', 'French', 'Urdu', 'Bengalis', 'Punjabi', 'Gujarati']
-    lang = [m.capitalize() for m in lang] + [m.lower() for m in lang] + lang
-    lines = txt.split('\n')
-    detected_languages = []
-
-    for line in lines:
-        for language in lang:
-            if language in line:
-                detected_languages.append(language)
-
-    if len(detected_languages) > 0:
-        return list(set(detected_languages))
-    else:
-        return None
+def extract_course_name(document: ResumeDocument):
+    """Degree names as written, e.g. "B.Tech. in Computer Science", in text order"""
+    return [match.text.strip() for match in degree_keywords().find(as_document(document).text)]
+
+
+def extract_specializations(document: ResumeDocument) -> List[Dict[str, Any]]:
+    """Majors from app/assets/spe.csv with their category and match positions"""
+    nlp_text = as_document(document).get_doc("tokenizer")
+    return specialization_index.get_index().find(nlp_text)
+
+
+def get_college(document: ResumeDocument):
+    """Lines naming an institution (school, college, university, ...), each once"""
+    text = as_document(document).text
+    edu = {}
+    for match in college_keywords().find(text):
+        start = text.rfind('\n', 0, match.start) + 1
+        end = text.find('\n', match.end)
+        edu.setdefault(start, text[start:end if end != -1 else len(text)])
+    return list(edu.values())
+
+
+def get_language(document: ResumeDocument):
+    """Languages mentioned in the text, or None"""
+    detected_languages = language_keywords().found_labels(as_document(document).text)
+    return detected_languages or None
 
 
 def contains_integer(s):
@@ -397,69 +277,57 @@ def check_list(lst):
         print("No integer found in second last string")
 
 
-def get_location(txt):
-    place = locationtagger.find_locations(text=txt)
-    # doc = nlp(txt)
-
-    # locations = [ent.text for ent in doc.ents if ent.label_ == "GPE"]
-    cities = place.cities
+ADDRESS_PATTERN = re.compile(r'([A-Za-z]+(?:[ -][A-Za-z]+)*),\s*([A-Za-z]{2})\s*(\d{5}(?:-\d{4})?)?')
+ZIP_CODE_PATTERN = contacts.ZIP_PATTERN
 
-    # Define the city
-    city = cities[0]
-    geolocator = Nominatim(user_agent="geoapiExercises")
 
-    # Perform a geocode lookup for the city
-    location = geolocator.geocode(city, language="en")
-    print(location)
-    if location:
-        address = location.address.split(', ')
-        print("ADD")
-        print(address)
+def location_candidates(document: ResumeDocument) -> List[str]:
+    """Place names from spaCy GPE/LOC entities and address lines, in text order"""
+    document = as_document(document)
+    found = [(ent.start_char, ent.text) for ent in document.get_doc("ner").ents if ent.label_ in ("GPE", "LOC")]
+    for match in ADDRESS_PATTERN.finditer(document.text):
+        # "Based in Pune, MH 411001": the city is among the last words before the comma
+        words = match.group(1).split()
+        found += [(match.end(1) - len(" ".join(words[-n:])), " ".join(words[-n:]))
+                  for n in range(min(len(words), 3), 0, -1)]
+    candidates = {}
+    for _, name in sorted(found):
+        candidates.setdefault(name.strip().lower(), name.strip())
+    return [name for name in candidates.values() if name]
 
-        state = None
-        country = None
-        zip_code = None
-
-        if len(address) > 0:
-            last_element = address[-1]
-            country = last_element
-        else:
-            last_element = None
-
-        if len(address) >= 1 and contains_integer(address[-2]):
-            last_second_element = address[-2]
-            zip_code = last_second_element
-        else:
-            print("No integer found in second last string")
-            last_second_element = None
 
-        if len(address) > 2:
-            last_third_element = address[-3]
-            state = last_third_element
-        else:
-            last_third_element = None
-
-        return {
-            "formatted": None,
-            "streetNumber": None,
-            "street": None,
-            "apartmentNumber": None,
-            "city": city,
-            "postalCode": zip_code,
-            "state": state,
-            "country": country,
-            # "raw": location,
-        }
-    else:
+def get_location(document: ResumeDocument) -> Optional[Dict[str, Any]]:
+    """First candidate place that the location resolver can resolve"""
+    document = as_document(document)
+    resolved = locations.get_resolver().first(location_candidates(document))
+    if resolved is None:
         return None
-
-
-def extract_address(resume_text):
-    # Regex pattern for city, state, and zip code
-    pattern = r'([A-Za-z]+(?:[ -][A-Za-z]+)*),\s*([A-Za-z]{2})\s*(\d{5}(?:-\d{4})?)?'
-
-    # Find all matches in the resume text
-    matches = re.finditer(pattern, resume_text)
+    city, location = resolved
+
+    # A zip code on the same line as the city beats the gazetteer default
+    postal_code = location.postal_code
+    for line in document.lines:
+        if city in line:
+            zip_codes = ZIP_CODE_PATTERN.findall(line)
+            if zip_codes:
+                postal_code = zip_codes[0]
+            break
+
+    return {
+        "formatted": None,
+        "streetNumber": None,
+        "street": None,
+        "apartmentNumber": None,
+        "city": city,
+        "postalCode": postal_code,
+        "state": location.state,
+        "country": location.country,
+    }
+
+
+def extract_address(document: ResumeDocument):
+    # Find all city, state and zip code matches in the resume text
+    matches = ADDRESS_PATTERN.finditer(as_document(document).text)
 
     # Extract the addresses
     addresses = [match.group(0) for match in matches]
@@ -467,12 +335,9 @@ def extract_address(resume_text):
     return addresses
 
 
-def extract_zip_code(resume_text):
-    # Use regex to extract zip code
-    zip_code_pattern = r"\b(?:\d{5}(?:-\d{4})?|\d{6})\b"
-    zip_codes = re.findall(zip_code_pattern, resume_text)
-
-    return zip_codes
+def extract_zip_code(document: ResumeDocument):
+    # Zip codes come from the shared contact scan
+    return [match.text for match in as_document(document).contact_matches(contacts.ZIP)]
 
 # def extract_addresses(text):
 #     # Regex pattern for city, state, and zip code
@@ -493,31 +358,22 @@ def extract_zip_code(resume_text):
 #     return addresses
 
 
-def extract_education(resume_text):
-    nlp_text = nlp(resume_text)
-
+def extract_education(document: ResumeDocument):
     # Sentence Tokenizer
-    nlp_text = [sent.text.strip() for sent in nlp_text.sents]
+    nlp_text = as_document(document).sents
 
     # Grad all general stop words
-    STOPWORDS = set(stopwords.words('english'))
-
-    # Education Degrees
-    EDUCATION = [
-        'BE', 'B.E.', 'B.E', 'BS', 'B.S',
-        'ME', 'M.E', 'M.E.', 'MS', 'M.S',
-        'BTECH', 'B.TECH', 'Bachelor of Technology', 'M.TECH', 'MTECH',
-        'SSC', 'HSC', 'CBSE', 'ICSE', 'X', 'XII'
-    ]
+    STOPWORDS = english_stopwords()
 
     edu = {}
     # Extract education degree
     for index, text in enumerate(nlp_text):
-        for tex in text.split():
+        for match in education_keywords().find(text):
             # Replace all special symbols
-            tex = re.sub(r'[?|$|.|!|,]', r'', tex)
-            if tex.upper() in EDUCATION and tex not in STOPWORDS:
-                edu[tex] = text + nlp_text[index + 1]
+            tex = re.sub(r'[?|$|.|!|,]', r'', match.text)
+            if tex not in STOPWORDS:
+                # the year is often in the next sentence, if the section has one
+                edu[tex] = text + (nlp_text[index + 1] if index + 1 < len(nlp_text) else '')
 
     education = []
     for key in edu.keys():
@@ -0,0 +1,282 @@
+"""
+Process pool that runs the CPU-bound parsing pipeline off the event loop
+
+Each parse worker is a single-process executor that is handed one task at
+a time, first come first served, so a worker can be replaced on its own
+(over its memory limits, or broken) while the others keep running.
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from . import memory
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# A worker that keeps breaking is replaced after a delay that doubles per consecutive failure
+RESTART_BACKOFF = 1.0  # seconds
+RESTART_BACKOFF_MAX = 60.0
+
+
+def _init_worker() -> None:
+    """Runs once in every worker process before it accepts tasks"""
+    memory.start_tracing(get_settings().memory_tracemalloc_frames)
+    try:
+        from . import pipeline
+
+        pipeline.warmup()
+    except Exception:
+        # Raising here would break the worker; what did not preload loads on first use
+        logger.exception(f"Parse worker {os.getpid()} warmup failed, it will load models lazily")
+    memory.mark_baseline()
+    logger.info(f"Parse worker {os.getpid()} ready")
+
+
+class _Worker:
+    """One parse worker slot; its process is replaced on its own when it has to go"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.tasks = 0  # run by the current process
+
+    def start(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context(get_settings().worker_start_method),
+                initializer=_init_worker,
+            )
+            self.tasks = 0
+        return self.executor
+
+    def retire(self, wait: bool = False) -> None:
+        """Let the process exit once its task is over"""
+        executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def kill(self) -> None:
+        """Stop the process in the middle of its task"""
+        executor, self.executor = self.executor, None
+        if executor is None:
+            return
+        terminate = getattr(executor, "terminate_workers", None)  # Python 3.14+
+        if terminate is not None:
+            terminate()
+        else:
+            for process in list((executor._processes or {}).values()):
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+_lock = threading.Lock()
+_workers: List[_Worker] = []
+_idle: Deque[_Worker] = deque()  # warmed up and waiting for a task
+_waiters: Deque[asyncio.Future] = deque()
+_failures = 0
+_restart_at = 0.0
+
+
+def pool_size() -> int:
+    """Configured number of worker processes (0 means in-process threads)"""
+    workers = get_settings().worker_processes
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(workers, 0)
+
+
+def start() -> bool:
+    """
+    Start the parse worker processes if they are enabled and not running
+    yet (on the event loop); False in thread mode. A worker takes tasks once
+    it has warmed up.
+    """
+    with _lock:
+        if _workers or pool_size() == 0:
+            return bool(_workers)
+        settings = get_settings()
+        _workers.extend(_Worker(index) for index in range(pool_size()))
+        logger.info(
+            f"Started {pool_size()} parse workers "
+            f"(timeout {settings.task_timeout}s, recycle after {settings.max_tasks_per_child or 'unlimited'} tasks)"
+        )
+    for worker in _workers:
+        _spawn(worker)
+    return True
+
+
+def shutdown(wait: bool = True) -> None:
+    """Stop the parse workers, letting running tasks finish when ``wait``"""
+    with _lock:
+        stopped = list(_workers)
+        _workers.clear()
+        _idle.clear()
+    while _waiters:
+        _waiters.popleft().cancel()
+    for worker in stopped:
+        worker.retire(wait)
+    if stopped:
+        logger.info("Parse workers stopped")
+
+
+def _call(func: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[Any, Dict[str, Any]]:
+    """Run a task and report the memory of the process that ran it along with the result"""
+    return func(*args), memory.usage()
+
+
+def _submit(worker: _Worker, func: Callable[..., Any], args: Tuple[Any, ...]) -> Future:
+    """Send a task to the worker's process; ``_finished`` runs on this event loop when it is over"""
+    executor = worker.start()
+    future = executor.submit(_call, func, args)
+    worker.tasks += 1
+    future.add_done_callback(functools.partial(_on_loop, asyncio.get_running_loop(), _finished, worker, executor))
+    return future
+
+
+def _spawn(worker: _Worker) -> None:
+    """Start a fresh process for the worker; it joins the idle workers once its warmup task is done"""
+    if worker in _workers:
+        _submit(worker, os.getpid, ())
+
+
+def _on_loop(loop: asyncio.AbstractEventLoop, callback: Callable[..., None], *args: Any) -> None:
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        pass  # the loop closed while the task ran
+
+
+async def _acquire() -> _Worker:
+    """Wait for an idle worker, first come first served"""
+    if _idle:
+        return _idle.popleft()
+    waiter = asyncio.get_running_loop().create_future()
+    _waiters.append(waiter)
+    try:
+        return await waiter
+    except asyncio.CancelledError:
+        if waiter.done() and not waiter.cancelled():
+            # the worker was handed over just as the wait ended: pass it on
+            _release(waiter.result())
+        elif waiter in _waiters:
+            _waiters.remove(waiter)
+        raise
+
+
+def _release(worker: _Worker) -> None:
+    """Hand an idle worker to the longest waiting task"""
+    while _waiters:
+        waiter = _waiters.popleft()
+        if not waiter.done():
+            waiter.set_result(worker)
+            return
+    _idle.append(worker)
+
+
+def _finished(worker: _Worker, executor: ProcessPoolExecutor, future: Future) -> None:
+    """
+    Runs on the event loop once a worker's task is over. A worker that
+    broke, was stopped, went over a memory limit (see ``app.memory``) or ran
+    ``Settings.max_tasks_per_child`` tasks gets a fresh process, after a
+    backoff while workers keep breaking, and takes tasks again once that
+    process has warmed up.
+    """
+    global _failures, _restart_at
+    if worker not in _workers:
+        return  # shut down meanwhile
+    error = None if future.cancelled() else future.exception()
+    if worker.executor is executor:
+        if isinstance(error, BrokenProcessPool):
+            logger.error(f"Parse worker {worker.index} broke, restarting it")
+            _failures += 1
+            _restart_at = time.monotonic() + min(RESTART_BACKOFF * 2 ** (_failures - 1), RESTART_BACKOFF_MAX)
+            worker.retire()
+        elif error is None and not future.cancelled():
+            _failures = 0
+            figures = future.result()[1]
+            memory.record(figures)
+            reason = memory.over_limit(figures)
+            if reason is not None:
+                from . import metrics
+
+                logger.warning(f"Parse worker {figures['pid']} is over its {reason} limit, replacing it")
+                metrics.RECYCLES.labels("parse_worker", reason).inc()
+                worker.retire()
+            elif 0 < get_settings().max_tasks_per_child < worker.tasks:
+                worker.retire()
+    if worker.executor is None:
+        asyncio.get_running_loop().call_later(max(_restart_at - time.monotonic(), 0), _spawn, worker)
+    else:
+        _release(worker)
+
+
+async def run(func: Callable[..., Any], *args: Any, timeout: Optional[float] = None,
+              count_wait: bool = True) -> Any:
+    """
+    Run ``func(*args)`` in a parse worker and await its result.
+
+    Raises ``asyncio.TimeoutError`` once ``timeout`` (default
+    ``Settings.task_timeout``) elapses, counting the wait for an idle
+    worker unless ``count_wait`` is False; the worker process still running
+    the task is stopped. In thread mode the task cannot be stopped and runs
+    on in the background after the timeout. ``BrokenProcessPool`` is raised
+    when every worker is waiting to be restarted after breaking.
+    """
+    loop = asyncio.get_running_loop()
+    if timeout is None:
+        timeout = get_settings().task_timeout
+    if not start():
+        # Thread mode still keeps the event loop free for /health
+        future = loop.run_in_executor(None, functools.partial(_call, func, args))
+        result, figures = await asyncio.wait_for(future, timeout=timeout)
+        memory.record(figures)
+        reason = memory.over_limit(figures)
+        if reason is not None:
+            memory.recycle_server(reason)
+        return result
+
+    deadline = loop.time() + timeout
+    while True:
+        if not _idle and time.monotonic() < _restart_at and all(w.executor is None for w in _workers):
+            raise BrokenProcessPool(
+                f"Parse workers keep failing, restarting them in {_restart_at - time.monotonic():.0f}s"
+            )
+        if count_wait:
+            worker = await asyncio.wait_for(_acquire(), timeout=max(deadline - loop.time(), 0))
+        else:
+            worker = await _acquire()
+        try:
+            future = _submit(worker, func, args)
+            executor = worker.executor
+            if not count_wait:
+                deadline = loop.time() + timeout
+            break
+        except BrokenProcessPool:
+            # its process died while idle (e.g. the OOM killer): replace it and wait for another worker
+            worker.retire()
+            _spawn(worker)
+        except BaseException:
+            _release(worker)
+            raise
+    try:
+        result, _ = await asyncio.wait_for(asyncio.wrap_future(future), timeout=max(deadline - loop.time(), 0))
+    except asyncio.TimeoutError:
+        # Left alone it would hold the worker (and the CPU) until the task ends
+        if worker.executor is executor:
+            from . import metrics
+
+            logger.warning(f"Parse worker {worker.index} timed out, stopping its process")
+            metrics.RECYCLES.labels("parse_worker", "timeout").inc()
+            worker.kill()
+        raise
+    return result
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite
+
+Runs over a synthetic corpus (see ``benchmarks/corpus.py``) without a live
+server:
+
+- ``extractors``: every extractor of the /parse registry, plus the helpers
+  only the legacy endpoint uses, on analysed documents, and each model view
+- ``pdf``: each PDF engine and ``auto`` over the generated PDFs
+- ``parse``: end-to-end ``POST /parse`` through the ASGI app in-process
+- ``contacts``: the single-pass contact scanner against the per-function
+  extractors it replaced (needs ``urlextract`` from requirements-dev.txt)
+
+Each suite runs in its own interpreter, so settings, caches and loaded
+models of one suite do not leak into the next. Results are written as
+JSON (median, p95 and mean milliseconds per document). Given a stored
+baseline, every benchmark slower than its threshold fails the run with
+exit code 1::
+
+    python benchmarks/bench.py --output benchmarks/baseline.json
+    python benchmarks/bench.py --baseline benchmarks/baseline.json --threshold 0.2 --threshold 'parse.*=0.3'
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.corpus import Sample, corpus  # noqa: E402
+
+SUITES = ("extractors", "pdf", "parse", "contacts")
+DEFAULT_THRESHOLD = 0.25  # allowed slowdown of the median, as a fraction of the baseline
+
+
+def measure(func: Callable[[Any], Any], inputs: Iterable[Any], repeat: int) -> Dict[str, float]:
+    """Per-input wall time of ``func`` over ``repeat`` rounds, in milliseconds"""
+    inputs = list(inputs)
+    times: List[float] = []
+    for _ in range(repeat):
+        for item in inputs:
+            started = time.perf_counter()
+            func(item)
+            times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    return {
+        "median_ms": round(statistics.median(times), 4),
+        "p95_ms": round(times[min(int(len(times) * 0.95), len(times) - 1)], 4),
+        "mean_ms": round(statistics.fmean(times), 4),
+        "runs": len(times),
+    }
+
+
+def bench_extractors(samples: List[Sample], repeat: int) -> Dict[str, Dict[str, float]]:
+    from app import extractors, nlp_models, pipeline
+    from app import utils as utl
+    from app.analysis import ResumeDocument
+
+    pipeline.warmup()
+    results = {}
+    for view in ["full", *nlp_models.VIEWS]:
+        model = nlp_models.get_view(view)
+        results[f"nlp.{view}"] = measure(model, (sample.text for sample in samples), repeat)
+
+    # Extractors time their own work on a fresh document whose full Doc is precomputed
+    analysed = [(sample.text, nlp_models.get_view("full")(sample.text)) for sample in samples]
+    results["analysis.sections"] = measure(lambda item: ResumeDocument(item[0]).sections, analysed, repeat)
+
+    def run(extractor: extractors.Extractor) -> Callable[[Tuple[str, Any]], Any]:
+        def call(item: Tuple[str, Any]) -> Any:
+            document = ResumeDocument(item[0], doc=item[1])
+            return extractor.func(document if extractor.region is None else document.region(extractor.region))
+        return call
+
+    for extractor in extractors.EXTRACTORS:
+        results[f"extractors.{extractor.field}"] = measure(run(extractor), analysed, repeat)
+    for func in (utl.get_skills, utl.extract_education, utl.extract_address):
+        results[f"utils.{func.__name__}"] = measure(
+            lambda item, func=func: func(ResumeDocument(item[0], doc=item[1])), analysed, repeat
+        )
+    return results
+
+
+def bench_pdf(samples: List[Sample], repeat: int) -> Dict[str, Dict[str, float]]:
+    from app import pdf
+
+    pdf.load_engines()
+    return {
+        f"pdf.{engine}": measure(lambda sample, engine=engine: pdf.extract(sample.pdf, engine), samples, repeat)
+        for engine in ("auto", *pdf.ENGINES)
+    }
+
+
+def bench_parse(samples: List[Sample], repeat: int) -> Dict[str, Dict[str, float]]:
+    # Measure parsing, not the result cache; parse in this process so no pool start-up is timed.
+    # The settings are read again: an earlier suite in this process may have loaded them.
+    scratch = tempfile.mkdtemp(prefix="resume-bench-")
+    os.environ.update(CACHE_ENABLED="false", CACHE_DIR="", PROFILE_DIR="", WORKER_PROCESSES="0",
+                      JOBS_DB_PATH=os.path.join(scratch, "jobs.db"))
+    from app import config
+
+    config.get_settings.cache_clear()
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    results = {}
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 300
+        while client.get("/ready").status_code != 200:
+            if time.monotonic() > deadline:
+                raise RuntimeError("The app did not become ready within 300s")
+            time.sleep(0.2)
+
+        for name, params in (("parse.full", {}), ("parse.contact", {"fields": "contact"})):
+            def post(sample: Sample, params=params) -> None:
+                response = client.post("/parse", params=params,
+                                       files={"file": (sample.name, sample.pdf, "application/pdf")})
+                if response.status_code != 200:
+                    raise RuntimeError(f"POST /parse failed for {sample.name}: {response.status_code} {response.text}")
+            results[name] = measure(post, samples, repeat)
+    return results
+
+
+def legacy_contacts(text: str, url_extract_cls) -> Dict[str, Any]:
+    """The contact fields as the per-function extractors found them before ``app.contacts``"""
+    email = set(re.findall(re.compile(r'[a-zA-Z_0-9\.\-+]+@[a-z0-9\.\-+]+\.[a-z]+'), text))
+    phones = re.findall(re.compile(r'[\+\(]?[1-9][0-9.\-\(\)]{8,}[0-9]'), text)
+    phone = phones[0] if phones and len(phones[0]) <= 16 else None
+    links = re.compile(
+        r"((?:(?:[\w]+\.)?linkedin\.com\/(?:pub|in|profile)\/(?:[-a-zA-Z0-9]+)\/*))"
+    ).findall(text)
+    github = re.compile(r"(?:http[s]?://)?github\.com/([^\s^/]+)").findall(text)
+    urls = url_extract_cls().find_urls(text)
+    zips = re.findall(r"\b(?:\d{5}(?:-\d{4})?|\d{6})\b", text)
+    return {
+        "email": email,
+        "phone": phone,
+        "linkedin": links[0] if links else "",
+        "github": github[0] if github else "",
+        "urls": urls,
+        "zip": zips,
+    }
+
+
+def scanned_contacts(text: str) -> Dict[str, Any]:
+    """The same fields from one ``app.contacts.scan`` pass"""
+    from app import contacts
+
+    matches = contacts.scan(text)
+
+    def of(kind):
+        return [match for match in matches if match.kind == kind]
+
+    phones = [match.text for match in of(contacts.PHONE) if len(match.text) <= 16]
+    return {
+        "email": {match.text for match in of(contacts.EMAIL)},
+        "phone": phones[0] if phones else None,
+        "linkedin": next((match.text for match in of(contacts.LINKEDIN)), ""),
+        "github": next((match.value for match in of(contacts.GITHUB)), ""),
+        "urls": [match.text for match in of(contacts.URL)],
+        "zip": [match.text for match in of(contacts.ZIP)],
+    }
+
+
+def bench_contacts(samples: List[Sample], repeat: int) -> Dict[str, Dict[str, float]]:
+    from app import contacts
+
+    try:
+        from urlextract import URLExtract
+    except ImportError:
+        raise RuntimeError("urlextract is needed for the contacts baseline: pip install -r requirements-dev.txt")
+
+    contacts.load_tlds()
+    texts = [sample.text for sample in samples]
+    differences = 0
+    for text in texts:
+        old, new = legacy_contacts(text, URLExtract), scanned_contacts(text)
+        for field in old:
+            if old[field] != new[field]:
+                differences += 1
+                if differences <= 10:
+                    print(f"contacts.{field}: per-function={old[field]!r} scanner={new[field]!r}", file=sys.stderr)
+    print(f"contacts: {differences} field(s) differ", file=sys.stderr)
+    return {
+        "contacts.per_function": measure(lambda text: legacy_contacts(text, URLExtract), texts, repeat),
+        "contacts.scanner": measure(scanned_contacts, texts, repeat),
+    }
+
+
+BENCHES = {"extractors": bench_extractors, "pdf": bench_pdf, "parse": bench_parse, "contacts": bench_contacts}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_isolated(suite: str, count: int, seed: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Run one suite in a fresh interpreter and return its benchmarks"""
+    with tempfile.TemporaryDirectory(prefix="resume-bench-") as scratch:
+        output = Path(scratch) / "results.json"
+        completed = subprocess.run(
+            [sys.executable, __file__, "--in-process", "--suite", suite, "--count", str(count), "--seed", str(seed),
+             "--repeat", str(repeat), "--output", str(output)],
+            stdout=subprocess.DEVNULL,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"The {suite} suite failed with exit code {completed.returncode}")
+        return json.loads(output.read_text())["benchmarks"]
+
+
+def run(suites: Iterable[str], count: int, seed: int, repeat: int, isolated: bool = True) -> Dict[str, Any]:
+    samples = corpus(count, seed)
+    benchmarks: Dict[str, Dict[str, float]] = {}
+    for suite in suites:
+        if isolated:
+            # the subprocess reports its own time
+            benchmarks.update(run_isolated(suite, count, seed, repeat))
+            continue
+        started = time.perf_counter()
+        benchmarks.update(BENCHES[suite](samples, repeat))
+        print(f"{suite}: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "corpus": {"count": count, "seed": seed, "characters": sum(len(sample.text) for sample in samples),
+                       "pages": sum(sample.pages for sample in samples)},
+            "repeat": repeat,
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def threshold_for(name: str, default: float, overrides: List[Tuple[str, float]]) -> float:
+    """The last ``PATTERN=VALUE`` override whose glob matches ``name``, else ``default``"""
+    for pattern, value in reversed(overrides):
+        if fnmatch.fnmatch(name, pattern):
+            return value
+    return default
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], default: float,
+            overrides: List[Tuple[str, float]]) -> List[Dict[str, Any]]:
+    """Median of every benchmark against the baseline; ``regressed`` marks the ones over threshold"""
+    rows = []
+    for name, now in sorted(current["benchmarks"].items()):
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            rows.append({"name": name, "baseline_ms": None, "median_ms": now["median_ms"], "ratio": None,
+                         "threshold": None, "regressed": False})
+            continue
+        ratio = now["median_ms"] / before["median_ms"] if before["median_ms"] else 1.0
+        limit = threshold_for(name, default, overrides)
+        rows.append({"name": name, "baseline_ms": before["median_ms"], "median_ms": now["median_ms"],
+                     "ratio": round(ratio, 3), "threshold": limit, "regressed": ratio > 1 + limit})
+    return rows
+
+
+def format_rows(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'benchmark':<46}{'baseline ms':>12}{'now ms':>10}{'change':>9}"]
+    for row in rows:
+        if row["ratio"] is None:
+            lines.append(f"{row['name']:<46}{'-':>12}{row['median_ms']:>10.3f}{'new':>9}")
+            continue
+        flag = "  REGRESSED" if row["regressed"] else ""
+        lines.append(f"{row['name']:<46}{row['baseline_ms']:>12.3f}{row['median_ms']:>10.3f}"
+                     f"{row['ratio'] - 1:>+9.1%}{flag}")
+    return "\n".join(lines)
+
+
+def _threshold(value: str) -> Tuple[str, float]:
+    pattern, sep, limit = value.rpartition("=")
+    try:
+        return (pattern if sep else "*"), float(limit)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a fraction or PATTERN=FRACTION, got {value!r}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline parsing benchmarks")
+    parser.add_argument("--suite", action="append", choices=SUITES, help="suite to run (repeatable); default all")
+    parser.add_argument("--count", type=int, default=12, help="synthetic resumes in the corpus")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3, help="rounds over the corpus per benchmark")
+    parser.add_argument("--output", type=Path, help="write the results as JSON (e.g. a new baseline)")
+    parser.add_argument("--baseline", type=Path, help="results JSON to compare against")
+    parser.add_argument("--threshold", action="append", type=_threshold, default=[],
+                        help=f"allowed median slowdown, e.g. 0.2 or 'parse.*=0.3' (default {DEFAULT_THRESHOLD})")
+    parser.add_argument("--in-process", action="store_true",
+                        help="run the suites in this interpreter instead of one subprocess each")
+    args = parser.parse_args()
+
+    results = run(args.suite or SUITES, args.count, args.seed, args.repeat, isolated=not args.in_process)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if not args.baseline:
+        print(json.dumps(results["benchmarks"], indent=2))
+        return
+    default = next((limit for pattern, limit in reversed(args.threshold) if pattern == "*"), DEFAULT_THRESHOLD)
+    overrides = [(pattern, limit) for pattern, limit in args.threshold if pattern != "*"]
+    rows = compare(results, json.loads(args.baseline.read_text()), default, overrides)
+    print(format_rows(rows))
+    regressed = [row["name"] for row in rows if row["regressed"]]
+    if regressed:
+        print(f"\n{len(regressed)} benchmark(s) regressed: {', '.join(regressed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Synthetic resume corpus
+
+Generates resumes of varying size, section layout and page count, as text
+and as PDFs written by a minimal built-in PDF writer (one Helvetica text
+stream per page), so the benchmarks need no fixtures or PDF libraries
+beyond the ones the app already uses. The same seed always yields the same
+corpus.
+
+    python benchmarks/corpus.py --out /tmp/resumes --count 20
+"""
+import argparse
+import random
+import textwrap
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+FIRST = ["John", "Priya", "Arjun", "Maria", "Wei", "Fatima", "Liam", "Ananya", "Rahul", "Sofia"]
+LAST = ["Doe", "Sharma", "Patel", "Garcia", "Chen", "Khan", "Smith", "Iyer", "Kulkarni", "Rossi"]
+CITIES = [("Pune", "MH", "411001"), ("Bangalore", "KA", "560001"), ("Austin", "TX", "78701"),
+          ("Seattle", "WA", "98101"), ("Chennai", "TN", "600001"), ("Boston", "MA", "02108")]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Enterprises"]
+TITLES = ["Software Engineer", "Data Analyst", "Backend Developer", "ML Engineer", "DevOps Engineer"]
+SKILLS = ["Python", "Java", "SQL", "AWS", "Docker", "Kubernetes", "React", "Node.js", "Machine Learning",
+          "Data Analysis", "Git", "Linux", "FastAPI", "PostgreSQL", "TensorFlow", "Excel", "Communication"]
+COLLEGES = ["Pune University", "Indian Institute of Technology Bombay", "Stanford University",
+            "St. Xavier's College", "National Institute of Technology Trichy", "Delhi Public School"]
+DEGREES = ["B.Tech. in Computer Science", "Bachelor of Engineering in Mechanical Engineering",
+           "M.Sc. in Data Science", "Master of Business Administration", "HSC", "Bachelor of Arts in Economics"]
+LANGUAGES = ["English", "Hindi", "Marathi", "Spanish", "French", "Tamil"]
+BULLETS = [
+    "Built data pipelines in Python and SQL on AWS serving {n} million events a day.",
+    "Led a team of {n} engineers delivering a React and Node.js dashboard.",
+    "Cut API latency by {n}% by caching hot paths and tuning PostgreSQL queries.",
+    "Automated deployments with Docker and Kubernetes across {n} environments.",
+    "Trained machine learning models with TensorFlow, improving accuracy by {n} points.",
+]
+
+# name -> (experience entries, bullets per entry, extra project paragraphs)
+SIZES: Dict[str, tuple] = {"small": (1, 2, 0), "medium": (3, 4, 2), "large": (8, 6, 10), "long": (16, 8, 40)}
+# Heading spellings the section segmenter has to recognize
+LAYOUTS: Dict[str, Dict[str, str]] = {
+    "upper": {"summary": "SUMMARY", "experience": "WORK EXPERIENCE", "education": "EDUCATION",
+              "skills": "TECHNICAL SKILLS", "languages": "LANGUAGES", "projects": "PROJECTS"},
+    "title": {"summary": "Professional Summary", "experience": "Experience", "education": "Education & Training",
+              "skills": "Skills", "languages": "Languages Known", "projects": "Projects"},
+    "colon": {"summary": "Objective:", "experience": "Employment History:", "education": "Academic Background:",
+              "skills": "Key Skills:", "languages": "Languages:", "projects": "Personal Projects:"},
+}
+
+LINE_WIDTH = 95  # characters of 10pt Helvetica across a letter page
+LINES_PER_PAGE = 60
+
+
+@dataclass(frozen=True)
+class Sample:
+    """One synthetic resume"""
+    name: str
+    size: str
+    layout: str
+    text: str
+    pdf: bytes
+    pages: int
+
+
+def synthetic_resume(rng: random.Random, size: str = "medium", layout: str = "upper") -> str:
+    """Resume text with a contact header and the sections of ``layout`` in a shuffled order"""
+    entries, bullets, projects = SIZES[size]
+    headings = LAYOUTS[layout]
+    first, last = rng.choice(FIRST), rng.choice(LAST)
+    handle = f"{first}{last}".lower()
+    city, state, zip_code = rng.choice(CITIES)
+    header = [
+        f"{first} {last}",
+        f"{handle}{rng.randint(1, 99)}@gmail.com | +91 {rng.randint(7000000000, 9999999999)}",
+        f"linkedin.com/in/{handle}-{rng.randint(100, 999)} | https://github.com/{handle}",
+        f"Portfolio: https://{handle}.dev/projects?id={rng.randint(1, 9)} and www.{handle}.io",
+        f"{city}, {state} {zip_code}",
+    ]
+    experience = []
+    for _ in range(entries):
+        experience.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({rng.randint(2012, 2020)} - present)")
+        experience += [f"- {rng.choice(BULLETS).format(n=rng.randint(2, 40))}" for _ in range(bullets)]
+    sections = {
+        "experience": experience,
+        "education": [f"{rng.choice(DEGREES)}, {rng.choice(COLLEGES)}, {rng.randint(2008, 2022)}"
+                      for _ in range(rng.randint(1, 3))],
+        "skills": [", ".join(rng.sample(SKILLS, rng.randint(5, 12)))],
+        "languages": [", ".join(rng.sample(LANGUAGES, rng.randint(1, 3)))],
+        "projects": [" ".join(rng.choice(BULLETS).format(n=rng.randint(2, 40)) for _ in range(3))
+                     for _ in range(projects)],
+    }
+    order = list(sections)
+    rng.shuffle(order)
+    lines = header + ["", headings["summary"], " ".join(rng.choice(BULLETS).format(n=5) for _ in range(2))]
+    for section in order:
+        if sections[section]:
+            lines += ["", headings[section], *sections[section]]
+    return "\n".join(lines)
+
+
+def _escape(line: str) -> bytes:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1", "replace")
+
+
+def to_pdf(text: str, lines_per_page: int = LINES_PER_PAGE) -> bytes:
+    """A minimal, valid PDF with ``text`` wrapped and laid out over as many pages as it needs"""
+    lines = [wrapped for line in text.split("\n") for wrapped in (textwrap.wrap(line, LINE_WIDTH) or [""])]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # page tree, filled in once the page numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    kids = []
+    for page in pages:
+        stream = b"BT /F1 10 Tf 12 TL 50 770 Td\n" + b"".join(b"(" + _escape(line) + b") Tj T*\n" for line in page)
+        stream += b"ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def corpus(count: int = 12, seed: int = 7, sizes: Sequence[str] = tuple(SIZES),
+           layouts: Optional[Sequence[str]] = None) -> List[Sample]:
+    """``count`` resumes cycling through every size and layout"""
+    rng = random.Random(seed)
+    layouts = layouts or tuple(LAYOUTS)
+    samples = []
+    for index in range(count):
+        size, layout = sizes[index % len(sizes)], layouts[(index // len(sizes)) % len(layouts)]
+        text = synthetic_resume(rng, size, layout)
+        pdf = to_pdf(text)
+        samples.append(Sample(f"resume-{index:03d}-{size}-{layout}.pdf", size, layout, text, pdf,
+                              pdf.count(b"/Type /Page /")))
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic resume corpus as PDFs")
+    parser.add_argument("--out", type=Path, required=True, help="directory for the PDFs")
+    parser.add_argument("--count", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    args.out.mkdir(parents=True, exist_ok=True)
+    for sample in corpus(args.count, args.seed):
+        (args.out / sample.name).write_bytes(sample.pdf)
+        print(f"{sample.name}: {sample.pages} page(s), {len(sample.text)} characters")
+
+
+if __name__ == "__main__":
+    main()
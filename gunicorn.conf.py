@@ -0,0 +1,66 @@
+"""
+Production server: preload in the master, then fork the workers
+
+The master imports the app and runs the parsing warmup (spaCy model, views,
+compiled skill and specialization matchers, gazetteer) before any worker is
+forked, so all workers share that memory copy-on-write instead of loading
+their own copies. Workers are recycled gracefully after
+``SERVER_MAX_REQUESTS`` requests (plus jitter), or once their RSS crosses
+``MEMORY_MAX_RSS``, and re-forked from the warm master. Metrics are shared between workers through
+``PROMETHEUS_MULTIPROC_DIR`` (a fresh temporary directory unless set).
+
+    gunicorn -c gunicorn.conf.py app.main:app
+"""
+import gc
+import logging
+import multiprocessing
+import os
+import tempfile
+
+# Forked workers parse in a thread on the shared model; a spawned parse
+# pool per worker would load a private copy of everything again
+os.environ.setdefault("WORKER_PROCESSES", "0")
+# Must be set before prometheus_client is imported; every worker writes its samples there
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="resume-parser-metrics-"))
+
+from app.config import get_settings  # noqa: E402
+
+settings = get_settings()
+
+bind = f"{settings.host}:{settings.port}"
+workers = settings.server_workers or multiprocessing.cpu_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+max_requests = settings.server_max_requests
+max_requests_jitter = settings.server_max_requests_jitter
+graceful_timeout = int(settings.server_graceful_timeout)
+timeout = int(settings.task_timeout + settings.server_graceful_timeout)
+loglevel = settings.log_level
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported and before workers are forked"""
+    from app import pipeline
+
+    try:
+        pipeline.warmup()
+    except Exception as e:
+        # Workers still load what they need on first use
+        logging.getLogger(__name__).error(f"Preloading the parsing pipeline failed: {e}")
+    # Keep the collector in the workers from writing to (and so copying) the shared pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Let a worker over its memory limits stop gracefully; the master forks its replacement"""
+    from app import memory
+
+    memory.mark_baseline()
+    memory.enable_server_recycling()
+
+
+def child_exit(server, worker):
+    """Drop the live gauges (requests in flight) of a worker that exited"""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
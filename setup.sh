@@ -33,6 +33,10 @@ pip install -r requirements.txt
 echo "🧠 Downloading spaCy model..."
 python -m spacy download en_core_web_sm
 
+# Download nltk stop words
+echo "📚 Downloading nltk stop words..."
+python -m nltk.downloader stopwords
+
 # Run tests
 echo "🧪 Running basic tests..."
 python -c "import fastapi; print('✅ FastAPI imported successfully')"
@@ -0,0 +1,142 @@
+"""app.admission: slot limit, FIFO hand-off and shedding"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from app.admission import ADMITTED, QUEUE_FULL, QUEUE_TIMEOUT, AdmissionController, Shed  # noqa: E402
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_admits_up_to_the_limit_without_waiting():
+    async def scenario():
+        controller = AdmissionController(limit=2)
+        assert await controller.acquire() == 0.0
+        assert await controller.acquire() == 0.0
+        assert controller.active == 2
+        controller.release()
+        controller.release()
+        assert controller.active == 0
+        assert controller.counters[ADMITTED] == 2
+
+    run(scenario())
+
+
+def test_released_slots_go_to_waiters_first_come_first_served():
+    async def scenario():
+        controller = AdmissionController(limit=1, queue_size=5, max_wait=5)
+        await controller.acquire()
+        order = []
+
+        async def request(name):
+            await controller.acquire()
+            order.append(name)
+
+        tasks = []
+        for name in "abc":
+            tasks.append(asyncio.create_task(request(name)))
+            await settle()
+        assert controller.stats()["waiting"] == 3
+
+        for expected in (["a"], ["a", "b"], ["a", "b", "c"]):
+            controller.release()
+            await settle()
+            assert order == expected
+            # the slot was handed over, not freed
+            assert controller.active == 1
+        await asyncio.gather(*tasks)
+
+    run(scenario())
+
+
+def test_a_newcomer_does_not_overtake_the_queue():
+    async def scenario():
+        controller = AdmissionController(limit=1, queue_size=5, max_wait=5)
+        await controller.acquire()
+        waiting = asyncio.create_task(controller.acquire())
+        await settle()
+        controller.release()
+        # the slot now belongs to the waiter even before it has resumed
+        late = asyncio.create_task(controller.acquire())
+        await settle()
+        assert waiting.done() and not late.done()
+        controller.release()
+        await late
+
+    run(scenario())
+
+
+def test_full_queue_is_shed():
+    async def scenario():
+        controller = AdmissionController(limit=1, queue_size=1, max_wait=5)
+        await controller.acquire()
+        waiting = asyncio.create_task(controller.acquire())
+        await settle()
+        with pytest.raises(Shed) as shed:
+            await controller.acquire()
+        assert shed.value.reason == QUEUE_FULL
+        assert shed.value.retry_after >= 1
+        assert controller.counters[QUEUE_FULL] == 1
+        controller.release()
+        await waiting
+
+    run(scenario())
+
+
+def test_waiting_too_long_is_shed_and_leaves_the_queue():
+    async def scenario():
+        controller = AdmissionController(limit=1, queue_size=2, max_wait=0.01)
+        await controller.acquire()
+        with pytest.raises(Shed) as shed:
+            await controller.acquire()
+        assert shed.value.reason == QUEUE_TIMEOUT
+        assert controller.stats()["waiting"] == 0
+        controller.release()
+        assert controller.active == 0
+
+    run(scenario())
+
+
+def test_a_slot_handed_to_a_cancelled_waiter_is_not_lost():
+    async def scenario():
+        controller = AdmissionController(limit=1, queue_size=5, max_wait=5)
+        await controller.acquire()
+        first = asyncio.create_task(controller.acquire())
+        await settle()
+        second = asyncio.create_task(controller.acquire())
+        await settle()
+        controller.release()  # handed to ``first``...
+        first.cancel()  # ...which is cancelled before it resumes
+        await settle()
+        # depending on the Python version ``first`` keeps the slot or passes it on to ``second``
+        holders = [task for task in (first, second) if task.done() and not task.cancelled()]
+        assert len(holders) == 1
+        assert controller.active == 1
+        controller.release()
+        await settle()
+        if holders[0] is first:
+            assert second.done()
+            controller.release()
+        assert controller.active == 0
+        assert controller.stats()["waiting"] == 0
+
+    run(scenario())
+
+
+def test_retry_after_follows_service_time_and_queue_length():
+    controller = AdmissionController(limit=2)
+    assert controller.retry_after() == 1
+    for _ in range(50):
+        controller.active += 1
+        controller.release(seconds=10.0)
+    assert controller.stats()["service_time_s"] == pytest.approx(10.0, abs=0.01)
+    assert controller.retry_after() == 5
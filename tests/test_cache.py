@@ -0,0 +1,118 @@
+"""app.cache: what a cache key covers, and the memory and disk tiers"""
+import os
+import time
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from app import cache, config  # noqa: E402
+
+PDF = b"%PDF-1.4 resume"
+
+
+@pytest.fixture
+def settings_env(monkeypatch):
+    """Set environment variables and reload the settings"""
+    def setenv(**values):
+        for name, value in values.items():
+            monkeypatch.setenv(name, str(value))
+        config.get_settings.cache_clear()
+
+    yield setenv
+    monkeypatch.undo()
+    config.get_settings.cache_clear()
+
+
+def test_key_depends_on_contents_and_variant():
+    key = cache.cache_key(PDF, ("skills",), False)
+    assert cache.cache_key(PDF, ("skills",), False) == key
+    assert cache.cache_key(PDF + b" ", ("skills",), False) != key
+    assert cache.cache_key(PDF, ("skills", "languages"), False) != key
+    assert cache.cache_key(PDF, ("skills",), True) != key
+
+
+def test_key_depends_on_the_pipeline_version(monkeypatch):
+    key = cache.cache_key(PDF)
+    monkeypatch.setattr(cache, "PIPELINE_VERSION", cache.PIPELINE_VERSION + "-next")
+    assert cache.cache_key(PDF) != key
+
+
+@pytest.mark.parametrize("name, value", [
+    ("PDF_ENGINE", "pdfminer"), ("PDF_MAX_PAGES", 3), ("NLP_CHUNK_CHARS", 1000), ("NLP_MAX_CHARS", 2000),
+    ("GEOCODER_REMOTE_URL", "https://geocoder.example"),
+])
+def test_key_depends_on_output_settings(settings_env, name, value):
+    settings_env()
+    key = cache.cache_key(PDF)
+    settings_env(**{name: value})
+    assert cache.cache_key(PDF) != key
+
+
+def test_key_ignores_settings_that_do_not_change_output(settings_env):
+    settings_env()
+    key = cache.cache_key(PDF)
+    settings_env(WORKER_PROCESSES=3, CACHE_TTL=60)
+    assert cache.cache_key(PDF) == key
+
+
+def test_key_follows_edits_to_a_configured_gazetteer(settings_env, tmp_path):
+    gazetteer = tmp_path / "cities.csv"
+    settings_env(GAZETTEER_PATH=gazetteer)
+    missing = cache.cache_key(PDF)
+    gazetteer.write_text("name,lat,lon\nPune,18.5,73.8\n")
+    written = cache.cache_key(PDF)
+    assert written != missing
+    gazetteer.write_text("name,lat,lon\nPune,18.5,73.8\nMumbai,19.0,72.8\n")
+    assert cache.cache_key(PDF) != written
+
+
+def test_memory_tier_evicts_least_recently_used_by_size():
+    store = cache.ResultCache(memory_bytes=60)
+    for key in "abc":
+        store.set(key, {"v": key * 10})  # 19 bytes each
+    assert store.get("a")[1] == "memory"  # "a" is now the most recent
+    store.set("d", {"v": "d" * 10})
+    assert store.get("b") is None
+    assert [store.get(key)[1] for key in "acd"] == ["memory"] * 3
+    stats = store.stats()
+    assert stats["evictions"] == 1
+    assert stats["memory_bytes"] <= 60
+    assert stats["memory_entries"] == 3
+
+
+def test_results_larger_than_the_memory_tier_are_not_kept_in_memory():
+    store = cache.ResultCache(memory_bytes=10)
+    store.set("big", {"v": "x" * 100})
+    assert store.get("big") is None
+    assert store.stats()["memory_entries"] == 0
+
+
+def test_replacing_an_entry_keeps_the_size_right():
+    store = cache.ResultCache(memory_bytes=1000)
+    store.set("a", {"v": "x" * 50})
+    store.set("a", {"v": "x"})
+    assert store.stats()["memory_bytes"] == len(b'{"v":"x"}')
+
+
+def test_disk_tier_serves_a_fresh_process_and_refills_memory(tmp_path):
+    cache.ResultCache(memory_bytes=1000, directory=tmp_path).set("k1", {"name": "Jane"})
+    store = cache.ResultCache(memory_bytes=1000, directory=tmp_path)
+    assert store.get("k1") == ({"name": "Jane"}, "disk")
+    assert store.get("k1") == ({"name": "Jane"}, "memory")
+    assert store.stats()["hit_ratio"] == 1.0
+
+
+def test_expired_disk_entries_are_misses_and_purged(tmp_path):
+    store = cache.ResultCache(memory_bytes=1000, directory=tmp_path, ttl=60)
+    store.set("old", {"v": 1})
+    store.set("new", {"v": 2})
+    stale = time.time() - 120
+    os.utime(store._path("old"), (stale, stale))
+    assert cache.ResultCache(memory_bytes=1000, directory=tmp_path, ttl=60).get("old") is None
+    assert not store._path("old").exists()
+
+    store.set("older", {"v": 3})
+    os.utime(store._path("older"), (stale, stale))
+    assert store.purge_expired() == 1
+    assert store._path("new").exists()
@@ -0,0 +1,80 @@
+"""app.chunking: cutting long texts and joining the chunks' Docs back into one"""
+import pytest
+
+from app import chunking
+
+spacy = pytest.importorskip("spacy")
+
+RESUME = (
+    "Jane Doe\njane@example.com\n\n"
+    "EDUCATION\nB.Tech in Computer Science, Pune University 2019.\n\n"
+    "EXPERIENCE\n" + "Built data pipelines in Python and SQL on AWS. " * 8 + "\n"
+    "SKILLS\nPython, SQL, AWS\n"
+)
+
+
+@pytest.fixture(scope="module")
+def nlp():
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns([
+        {"label": "ORG", "pattern": "Pune University"},
+        {"label": "ORG", "pattern": "AWS"},
+        {"label": "PERSON", "pattern": "Jane Doe"},
+    ])
+    return nlp
+
+
+def test_split_rejoins_into_the_text_within_the_limit():
+    chunks = chunking.split(RESUME, 120)
+    assert len(chunks) > 1
+    assert "".join(chunks) == RESUME
+    assert all(len(chunk) <= 120 for chunk in chunks)
+
+
+def test_split_prefers_section_starts_then_blank_lines_then_spaces():
+    chunks = chunking.split(RESUME, 120)
+    assert chunks[1].startswith("EXPERIENCE\n")
+    assert all(chunk.endswith((" ", "\n")) for chunk in chunks)
+    # boundaries count in the second half of the window only
+    assert chunking.cut("aaaaaaaaaa\n\nbbb\nccc dd", 0, 20) == 12
+    assert chunking.cut("aaaaaaaaaa\nbbb ccc dddd", 0, 20) == 11
+    assert chunking.cut("aaaa bbbb cccc dddd", 0, 12) == 10
+    assert chunking.cut("aaaa\n\nbbbbbbbbbbbbbbbb", 0, 16) == 16
+
+
+def test_split_cuts_hard_without_a_boundary():
+    assert chunking.split("x" * 25, 10) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_split_leaves_short_texts_alone():
+    assert chunking.split(RESUME, len(RESUME)) == [RESUME]
+    assert chunking.split(RESUME, 0) == [RESUME]
+
+
+def test_budget_cuts_at_a_boundary():
+    assert chunking.budget("one two three", 8) == "one two "
+    assert chunking.budget("one two three", 0) == "one two three"
+
+
+def test_joined_doc_matches_the_whole_text(nlp):
+    whole = nlp(RESUME)
+    joined = chunking.join(nlp.pipe(chunking.split(RESUME, 120)))
+    assert joined.text == RESUME
+    assert [(token.text, token.idx) for token in joined] == [(token.text, token.idx) for token in whole]
+    assert [(ent.text, ent.label_, ent.start_char) for ent in joined.ents] == [
+        (ent.text, ent.label_, ent.start_char) for ent in whole.ents
+    ]
+    assert joined.tensor.size == 0
+
+
+def test_model_view_chunks_long_texts_within_its_budget(nlp):
+    nlp_models = pytest.importorskip("app.nlp_models")
+    view = nlp_models.ModelView("test", nlp, ("entity_ruler",), chunk_chars=120, max_chars=300)
+    doc = view(RESUME)
+    assert doc.text == chunking.budget(RESUME, 300)
+    assert [ent.text for ent in doc.ents] == [ent.text for ent in nlp(doc.text).ents]
+
+    short, long = list(view.pipe(["Jane Doe at AWS", RESUME]))
+    assert [ent.text for ent in short.ents] == ["Jane Doe", "AWS"]
+    assert long.text == doc.text
@@ -0,0 +1,100 @@
+"""app.contacts: the single-pass scanner against the extractors it replaced"""
+import re
+
+import pytest
+
+from app import contacts
+
+RESUME = (
+    "John Doe\n"
+    "Email: John.Doe+jobs@Gmail.com | Phone: +91 98765-43210\n"
+    "linkedin.com/in/john-doe-123/ | https://github.com/johndoe\n"
+    "Portfolio: https://johndoe.dev/projects?id=4 and www.johndoe.io\n"
+    "Pune, MH 411001\n"
+    "Built APIs with ASP.NET and Node.js; mentored B.Tech and M.Sc interns.\n"
+)
+
+
+def of(kind, text=RESUME, tlds=None):
+    return [match for match in contacts.scan(text, tlds) if match.kind == kind]
+
+
+def test_matches_are_in_text_order_with_offsets():
+    matches = contacts.scan(RESUME)
+    assert [match.start for match in matches] == sorted(match.start for match in matches)
+    for match in matches:
+        assert RESUME[match.start:match.end] == match.text
+
+
+def test_email_domain_may_be_uppercase():
+    # the legacy pattern only accepted a lowercase domain
+    assert [match.text for match in of(contacts.EMAIL, "JANE@EXAMPLE.COM")] == ["JANE@EXAMPLE.COM"]
+
+
+def test_email_is_lowercased():
+    [email] = of(contacts.EMAIL)
+    assert email.text == "John.Doe+jobs@Gmail.com"
+    assert email.value == "john.doe+jobs@gmail.com"
+
+
+def test_phone_keeps_its_plus_and_drops_separators():
+    [phone] = of(contacts.PHONE, "Phone: +91-98765-43210")
+    assert phone.value == "+919876543210"
+    [phone] = of(contacts.PHONE, "call (98765) 43210 or 98765.43210")
+    assert phone.value == "9876543210"
+
+
+def test_profiles_are_picked_out_of_urls():
+    [linkedin] = of(contacts.LINKEDIN)
+    assert linkedin.value == "https://www.linkedin.com/in/john-doe-123"
+    [github] = of(contacts.GITHUB)
+    assert github.value == "johndoe"
+
+
+def test_url_trailing_punctuation_is_not_part_of_the_url():
+    [url] = of(contacts.URL, "See https://johndoe.dev/cv.")
+    assert url.text == "https://johndoe.dev/cv"
+    [url] = of(contacts.URL, "(www.johndoe.io)")
+    assert url.text == "www.johndoe.io"
+
+
+def test_bare_domains_need_a_known_tld():
+    assert [match.text for match in of(contacts.URL, "example.com and example.notatld")] == ["example.com"]
+    assert of(contacts.URL, "john@example.com") == []
+    assert of(contacts.URL, "Node.js and version 2.5") == []
+
+
+def test_dotted_names_with_a_real_tld_read_as_domains_as_urlextract_does():
+    # .net, .tech and .sc are delegated TLDs: the legacy extractor reported these too
+    found = [match.text for match in of(contacts.URL, "ASP.NET, B.Tech and M.Sc")]
+    assert found == ["ASP.NET", "B.Tech", "M.Sc"]
+
+
+def test_zip_codes():
+    assert [match.value for match in of(contacts.ZIP, "Pune 411001, Austin TX 78701 and 78701-1234")] == [
+        "411001", "78701", "78701-1234",
+    ]
+
+
+def test_custom_tld_set():
+    assert of(contacts.URL, "johndoe.dev", tlds=frozenset({"io"})) == []
+    assert of(contacts.URL, "johndoe.io", tlds=frozenset({"io"}))[0].value == "https://johndoe.io"
+
+
+def test_emails_and_phones_match_the_legacy_patterns():
+    text = RESUME.replace("Gmail", "gmail") + "Alt: jane_doe@uni.ac.in, (020)555-1234567 or 98765.43210\n"
+    assert {match.text for match in of(contacts.EMAIL, text)} == set(
+        re.findall(r"[a-zA-Z_0-9\.\-+]+@[a-z0-9\.\-+]+\.[a-z]+", text)
+    )
+    assert [match.text for match in of(contacts.PHONE, text)] == re.findall(r"[\+\(]?[1-9][0-9.\-\(\)]{8,}[0-9]", text)
+
+
+@pytest.mark.parametrize("text", [
+    RESUME,
+    "Links: https://a.example.org/x?y=1 | www.portfolio.me | gitlab.com/jane | http://127.0.0.1:8000/docs",
+    "Projects at xn--bcher-kva.example and https://blog.jane.dev/posts/2023/hello-world",
+])
+def test_urls_match_urlextract(text):
+    urlextract = pytest.importorskip("urlextract")
+    expected = urlextract.URLExtract().find_urls(text)
+    assert [match.text for match in of(contacts.URL, text)] == expected
@@ -0,0 +1,61 @@
+"""app.extractors: field selection and the plans built from it"""
+import pytest
+
+extractors = pytest.importorskip("app.extractors")
+
+
+@pytest.mark.parametrize("spec", [None, "", "  ", ",", "full"])
+def test_empty_spec_and_full_select_every_field(spec):
+    assert extractors.resolve_fields(spec) == extractors.FIELDS
+
+
+def test_profile():
+    assert extractors.resolve_fields("contact") == (
+        "personal_info.email", "personal_info.phone_number",
+        "social_links.linkedin", "social_links.github", "social_links.others",
+    )
+
+
+def test_section_selects_its_fields():
+    assert extractors.resolve_fields("address") == ("address.location", "address.zip_code")
+
+
+def test_fields_come_back_in_response_order_without_duplicates():
+    assert extractors.resolve_fields(" languages , personal_info.email,contact,skills") == (
+        "personal_info.email", "personal_info.phone_number",
+        "social_links.linkedin", "social_links.github", "social_links.others",
+        "skills", "languages",
+    )
+
+
+@pytest.mark.parametrize("spec", ["nope", "personal_info.mail", "personal", "skills,social"])
+def test_unknown_names_are_rejected(spec):
+    with pytest.raises(ValueError, match="Unknown field"):
+        extractors.resolve_fields(spec)
+
+
+def test_contact_profile_needs_no_model():
+    execution = extractors.plan(extractors.resolve_fields("contact"))
+    assert execution.view is None
+    assert all(extractor.needs <= extractors.NO_MODEL for extractor in execution.extractors)
+
+
+def test_plan_picks_the_cheapest_covering_view():
+    assert extractors.plan(["skills"]).view == "tokenizer"
+    assert extractors.plan(["address.location", "skills"]).view == "ner"
+    # the name reads the header region only, which does not need a whole-text Doc
+    assert extractors.plan(["personal_info.name"]).view is None
+
+
+def test_stages_split_by_model_need():
+    no_model, region, whole_text = extractors.stages(extractors.FIELDS)
+    assert "personal_info.email" in [extractor.field for extractor in no_model.extractors]
+    assert [extractor.field for extractor in region.extractors] == ["personal_info.name"]
+    assert "skills" in [extractor.field for extractor in whole_text.extractors]
+    assert no_model.view is None and region.view is None
+
+
+def test_nest_keeps_key_order():
+    assert extractors.nest({"personal_info.email": "a", "skills": [], "personal_info.phone_number": "1"}) == {
+        "personal_info": {"email": "a", "phone_number": "1"}, "skills": [],
+    }
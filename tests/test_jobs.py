@@ -0,0 +1,183 @@
+"""app.jobs: claiming jobs under a lease and recovering the ones whose worker died"""
+import asyncio
+import os
+import sqlite3
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from app import jobs  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = jobs.JobStore(str(tmp_path / "jobs.db"))
+    store.open()
+    yield store
+    store.close()
+
+
+def status(store, job_id):
+    return store.get(job_id)["status"]
+
+
+def test_a_claimed_job_is_not_claimed_again_while_leased(store):
+    store.add("j1", "cv.pdf", b"%PDF", None)
+    assert store.claim("j1", "worker-a", lease=60)
+    assert status(store, "j1") == jobs.RUNNING
+    assert not store.claim("j1", "worker-b", lease=60)
+    assert store.unfinished() == []
+    assert store.expired() == []
+
+
+def test_a_job_whose_lease_ran_out_is_recovered_and_claimed_once(store):
+    store.add("j1", "cv.pdf", b"%PDF", None)
+    assert store.claim("j1", "worker-a", lease=-1)
+    assert store.expired() == ["j1"]
+    assert store.unfinished() == ["j1"]
+    assert store.claim("j1", "worker-b", lease=60)
+    assert not store.claim("j1", "worker-c", lease=60)
+    # the old owner cannot extend a job it lost
+    assert not store.renew("j1", "worker-a", lease=60)
+    assert store.renew("j1", "worker-b", lease=60)
+
+
+def test_a_reused_pid_does_not_keep_a_crashed_job(store):
+    # the job was running in a process with this pid before a container restart
+    store.add("j1", "cv.pdf", b"%PDF", None)
+    store.claim("j1", f"host:{os.getpid()}:before", lease=-1)
+    assert store.unfinished() == ["j1"]
+
+
+def test_renewing_keeps_the_job(store):
+    store.add("j1", "cv.pdf", b"%PDF", None)
+    store.claim("j1", "worker-a", lease=0.05)
+    assert store.renew("j1", "worker-a", lease=60)
+    time.sleep(0.1)
+    assert store.expired() == []
+
+
+def test_finished_jobs_are_neither_claimed_nor_recovered(store):
+    store.add("j1", "cv.pdf", b"%PDF", None)
+    store.claim("j1", "worker-a", lease=60)
+    store.finish("j1", jobs.SUCCEEDED, result="{}")
+    assert not store.claim("j1", "worker-b", lease=60)
+    assert store.unfinished() == []
+    assert store.payload("j1") is None
+
+
+def test_queued_jobs_are_recovered_in_order(store):
+    for job_id in ("j1", "j2"):
+        store.add(job_id, "cv.pdf", b"%PDF", None)
+    assert store.unfinished() == ["j1", "j2"]
+
+
+def test_purge_removes_old_finished_jobs_only(store):
+    for job_id in ("done", "queued"):
+        store.add(job_id, "cv.pdf", b"%PDF", None)
+    store.finish("done", jobs.FAILED, error="bad")
+    assert store.purge(time.time() + 1) == 1
+    assert store.get("done") is None
+    assert store.get("queued") is not None
+
+
+def test_running_jobs_of_an_older_store_are_recovered(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, filename TEXT, payload BLOB, "
+            "result TEXT, error TEXT, webhook_url TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+            "owner INTEGER)"
+        )
+        conn.execute("INSERT INTO jobs VALUES ('j1', 'running', 'cv.pdf', x'00', NULL, NULL, NULL, 1, 1, ?)",
+                     (os.getpid(),))
+    store = jobs.JobStore(path)
+    store.open()
+    try:
+        assert store.unfinished() == ["j1"]
+        assert store.claim("j1", "worker-a", lease=60)
+    finally:
+        store.close()
+
+
+def run_queue(store, runner, scenario, lease):
+    async def main():
+        queue = jobs.JobQueue(store, runner, concurrency=1, lease=lease)
+        await queue.start()
+        try:
+            await scenario(queue)
+        finally:
+            await queue.stop()
+
+    asyncio.run(main())
+
+
+async def wait_for_status(queue, job_id, wanted, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while (await queue.get(job_id))["status"] != wanted:
+        assert time.monotonic() < deadline, f"{job_id} never became {wanted}"
+        await asyncio.sleep(0.02)
+
+
+def test_queue_resumes_a_job_interrupted_by_a_crash(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    crashed = jobs.JobStore(path)
+    crashed.open()
+    crashed.add("j1", "cv.pdf", b"%PDF", None)
+    crashed.claim("j1", f"host:{os.getpid()}:crashed", lease=-1)
+    crashed.close()
+
+    async def runner(contents, filename):
+        return {"filename": filename, "size": len(contents)}
+
+    async def scenario(queue):
+        await wait_for_status(queue, "j1", jobs.SUCCEEDED)
+        assert (await queue.get("j1"))["result"] == {"filename": "cv.pdf", "size": 4}
+
+    run_queue(jobs.JobStore(path), runner, scenario, lease=60)
+
+
+def test_queue_renews_the_lease_of_a_long_parse(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def runner(contents, filename):
+        started.set()
+        await release.wait()
+        return {}
+
+    async def scenario(queue):
+        job_id = await queue.submit("cv.pdf", b"%PDF")
+        await started.wait()
+        await asyncio.sleep(0.5)  # several leases long
+        other = jobs.JobStore(path)
+        other.open()
+        try:
+            assert not other.claim(job_id, "worker-b", lease=60)
+        finally:
+            other.close()
+        release.set()
+        await wait_for_status(queue, job_id, jobs.SUCCEEDED)
+
+    run_queue(jobs.JobStore(path), runner, scenario, lease=0.15)
+
+
+def test_queue_reclaims_jobs_whose_lease_runs_out_while_it_serves(tmp_path):
+    path = str(tmp_path / "jobs.db")
+
+    async def runner(contents, filename):
+        return {}
+
+    async def scenario(queue):
+        # a sibling server worker claims a job and dies
+        sibling = jobs.JobStore(path)
+        sibling.open()
+        sibling.add("j1", "cv.pdf", b"%PDF", None)
+        sibling.claim("j1", "sibling", lease=0.1)
+        sibling.close()
+        await wait_for_status(queue, "j1", jobs.SUCCEEDED)
+
+    run_queue(jobs.JobStore(path), runner, scenario, lease=0.2)
@@ -0,0 +1,75 @@
+"""app.keywords: boundaries, case and longest-match semantics, and the vocabularies built on it"""
+import pytest
+
+from app.keywords import KeywordIndex
+
+utils = pytest.importorskip("app.utils")
+
+
+def texts(matches):
+    return [match.text for match in matches]
+
+
+def test_matches_are_case_insensitive_and_keep_the_text_as_written():
+    index = KeywordIndex({"python": "Python", "sql": "SQL"})
+    matches = index.find("PYTHON, Sql and python")
+    assert texts(matches) == ["PYTHON", "Sql", "python"]
+    assert [match.label for match in matches] == ["Python", "SQL", "Python"]
+
+
+def test_keywords_start_and_end_at_word_boundaries():
+    index = KeywordIndex(["java", "go"])
+    assert texts(index.find("javascript, going, Java, go.")) == ["Java", "go"]
+    assert not index.search("ergonomics")
+
+
+def test_prefix_keywords_run_to_the_end_of_their_word():
+    index = KeywordIndex(["univers"], prefix=True)
+    assert texts(index.find("Pune University; UNIVERSITÄT Wien; multiversity")) == ["University", "UNIVERSITÄT"]
+
+
+def test_longest_keyword_wins():
+    index = KeywordIndex(["M.S", "M.Sc", "ASP.NET", "NET"])
+    assert texts(index.find("M.Sc and M.S, ASP.NET")) == ["M.Sc", "M.S", "ASP.NET"]
+    assert texts(index.find(".NET")) == ["NET"]
+
+
+def test_tail_extends_a_match():
+    index = KeywordIndex(["B.Tech"], tail=r"(?: in [\w ]+)?")
+    assert texts(index.find("B.Tech in Computer Science")) == ["B.Tech in Computer Science"]
+
+
+def test_found_labels_are_unique_in_order_of_first_occurrence():
+    index = KeywordIndex({"bangla": "Bengali", "bengali": "Bengali", "hindi": "Hindi"})
+    assert index.found_labels("Hindi, Bangla, bengali, HINDI") == ["Hindi", "Bengali"]
+
+
+def test_an_index_needs_a_keyword():
+    with pytest.raises(ValueError):
+        KeywordIndex(["", "  "])
+    assert len(KeywordIndex(["a", "A", "b"])) == 2
+
+
+def test_degrees_with_dots_and_subjects():
+    found = texts(utils.degree_keywords().find(
+        "B.Tech. in Computer Science\nM.Sc in Physics\nb.tech, MSc, B.Sc.; Ph.D"
+    ))
+    assert found == ["B.Tech. in Computer Science", "M.Sc in Physics", "b.tech", "B.Sc.", "Ph.D"]
+
+
+def test_dotted_technologies_are_not_degrees():
+    assert utils.degree_keywords().find("ASP.NET developer, Node.js, .NET Core") == []
+    assert [match.label for match in utils.education_keywords().find("ASP.NET and B.Tech, ME 2019")] == [
+        "B.TECH", "ME",
+    ]
+
+
+def test_languages_ignore_case_and_longer_words():
+    assert utils.language_keywords().found_labels("ENGLISH, hindi, Bangla, Englishman, Bengali") == [
+        "English", "Hindi", "Bengali",
+    ]
+
+
+def test_college_keywords_start_a_word():
+    found = texts(utils.college_keywords().find("Pune University, St. Xavier's COLLEGE, preschool teacher"))
+    assert found == ["University", "COLLEGE"]
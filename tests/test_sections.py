@@ -0,0 +1,80 @@
+"""app.sections: heading detection, segmentation and the header window"""
+import pytest
+
+from app import sections
+
+RESUME = (
+    "Jane Doe\n"
+    "jane@example.com\n"
+    "\n"
+    "EDUCATION\n"
+    "B.Tech in Computer Science, Pune University\n"
+    "Work Experience:\n"
+    "Engineer at Acme, 2019-2023\n"
+    "• Technical Skills\n"
+    "Python, SQL\n"
+    "Languages: English, Hindi\n"
+    "Hobbies\n"
+    "Chess"
+)
+
+
+@pytest.mark.parametrize("line, section", [
+    ("EDUCATION", sections.EDUCATION),
+    ("Education & Training", sections.EDUCATION),
+    ("education and training", sections.EDUCATION),
+    ("Work Experience:", sections.EXPERIENCE),
+    ("  2. Professional Experience -", sections.EXPERIENCE),
+    ("• Technical Skills", sections.SKILLS),
+    ("Languages: English, Hindi", sections.LANGUAGES),
+    ("Hobbies", sections.OTHER),
+    ("Experience with large distributed systems at scale", None),
+    ("Python, SQL", None),
+    ("", None),
+])
+def test_heading_section(line, section):
+    assert sections.heading_section(line) == section
+
+
+def test_segment_covers_the_text_in_order():
+    found = sections.segment(RESUME)
+    assert [section.name for section in found] == [
+        sections.HEADER, sections.EDUCATION, sections.EXPERIENCE, sections.SKILLS, sections.LANGUAGES,
+        sections.OTHER,
+    ]
+    assert found[0].start == 0 and found[-1].end == len(RESUME)
+    for before, after in zip(found, found[1:]):
+        assert before.end == after.start
+    assert "".join(RESUME[section.start:section.end] for section in found) == RESUME
+
+
+def test_a_section_starts_at_its_heading_line():
+    skills = next(section for section in sections.segment(RESUME) if section.name == sections.SKILLS)
+    assert skills.heading == "• Technical Skills"
+    assert RESUME[skills.start:skills.end] == "• Technical Skills\nPython, SQL\n"
+
+
+def test_heading_with_content_keeps_its_content():
+    languages = next(section for section in sections.segment(RESUME) if section.name == sections.LANGUAGES)
+    assert RESUME[languages.start:languages.end].startswith("Languages: English, Hindi")
+
+
+def test_text_without_headings_is_all_header():
+    text = "Jane Doe\nPython developer"
+    assert sections.segment(text) == [sections.Section(sections.HEADER, None, 0, len(text))]
+
+
+def test_header_window_stops_at_the_first_heading():
+    found = sections.segment(RESUME)
+    assert RESUME[:sections.header_window(RESUME, found)] == "Jane Doe\njane@example.com\n\n"
+
+
+def test_header_window_counts_non_blank_lines():
+    text = "Jane Doe\n\nPune\nPython\nSQL\nAWS"
+    assert text[:sections.header_window(text, sections.segment(text), lines=2)] == "Jane Doe\n\nPune\n"
+
+
+def test_header_window_of_a_resume_opening_with_a_heading():
+    # no header: the name is looked for in the first lines whatever their section
+    text = "Summary\nJane Doe\nEngineer\nEducation\nB.Sc"
+    assert text[:sections.header_window(text, sections.segment(text), lines=3)] == "Summary\nJane Doe\nEngineer\n"
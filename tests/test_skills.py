@@ -0,0 +1,58 @@
+"""app.skills: the compiled matcher and the sources each extractor reads"""
+import pytest
+
+spacy = pytest.importorskip("spacy")
+
+from app import skills, utils  # noqa: E402
+from app.analysis import ResumeDocument  # noqa: E402
+
+TEXT = (
+    "Technical Skills: Python, Machine Learning, SQL Server and React Native.\n"
+    "Languages: French, Spanish. Wrote queries and analysis in Excel."
+)
+
+
+@pytest.fixture(scope="module")
+def nlp():
+    return spacy.blank("en")
+
+
+@pytest.fixture
+def matcher(nlp, monkeypatch):
+    """The process-wide dictionary (built-in list and taxonomy) over a blank pipeline"""
+    terms = dict.fromkeys(skills.BUILTIN_SKILLS, skills.BUILTIN)
+    for skill in skills.load_taxonomy():
+        terms.setdefault(skill, skills.TAXONOMY)
+    matcher = skills.SkillMatcher(nlp, terms)
+    monkeypatch.setattr(skills, "get_matcher", lambda: matcher)
+    return matcher
+
+
+def document(nlp, text=TEXT):
+    return ResumeDocument(text, doc=nlp(text), view="tokenizer")
+
+
+def test_matches_are_case_insensitive_with_offsets(nlp):
+    matcher = skills.SkillMatcher(nlp, {"machine learning": skills.BUILTIN, "sql": skills.BUILTIN})
+    found = matcher.find(nlp(TEXT))
+    assert [(match.skill, match.text) for match in found] == [
+        ("machine learning", "Machine Learning"), ("sql", "SQL"),
+    ]
+    assert all(TEXT[match.start:match.end] == match.text for match in found)
+
+
+def test_single_stop_word_matches_are_dropped(nlp):
+    matcher = skills.SkillMatcher(nlp, {"less": skills.BUILTIN, "go": skills.BUILTIN, "sass": skills.BUILTIN})
+    assert [match.skill for match in matcher.find(nlp("Less Sass, go"))] == ["sass"]
+
+
+def test_extract_skills_new_reads_the_builtin_list_only(nlp, matcher):
+    assert utils.extract_skills_new(document(nlp)) == [
+        "Python", "Machine Learning", "Sql", "Sql Server", "React", "React Native", "Excel",
+    ]
+
+
+def test_get_skills_reads_the_taxonomy(nlp, matcher):
+    found = utils.get_skills(document(nlp))
+    assert found
+    assert all(matcher.sources[skill.lower()] == skills.TAXONOMY for skill in found)